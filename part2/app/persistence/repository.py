@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
 
 class Repository(ABC):
     @abstractmethod
@@ -26,12 +28,111 @@ class Repository(ABC):
         pass
 
 
+class HashIndex:
+    """
+    Map the values of an attribute to the ids of the objects holding them.
+
+    Each index also remembers the value it filed every object under, so an
+    object can be moved even when the attribute was set before update().
+    """
+
+    def __init__(self, attr_name, unique=False):
+        self.attr_name = attr_name
+        self.unique = unique
+        self._ids = {}
+        self._values = {}
+
+    def check(self, obj_id, value):
+        """Raise ValueError if a unique value already belongs to another object."""
+        if self.unique:
+            owners = self._ids.get(value, ())
+            if any(owner != obj_id for owner in owners):
+                raise ValueError(f"{self.attr_name} '{value}' already exists")
+
+    def add(self, obj_id, value):
+        # A dict keeps the ids in insertion order, like the storage
+        self._ids.setdefault(value, {})[obj_id] = None
+        self._values[obj_id] = value
+
+    def remove(self, obj_id):
+        value = self._values.pop(obj_id)
+        ids = self._ids[value]
+        del ids[obj_id]
+        if not ids:
+            del self._ids[value]
+
+    def move(self, obj_id, value):
+        if obj_id not in self._values:
+            self.add(obj_id, value)
+        elif self._values[obj_id] != value:
+            self.remove(obj_id)
+            self.add(obj_id, value)
+
+    def lookup(self, value):
+        """Get the ids of the objects holding a value."""
+        return list(self._ids.get(value, ()))
+
+
+class SortedIndex:
+    """
+    Keep (value, id) pairs of an attribute in order, for range queries.
+    Objects whose value is None are left out.
+    """
+
+    def __init__(self, attr_name):
+        self.attr_name = attr_name
+        self._entries = []
+        self._values = {}
+
+    def add(self, obj_id, value):
+        if value is not None:
+            insort(self._entries, (value, obj_id))
+            self._values[obj_id] = value
+
+    def remove(self, obj_id):
+        if obj_id in self._values:
+            value = self._values.pop(obj_id)
+            del self._entries[bisect_left(self._entries, (value, obj_id))]
+
+    def move(self, obj_id, value):
+        if self._values.get(obj_id) != value:
+            self.remove(obj_id)
+            self.add(obj_id, value)
+
+    def range(self, low=None, high=None):
+        """Get the ids of the objects whose value is within [low, high], in order."""
+        start = 0 if low is None else bisect_left(self._entries, low, key=itemgetter(0))
+        end = (len(self._entries) if high is None
+               else bisect_right(self._entries, high, key=itemgetter(0)))
+        return [obj_id for _, obj_id in self._entries[start:end]]
+
+
 class InMemoryRepository(Repository):
-    def __init__(self):
+    """
+    Repository storing the objects in a dict, by id.
+
+    Attributes named in unique or indexes get a hash index, making
+    get_by_attribute and get_all_by_attribute O(1); unique ones also reject
+    a second object with the same value. Attributes named in sorted_indexes
+    can be queried by range with get_range in O(log N). The indexes only
+    see changes made through add, update and delete.
+    """
+
+    def __init__(self, unique=(), indexes=(), sorted_indexes=()):
         self._storage = {}
+        self._hash_indexes = {name: HashIndex(name, unique=True) for name in unique}
+        self._hash_indexes.update((name, HashIndex(name)) for name in indexes)
+        self._sorted_indexes = {name: SortedIndex(name) for name in sorted_indexes}
+
+    def _all_indexes(self):
+        return list(self._hash_indexes.values()) + list(self._sorted_indexes.values())
 
     def add(self, obj):
+        for index in self._hash_indexes.values():
+            index.check(obj.id, getattr(obj, index.attr_name))
         self._storage[obj.id] = obj
+        for index in self._all_indexes():
+            index.add(obj.id, getattr(obj, index.attr_name))
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -42,11 +143,37 @@ class InMemoryRepository(Repository):
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            for index in self._hash_indexes.values():
+                if index.attr_name in data:
+                    index.check(obj_id, data[index.attr_name])
+            try:
+                obj.update(data)
+            finally:
+                # Also refiles values set on the object before update()
+                for index in self._all_indexes():
+                    index.move(obj_id, getattr(obj, index.attr_name))
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            for index in self._all_indexes():
+                index.remove(obj_id)
             del self._storage[obj_id]
 
     def get_by_attribute(self, attr_name, attr_value):
-        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
\ No newline at end of file
+        index = self._hash_indexes.get(attr_name)
+        if index is not None:
+            ids = index.lookup(attr_value)
+            return self._storage[ids[0]] if ids else None
+        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Get every object whose attribute has the given value."""
+        index = self._hash_indexes.get(attr_name)
+        if index is not None:
+            return [self._storage[obj_id] for obj_id in index.lookup(attr_value)]
+        return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
+
+    def get_range(self, attr_name, low=None, high=None):
+        """Get the objects whose attribute is within [low, high], ordered by it."""
+        index = self._sorted_indexes[attr_name]
+        return [self._storage[obj_id] for obj_id in index.range(low, high)]
@@ -6,10 +6,10 @@ from app.models.amenity import Amenity
 
 class HBnBFacade:
     def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+        self.user_repo = InMemoryRepository(unique=('email',))
+        self.place_repo = InMemoryRepository(indexes=('title', 'owner_id'))
+        self.review_repo = InMemoryRepository(indexes=('place_id',))
+        self.amenity_repo = InMemoryRepository(indexes=('name',))
 
     # User
     def create_user(self, user_data):
@@ -47,10 +47,7 @@ class HBnBFacade:
         return self.place_repo.get_all()
 
     def get_place_by_title(self, title):
-        return next(
-            (place for place in self.place_repo.get_all() if place.title == title),
-            None
-        )
+        return self.place_repo.get_by_attribute('title', title)
 
     def update_place(self, place_id, place_data):
         self.place_repo.update(place_id, place_data)
@@ -86,7 +83,7 @@ class HBnBFacade:
         place = self.get_place(place_id)
         if not place:
             return None
-        return [review for review in self.review_repo.get_all() if review.place_id == place_id]
+        return self.review_repo.get_all_by_attribute('place_id', place_id)
 
     def update_review(self, review_id, review_data):
         self.review_repo.update(review_id, review_data)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Benchmark attribute lookups of the in-memory repository.
+
+Usage: python benchmarks/bench_repository.py [users] [places]
+
+Looks users up by email, as every user creation and login does, and
+places up by price range, in a repository without indexes (a scan of
+every object) and in one with a unique hash index on email and a sorted
+index on price.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.user import User
+from app.models.place import Place
+from app.persistence.repository import InMemoryRepository
+
+USERS = 100_000
+PLACES = 100_000
+LOOKUPS = 200
+
+
+def measure(lookup, args):
+    """Return the mean time of one lookup in microseconds."""
+    start = time.perf_counter()
+    for arg in args:
+        lookup(*arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def main():
+    users_count = int(sys.argv[1]) if len(sys.argv) > 1 else USERS
+    places_count = int(sys.argv[2]) if len(sys.argv) > 2 else PLACES
+    random.seed(42)
+    users = [User("First", "Last", f"user{i}@example.com") for i in range(users_count)]
+    places = [Place(f"Place {i}", "", round(random.uniform(10, 500), 2), 10.0, 20.0, "owner")
+              for i in range(places_count)]
+
+    scan_users, indexed_users = InMemoryRepository(), InMemoryRepository(unique=("email",))
+    scan_places, indexed_places = InMemoryRepository(), InMemoryRepository(sorted_indexes=("price",))
+    fill_times = {}
+    for repo, objs in ((scan_users, users), (indexed_users, users),
+                       (scan_places, places), (indexed_places, places)):
+        start = time.perf_counter()
+        for obj in objs:
+            repo.add(obj)
+        fill_times[id(repo)] = time.perf_counter() - start
+
+    emails = [(f"user{random.randrange(users_count)}@example.com",) for _ in range(LOOKUPS)]
+    ranges = [(low, low + 5) for low in (random.uniform(10, 495) for _ in range(LOOKUPS))]
+    lookups = [
+        ('email', 'scan', scan_users,
+         lambda email: scan_users.get_by_attribute('email', email), emails),
+        ('email', 'hash index', indexed_users,
+         lambda email: indexed_users.get_by_attribute('email', email), emails),
+        ('price range', 'scan', scan_places,
+         lambda low, high: sorted((p for p in scan_places.get_all() if low <= p.price <= high),
+                                  key=lambda p: p.price), ranges),
+        ('price range', 'sorted index', indexed_places,
+         lambda low, high: indexed_places.get_range('price', low, high), ranges),
+    ]
+    print(f"{'lookup':>12} {'by':>13} {'us/lookup':>12} {'fill ms':>9}")
+    for name, by, repo, lookup, args in lookups:
+        print(f"{name:>12} {by:>13} {measure(lookup, args):>12.1f} "
+              f"{fill_times[id(repo)] * 1000:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
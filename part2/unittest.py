@@ -9,6 +9,7 @@ from app.api.v1.users import UserList, UserResource
 from app.api.v1.reviews import ReviewList, ReviewResource
 from app.api.v1.places import PlaceList, PlaceResource
 from app.api.v1.amenities import AmenityList, AmenityResource
+from app.persistence.repository import InMemoryRepository
 
 # Import the modules to test
 
@@ -280,3 +281,68 @@ class TestAmenityAPI(unittest.TestCase):
         self.assertEqual(response[0]["id"], "1")
         self.assertEqual(response[0]["name"], "WiFi")
         self.assertEqual(response[1], 200)
+
+
+class TestInMemoryRepository(unittest.TestCase):
+    def setUp(self):
+        self.users = InMemoryRepository(unique=("email",), indexes=("last_name",))
+        self.places = InMemoryRepository(indexes=("owner_id",), sorted_indexes=("price",))
+
+    def test_unique_index_lookup(self):
+        user = User("John", "Doe", "john.doe@example.com")
+        self.users.add(user)
+        self.assertIs(self.users.get_by_attribute("email", "john.doe@example.com"), user)
+        self.assertIsNone(self.users.get_by_attribute("email", "jane@example.com"))
+        with self.assertRaises(ValueError):
+            self.users.add(User("Johnny", "Doe", "john.doe@example.com"))
+
+    def test_non_unique_index_lookup(self):
+        john = User("John", "Doe", "john.doe@example.com")
+        jane = User("Jane", "Doe", "jane.doe@example.com")
+        self.users.add(john)
+        self.users.add(jane)
+        self.assertEqual(self.users.get_all_by_attribute("last_name", "Doe"), [john, jane])
+        self.assertEqual(self.users.get_all_by_attribute("first_name", "Jane"), [jane])
+
+    def test_update_moves_index_entries(self):
+        user = User("John", "Doe", "john.doe@example.com")
+        other = User("Jane", "Roe", "jane.roe@example.com")
+        self.users.add(user)
+        self.users.add(other)
+        self.users.update(user.id, {"email": "john@example.com", "last_name": "Smith"})
+        self.assertIsNone(self.users.get_by_attribute("email", "john.doe@example.com"))
+        self.assertIs(self.users.get_by_attribute("email", "john@example.com"), user)
+        self.assertEqual(self.users.get_all_by_attribute("last_name", "Doe"), [])
+        with self.assertRaises(ValueError):
+            self.users.update(user.id, {"email": "jane.roe@example.com"})
+        self.assertEqual(user.email, "john@example.com")
+
+    def test_update_after_direct_assignment(self):
+        user = User("John", "Doe", "john.doe@example.com")
+        self.users.add(user)
+        user.email = "john@example.com"
+        self.users.update(user.id, {"email": "john@example.com"})
+        self.assertIsNone(self.users.get_by_attribute("email", "john.doe@example.com"))
+        self.assertIs(self.users.get_by_attribute("email", "john@example.com"), user)
+
+    def test_delete_removes_index_entries(self):
+        user = User("John", "Doe", "john.doe@example.com")
+        self.users.add(user)
+        self.users.delete(user.id)
+        self.assertIsNone(self.users.get_by_attribute("email", "john.doe@example.com"))
+        self.users.add(User("John", "Doe", "john.doe@example.com"))
+
+    def test_sorted_index_range(self):
+        prices = [120.0, 45.0, 80.0, 80.0, 300.0]
+        places = [Place(f"Place {i}", "", price, 10.0, 20.0, "owner")
+                  for i, price in enumerate(prices)]
+        for place in places:
+            self.places.add(place)
+        in_range = self.places.get_range("price", 80.0, 120.0)
+        self.assertEqual([place.price for place in in_range], [80.0, 80.0, 120.0])
+        self.assertEqual(len(self.places.get_range("price", high=79.0)), 1)
+        self.places.update(places[4].id, {"price": 90.0})
+        self.places.delete(places[0].id)
+        self.assertEqual([place.price for place in self.places.get_range("price", 80.0)],
+                         [80.0, 80.0, 90.0])
+
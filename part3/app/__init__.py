@@ -14,6 +14,8 @@ from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
 from app.api.v1.auth import api as auth_ns
+from app.api.v1.export import api as export_ns
+from app.api.v1.metrics import api as metrics_ns
 
 def create_app(config_class="config.DevelopmentConfig"):
     app = Flask(__name__)
@@ -26,6 +28,8 @@ def create_app(config_class="config.DevelopmentConfig"):
                       "name": "Authorization"
                   }
               })
+    from app.serialization import output_json
+    api.representation('application/json')(output_json)
     db.init_app(app)
 
 
@@ -35,9 +39,19 @@ def create_app(config_class="config.DevelopmentConfig"):
     api.add_namespace(places_ns, path="/api/v1/places")
     api.add_namespace(reviews_ns, path="/api/v1/reviews")
     api.add_namespace(auth_ns, path="/api/v1/auth")
+    api.add_namespace(export_ns, path="/api/v1/export")
+    api.add_namespace(metrics_ns, path="/api/v1/metrics")
 
     bcrypt.init_app(app)
     jwt.init_app(app)
+    from app.api.v1.identity import token_revoked
+    jwt.token_in_blocklist_loader(token_revoked)
+
+    from app.cli import register_commands
+    register_commands(app)
+
+    from app.compression import init_compression
+    init_compression(app)
 
 
     return app
@@ -1,6 +1,11 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import is_admin
+from app.api.v1.pagination import get_page_args, page_headers
+from app.api.v1.conditional import (collection_validators, entity_validators,
+                                      not_modified, validator_headers)
+from app.api.v1.bulk import get_bulk_items, bulk_response
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -19,8 +24,7 @@ class AmenityList(Resource):
     def post(self):
         """Register a new amenity"""
         # Get current user identity and check admin status
-        current_user = get_jwt_identity()
-        if not current_user.get('is_admin', False):
+        if not is_admin():
             return {'error': 'Admin privileges required'}, 403
         
         data = api.payload
@@ -34,15 +38,50 @@ class AmenityList(Resource):
             return {'message': str(e)}, 400
 
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    @api.param('limit', 'Maximum number of amenities to return')
+    @api.param('cursor', 'Cursor of the page to return, from X-Next-Cursor')
     def get(self):
-        """Retrieve a list of all amenities"""
+        """Retrieve a page of amenities"""
+        try:
+            limit, cursor = get_page_args()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        validators = collection_validators(facade.get_watermark('amenities'))
+        cached = not_modified(validators)
+        if cached:
+            return cached
+        try:
+            amenities, next_cursor = facade.get_amenities_page(limit, cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
         json_ameneties = []
-        for amenity in facade.get_all_amenities():
+        for amenity in amenities:
             json_ameneties.append({
                 'id': amenity.id,
                 'name': amenity.name
             })
-        return json_ameneties, 200
+        headers = dict(page_headers(next_cursor), **validator_headers(validators))
+        return json_ameneties, 200, headers
+
+@api.route('/bulk')
+class AmenityBulk(Resource):
+    @api.expect([amenity_model])
+    @api.response(200, 'Per-item results of the bulk creation')
+    @api.response(400, 'Request body must be a JSON array or NDJSON')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Register many amenities at once"""
+        if not is_admin():
+            return {'error': 'Admin privileges required'}, 403
+
+        try:
+            items = get_bulk_items()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return bulk_response(facade.bulk_create_amenities(items))
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
@@ -53,10 +92,14 @@ class AmenityResource(Resource):
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
+        validators = entity_validators(amenity)
+        cached = not_modified(validators)
+        if cached:
+            return cached
         return {
             'id': amenity.id,
             'name': amenity.name
-        }, 200
+        }, 200, validator_headers(validators)
 
     @api.expect(amenity_model)
     @api.response(200, 'Amenity updated successfully')
@@ -67,8 +110,7 @@ class AmenityResource(Resource):
     def put(self, amenity_id):
         """Update an amenity's information"""
         # Get current user identity and check admin status
-        current_user = get_jwt_identity()
-        if not current_user.get('is_admin', False):
+        if not is_admin():
             return {'error': 'Admin privileges required'}, 403
             
         amenity_data = api.payload
@@ -1,7 +1,11 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
-from flask_jwt_extended import create_access_token
+from app.passwords import HasherBusy
+from app.ratelimit import login_failed, login_retry_after
+from flask import request
+from flask_jwt_extended import create_access_token, get_jwt, jwt_required
 import datetime
+import time
 
 api = Namespace('auth', description='Authentication operations')
 
@@ -13,27 +17,33 @@ login_model = api.model('Login', {
 @api.route('/login')
 class AuthResource(Resource):
     @api.expect(login_model, validate=True)
+    @api.response(429, 'Too many login attempts')
+    @api.response(503, 'Too many logins in progress')
     def post(self):
         """User login endpoint"""
         credentials = api.payload
-        user = facade.get_user_by_email(credentials['email'])
-        
+        retry_after = login_retry_after(request.remote_addr, credentials['email'])
+        if retry_after:
+            return {'message': 'Too many login attempts, retry later'}, 429, {'Retry-After': str(retry_after)}
+
+        try:
+            user = facade.authenticate(credentials['email'], credentials['password'])
+        except HasherBusy:
+            return {'message': 'Server busy, retry shortly'}, 503, {'Retry-After': '1'}
+
         if not user:
-            return {'message': 'Invalid credentials'}, 401
-            
-        # Check if we're using bcrypt correctly
-        if not user.verify_password(credentials['password']):
+            login_failed(credentials['email'])
             return {'message': 'Invalid credentials'}, 401
         
-        # Generate JWT token with proper claims
-        expires = datetime.timedelta(days=7)
+        # Generate JWT token with proper claims, valid for JWT_ACCESS_TOKEN_EXPIRES
         access_token = create_access_token(
-            identity={
-                'id': user.id,
+            identity=user.id,
+            additional_claims={
                 'email': user.email,
-                'is_admin': user.is_admin
-            }, 
-            expires_delta=expires
+                'is_admin': user.is_admin,
+                # iat only has a resolution of one second
+                'issued_at': time.time()
+            }
         )
         
         return {
@@ -45,4 +55,14 @@ class AuthResource(Resource):
                 'last_name': user.last_name,
                 'is_admin': user.is_admin
             }
-        }, 200
\ No newline at end of file
+        }, 200
+
+@api.route('/logout')
+class LogoutResource(Resource):
+    @api.response(200, 'Token revoked')
+    @jwt_required()
+    def post(self):
+        """Revoke the access token of the request"""
+        claims = get_jwt()
+        facade.revoke_token(claims['jti'], datetime.datetime.utcfromtimestamp(claims['exp']))
+        return {'message': 'Logged out'}, 200
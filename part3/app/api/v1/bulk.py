@@ -0,0 +1,44 @@
+import json
+from flask import request
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+
+
+def get_bulk_items():
+    """
+    Get the items of a bulk request body.
+
+    A JSON array is parsed at once; an NDJSON body is read line by line
+    from the request stream so that large uploads are never held in memory
+    as a whole. Lines that are not valid JSON become None items, which the
+    facade reports as invalid.
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        return _iter_ndjson(request.stream)
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        raise ValueError("Request body must be a JSON array or NDJSON")
+    return items
+
+
+def _iter_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def bulk_response(results):
+    """
+    Build the response of a bulk request from its per-item results.
+    """
+    created = sum(1 for result in results if result['status'] == 201)
+    return {
+        'created': created,
+        'failed': len(results) - created,
+        'results': results
+    }, 200
@@ -0,0 +1,61 @@
+import hashlib
+from datetime import timezone
+from flask import request, Response
+from werkzeug.http import http_date, quote_etag
+
+
+def entity_validators(*objs, key=''):
+    """
+    Get the (etag, last_modified) of a response built from these objects
+    and from anything else in key, such as the cursor of the next page
+    """
+    objs = [obj for obj in objs if obj is not None]
+    digest = hashlib.sha1(key.encode('utf-8'))
+    for obj in objs:
+        updated_at = obj.updated_at.isoformat() if obj.updated_at else ''
+        digest.update(f"{obj.id}@{updated_at};".encode('utf-8'))
+    last_modified = max((obj.updated_at for obj in objs if obj.updated_at),
+                        default=None)
+    return digest.hexdigest(), last_modified
+
+
+def collection_validators(watermark):
+    """
+    Get the (etag, last_modified) of a listing from the (count, last
+    updated_at) watermark of its table and the query string of the request
+    """
+    count, last_updated = watermark
+    updated_at = last_updated.isoformat() if last_updated else ''
+    key = f"{request.full_path}|{count}|{updated_at}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest(), last_updated
+
+
+def validator_headers(validators):
+    """Get the ETag and Last-Modified headers of a response"""
+    etag, last_modified = validators
+    # Caches may keep the response but must revalidate it on every use
+    headers = {'ETag': quote_etag(etag), 'Cache-Control': 'no-cache'}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified.replace(tzinfo=timezone.utc))
+    return headers
+
+
+def not_modified(validators):
+    """
+    Get a 304 response if the client already has this version, else None.
+
+    If-None-Match takes precedence over If-Modified-Since and uses the weak
+    comparison, so that an ETag weakened by content encoding still matches.
+    """
+    etag, last_modified = validators
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        # HTTP dates have a one second resolution
+        matched = (last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+                   <= request.if_modified_since)
+    else:
+        matched = False
+    if matched:
+        return Response(status=304, headers=validator_headers(validators))
+    return None
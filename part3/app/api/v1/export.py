@@ -0,0 +1,28 @@
+from flask_restx import Namespace, Resource
+from app.services import facade
+from flask import request, Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import is_admin
+
+api = Namespace('export', description='Bulk export operations')
+
+@api.route('/<entity>')
+@api.param('entity', 'One of users, places, reviews or amenities')
+class Export(Resource):
+    @api.response(200, 'NDJSON stream of every row')
+    @api.response(400, 'Unknown entity or invalid cursor')
+    @api.response(403, 'Admin privileges required')
+    @api.param('cursor', 'Resume after the row carrying this cursor')
+    @jwt_required()
+    def get(self, entity):
+        """Stream every row of an entity type as NDJSON"""
+        if not is_admin():
+            return {'error': 'Admin privileges required'}, 403
+
+        try:
+            lines = facade.export_entities(entity, request.args.get('cursor'))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        return Response(stream_with_context(lines),
+                        mimetype='application/x-ndjson')
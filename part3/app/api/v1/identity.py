@@ -0,0 +1,80 @@
+from collections import namedtuple
+from flask import current_app, g
+from flask_jwt_extended import get_jwt
+from app.persistence.cache import LRUCache
+from app.services import facade
+
+EXTENSION_KEY = 'identity_cache'
+
+# The authenticated user of a request
+Principal = namedtuple('Principal', ['id', 'is_admin'])
+
+
+def get_identity_cache():
+    """Get the cache of the resolved principals, by token jti"""
+    extensions = current_app.extensions
+    if EXTENSION_KEY not in extensions:
+        extensions[EXTENSION_KEY] = LRUCache(current_app.config.get('IDENTITY_CACHE_TTL', 30),
+                                             current_app.config.get('IDENTITY_CACHE_MAX_SIZE', 10000))
+    return extensions[EXTENSION_KEY]
+
+
+def token_principal(claims):
+    """
+    Read the principal claimed by a token: a user id subject with an
+    is_admin claim, or the dict identity of the tokens issued before
+    """
+    identity = claims.get('sub')
+    if isinstance(identity, dict):
+        user_id = next((identity[key] for key in ('id', 'user_id', '_id', 'sub')
+                        if identity.get(key)), None)
+        is_admin = identity.get('is_admin', False)
+    else:
+        user_id = identity
+        is_admin = claims.get('is_admin', False)
+    if not user_id:
+        return None
+    return Principal(str(user_id), bool(is_admin))
+
+
+def current_principal():
+    """
+    Get the principal of the access token of the request, or None when the
+    token names no user or a user that no longer exists.
+
+    The admin flag is taken from the user row rather than from the token,
+    and the row is read past the entity cache, so that a demoted admin
+    loses their rights without logging out. The user is looked up once
+    per token until the entry expires, after IDENTITY_CACHE_TTL seconds,
+    and once per request at most.
+    """
+    claims = get_jwt()
+    jti = claims.get('jti')
+    resolved = g.get('principal')
+    if resolved is not None and resolved[0] == jti:
+        return resolved[1]
+    cache = get_identity_cache()
+    principal = cache.get(jti) if jti else None
+    if principal is None:
+        principal = token_principal(claims)
+        user = facade.get_user(principal.id, cached=False) if principal is not None else None
+        principal = Principal(user.id, bool(user.is_admin)) if user else None
+        if principal is not None and jti:
+            cache.set(jti, principal)
+    g.principal = (jti, principal)
+    return principal
+
+
+def is_admin():
+    """Tell whether the request comes from an existing admin user"""
+    principal = current_principal()
+    return principal is not None and principal.is_admin
+
+
+def token_revoked(jwt_header, jwt_payload):
+    """Tell flask-jwt-extended whether a token has been revoked"""
+    principal = token_principal(jwt_payload)
+    # Tokens issued before the issued_at claim fall back on iat
+    return facade.is_token_revoked(jwt_payload.get('jti'),
+                                   principal.id if principal else None,
+                                   jwt_payload.get('issued_at', jwt_payload.get('iat', 0)))
@@ -0,0 +1,23 @@
+from flask_restx import Namespace, Resource
+from app.services import facade
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import is_admin
+
+api = Namespace('metrics', description='Runtime metrics of this worker')
+
+@api.route('/')
+class Metrics(Resource):
+    @api.response(200, 'Counters of this worker process')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Get the runtime counters of this worker"""
+        if not is_admin():
+            return {'error': 'Admin privileges required'}, 403
+
+        return {
+            'cache': facade.get_cache_stats(),
+            'bcrypt': facade.get_hasher_stats(),
+            'login_rate_limit': facade.get_rate_limit_stats(),
+            'token_blocklist': facade.get_revocation_stats(),
+        }, 200
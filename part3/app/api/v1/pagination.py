@@ -0,0 +1,35 @@
+from urllib.parse import urlencode
+from flask import request, current_app
+
+
+def get_page_args():
+    """
+    Read the limit and cursor query parameters of a list request.
+    """
+    limit = request.args.get('limit')
+    if limit is None:
+        limit = current_app.config.get('PAGE_SIZE', 50)
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be a positive integer")
+        if limit < 1:
+            raise ValueError("limit must be a positive integer")
+    limit = min(limit, current_app.config.get('MAX_PAGE_SIZE', 500))
+    return limit, request.args.get('cursor')
+
+
+def page_headers(next_cursor):
+    """
+    Build the headers advertising the next page of a list response.
+    """
+    if not next_cursor:
+        return {}
+    args = request.args.to_dict()
+    args['cursor'] = next_cursor
+    next_url = f"{request.base_url}?{urlencode(args)}"
+    return {
+        'X-Next-Cursor': next_cursor,
+        'Link': f'<{next_url}>; rel="next"'
+    }
@@ -1,7 +1,12 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import current_principal
+from app.api.v1.pagination import get_page_args, page_headers
+from app.api.v1.conditional import (collection_validators, entity_validators,
+                                      not_modified, validator_headers)
+from app.api.v1.bulk import get_bulk_items, bulk_response
 api = Namespace('places', description='Place operations')
 
 # Define the models for related entities
@@ -34,6 +39,47 @@ place_model = api.model('Place', {
     'amenities': fields.List(fields.String, required=True, description="List of amenities ID's")
 })
 
+def place_summary(place):
+    """Serialize a place for the listings, with its amenities as IDs"""
+    return {
+        'id': place.id,
+        'title': place.title,
+        'description': place.description,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'owner_id': place.owner_id,
+        'amenities': [amenity.id for amenity in place.amenities],
+        'review_count': place.review_count,
+        'average_rating': place.average_rating
+    }
+
+
+def get_price_arg(name):
+    """Read an optional non-negative price from the query string"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        price = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if price < 0:
+        raise ValueError(f"{name} must be >= 0")
+    return price
+
+
+def get_filter_args():
+    """Read the min_price, max_price and amenities filters of the listing"""
+    min_price = get_price_arg('min_price')
+    max_price = get_price_arg('max_price')
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError("min_price must not be greater than max_price")
+    amenities = request.args.get('amenities', '')
+    amenity_ids = sorted({amenity_id.strip() for amenity_id in amenities.split(',')
+                          if amenity_id.strip()})
+    return min_price, max_price, amenity_ids
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model, validate=True)
@@ -45,30 +91,12 @@ class PlaceList(Resource):
     def post(self):
         """Register a new place"""
         place_data = api.payload
-        current_user_id = get_jwt_identity()
-        
-        # Check if the user ID is a dictionary and extract the ID
-        if isinstance(current_user_id, dict) and 'id' in current_user_id:
-            current_user_id = current_user_id['id']
-        elif isinstance(current_user_id, dict):
-            # Try to find the user ID in the dictionary
-            for key in ['id', 'user_id', '_id', 'sub']:
-                if key in current_user_id:
-                    current_user_id = current_user_id[key]
-                    break
-            else:
-                return {'error': 'Could not determine user ID from token'}, 400
-                
-        place_data['owner_id'] = current_user_id
-
-        if current_user_id != place_data['owner_id']:
-            return {'error': 'Unauthorized action'}, 403
+        principal = current_principal()
+        if principal is None:
+            return {'error': 'Owner not found'}, 404
+        place_data['owner_id'] = principal.id
 
         try:
-            owner = facade.get_user(place_data['owner_id'])
-            if not owner:
-                return {'error': 'Owner not found'}, 404
-
             existing_place = facade.get_place_by_title(place_data['title'])
             if existing_place:
                 return {'error': 'Title already registered'}, 400
@@ -91,21 +119,136 @@ class PlaceList(Resource):
 
 
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid pagination or filter parameters')
+    @api.param('limit', 'Maximum number of places to return')
+    @api.param('cursor', 'Cursor of the page to return, from X-Next-Cursor')
+    @api.param('min_price', 'Minimum price per night')
+    @api.param('max_price', 'Maximum price per night')
+    @api.param('amenities', 'Comma-separated amenity IDs the places must all have')
+    @api.param('sort', 'Set to "rating" to list the best rated places first')
     def get(self):
-        """Retrieve a list of all places"""
-        places = facade.get_all_places()
+        """Retrieve a page of places"""
+        sort = request.args.get('sort')
+        if sort not in (None, 'rating'):
+            return {'error': 'sort must be "rating"'}, 400
+        try:
+            limit, cursor = get_page_args()
+            min_price, max_price, amenity_ids = get_filter_args()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        validators = collection_validators(facade.get_watermark('places'))
+        cached = not_modified(validators)
+        if cached:
+            return cached
+        try:
+            places, next_cursor = facade.get_places_page(
+                limit, cursor, min_price, max_price, amenity_ids, sort)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        headers = dict(page_headers(next_cursor), **validator_headers(validators))
+        return [place_summary(place) for place in places], 200, headers
+
+@api.route('/bulk')
+class PlaceBulk(Resource):
+    @api.expect([place_model])
+    @api.response(200, 'Per-item results of the bulk creation')
+    @api.response(400, 'Request body must be a JSON array or NDJSON')
+    @jwt_required()
+    def post(self):
+        """Register many places owned by the current user at once"""
+        principal = current_principal()
+        if principal is None:
+            return {'error': 'Owner not found'}, 404
+        owner_id = principal.id
+
+        try:
+            items = get_bulk_items()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return bulk_response(facade.bulk_create_places(items, owner_id))
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.response(200, 'Matching places, best ranked first')
+    @api.response(400, 'Invalid search or pagination parameters')
+    @api.param('q', 'Words that the title or description must all contain')
+    @api.param('limit', 'Maximum number of places to return')
+    @api.param('cursor', 'Cursor of the page to return, from X-Next-Cursor')
+    def get(self):
+        """Search places by keywords in their title and description"""
+        query = request.args.get('q', '').strip()
+        if not query:
+            return {'error': 'q is required'}, 400
+        try:
+            limit, cursor = get_page_args()
+            places, next_cursor = facade.search_places(query, limit, cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        return [place_summary(place) for place in places], 200, page_headers(next_cursor)
+
+@api.route('/suggest')
+class PlaceSuggest(Resource):
+    @api.response(200, 'Place titles and amenity names starting with the prefix')
+    @api.response(400, 'Invalid prefix or limit')
+    @api.param('prefix', 'Beginning of a place title or amenity name')
+    @api.param('limit', 'Maximum number of suggestions to return')
+    def get(self):
+        """Suggest place titles and amenity names while typing"""
+        prefix = request.args.get('prefix', '').strip()
+        if not prefix:
+            return {'error': 'prefix is required'}, 400
+        max_limit = current_app.config.get('SUGGEST_MAX_LIMIT', 20)
+        try:
+            limit = int(request.args.get('limit', 10))
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= max_limit:
+            return {'error': f'limit must be between 1 and {max_limit}'}, 400
+
+        return [
+            {'type': kind, 'id': obj_id, 'text': text}
+            for kind, obj_id, text in facade.get_suggestions(prefix, limit)
+        ], 200
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.response(200, 'Places within the radius, closest first')
+    @api.response(400, 'Invalid search parameters')
+    @api.param('lat', 'Latitude of the search centre')
+    @api.param('lng', 'Longitude of the search centre')
+    @api.param('radius_km', 'Search radius in kilometres')
+    @api.param('limit', 'Maximum number of places to return')
+    def get(self):
+        """Find the places closest to a point"""
+        try:
+            latitude = float(request.args['lat'])
+            longitude = float(request.args['lng'])
+            radius_km = float(request.args.get('radius_km', 10))
+        except (KeyError, ValueError):
+            return {'error': 'lat and lng are required and must be numbers'}, 400
+        if not -90.0 <= latitude <= 90.0 or not -180.0 <= longitude <= 180.0:
+            return {'error': 'lat or lng out of range'}, 400
+        max_radius = current_app.config.get('NEARBY_MAX_RADIUS_KM', 500)
+        if not 0 < radius_km <= max_radius:
+            return {'error': f'radius_km must be between 0 and {max_radius}'}, 400
+        try:
+            limit, _ = get_page_args()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        nearby = facade.get_places_nearby(latitude, longitude, radius_km, limit)
         return [
             {
                 'id': place.id,
                 'title': place.title,
-                'description': place.description,
                 'price': place.price,
                 'latitude': place.latitude,
                 'longitude': place.longitude,
-                'owner_id': place.owner_id,
-                'amenities': place.amenities
+                'distance_km': round(distance, 3)
             }
-            for place in places
+            for place, distance in nearby
         ], 200
 
 @api.route('/<place_id>')
@@ -114,11 +257,15 @@ class PlaceResource(Resource):
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get place details by ID"""
-        place = facade.get_place(place_id)
+        place = facade.get_place_details(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        
-        owner = facade.get_user(place.owner_id)
+        validators = entity_validators(place, place.owner, *place.amenities)
+        cached = not_modified(validators)
+        if cached:
+            return cached
+
+        owner = place.owner
         owner_data = {
             'id': owner.id,
             'first_name': owner.first_name,
@@ -126,14 +273,13 @@ class PlaceResource(Resource):
             'email': owner.email
         } if owner else None
 
-        amenity_data = []
-        for amenity_id in place.amenities:
-            amenity = facade.get_amenity(amenity_id)
-            if amenity:
-                amenity_data.append({
-                    'id': amenity.id,
-                    'name': amenity.name
-                })
+        amenity_data = [
+            {
+                'id': amenity.id,
+                'name': amenity.name
+            }
+            for amenity in place.amenities
+        ]
 
         return {
             'id': place.id,
@@ -143,8 +289,10 @@ class PlaceResource(Resource):
             'latitude': place.latitude,
             'longitude': place.longitude,
             'owner': owner_data,
-            'amenities': amenity_data
-        }, 200
+            'amenities': amenity_data,
+            'review_count': place.review_count,
+            'average_rating': place.average_rating
+        }, 200, validator_headers(validators)
 
     @api.expect(place_model, validate=True)
     @api.response(200, 'Place updated successfully')
@@ -157,22 +305,10 @@ class PlaceResource(Resource):
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        current_user_id = get_jwt_identity()
-        
-        # Check if the user ID is a dictionary and extract the ID
-        if isinstance(current_user_id, dict) and 'id' in current_user_id:
-            current_user_id = current_user_id['id']
-        elif isinstance(current_user_id, dict):
-            # Try to find the user ID in the dictionary
-            for key in ['id', 'user_id', '_id', 'sub']:
-                if key in current_user_id:
-                    current_user_id = current_user_id[key]
-                    break
-            else:
-                return {'error': 'Could not determine user ID from token'}, 400
-        
+        principal = current_principal()
+
         # Check if current user is the owner
-        if current_user_id != place.owner_id:
+        if principal is None or principal.id != place.owner_id:
             return {'error': 'Unauthorized action'}, 403
 
         update_data = api.payload
@@ -188,7 +324,7 @@ class PlaceResource(Resource):
                 'latitude': updated_place.latitude,
                 'longitude': updated_place.longitude,
                 'owner_id': updated_place.owner_id,
-                'amenities': updated_place.amenities
+                'amenities': [amenity.id for amenity in updated_place.amenities]
             }, 200
         except ValueError as e:
             return {'error': str(e)}, 400
@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import current_principal
+from app.api.v1.pagination import get_page_args, page_headers
+from app.api.v1.conditional import (collection_validators, entity_validators,
+                                      not_modified, validator_headers)
+from app.api.v1.bulk import get_bulk_items, bulk_response
 api = Namespace('reviews', description='Review operations')
 
 # Define the review model for input validation and documentation
@@ -25,8 +30,11 @@ class ReviewList(Resource):
         """Register a new review"""
         try:
             review_data = api.payload
-            current_user_id = get_jwt_identity()
-            
+            principal = current_principal()
+            if principal is None:
+                return {'error': 'User not found'}, 404
+            current_user_id = principal.id
+
             # Validate required fields
             required_fields = ['text', 'rating', 'place_id']
             for field in required_fields:
@@ -44,11 +52,6 @@ class ReviewList(Resource):
             if len(review_data['text'].strip()) == 0:
                 return {'error': 'Text cannot be empty'}, 400
                 
-            # Check if user exists
-            user = facade.get_user(current_user_id)
-            if not user:
-                return {'error': 'User not found'}, 404
-                
             # Check if place exists
             place = facade.get_place(review_data['place_id'])
             if not place:
@@ -83,9 +86,23 @@ class ReviewList(Resource):
             return {"error": str(e)}, 500
 
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    @api.param('limit', 'Maximum number of reviews to return')
+    @api.param('cursor', 'Cursor of the page to return, from X-Next-Cursor')
     def get(self):
-        """Retrieve a list of all reviews"""
-        reviews = facade.get_all_reviews()
+        """Retrieve a page of reviews"""
+        try:
+            limit, cursor = get_page_args()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        validators = collection_validators(facade.get_watermark('reviews'))
+        cached = not_modified(validators)
+        if cached:
+            return cached
+        try:
+            reviews, next_cursor = facade.get_reviews_page(limit, cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
 
         return [
             {
@@ -96,7 +113,27 @@ class ReviewList(Resource):
                 'place_id': review.place_id
             }
             for review in reviews
-        ], 200
+        ], 200, dict(page_headers(next_cursor), **validator_headers(validators))
+
+@api.route('/bulk')
+class ReviewBulk(Resource):
+    @api.expect([review_model])
+    @api.response(200, 'Per-item results of the bulk creation')
+    @api.response(400, 'Request body must be a JSON array or NDJSON')
+    @api.response(404, 'User not found')
+    @jwt_required()
+    def post(self):
+        """Register many reviews by the current user at once"""
+        principal = current_principal()
+        if principal is None:
+            return {'error': 'User not found'}, 404
+        user_id = principal.id
+
+        try:
+            items = get_bulk_items()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return bulk_response(facade.bulk_create_reviews(items, user_id))
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
@@ -108,8 +145,14 @@ class ReviewResource(Resource):
         if not review:
             return {"error": "Review not found"}, 404
 
-        # Get user info
         user = facade.get_user(review.user_id)
+        place = facade.get_place(review.place_id)
+        validators = entity_validators(review, user, place)
+        cached = not_modified(validators)
+        if cached:
+            return cached
+
+        # Get user info
         user_data = None
         if user:
             user_data = {
@@ -119,7 +162,6 @@ class ReviewResource(Resource):
             }
 
         # Get place info
-        place = facade.get_place(review.place_id)
         place_data = None
         if place:
             place_data = {
@@ -135,7 +177,7 @@ class ReviewResource(Resource):
             'place': place_data,
             'user_id': review.user_id,
             'place_id': review.place_id
-        }, 200
+        }, 200, validator_headers(validators)
 
     @api.expect(review_model, validate=True)
     @api.response(200, 'Review updated successfully')
@@ -152,9 +194,10 @@ class ReviewResource(Resource):
                 return {"error": "Review not found"}, 404
                 
             # Check if user is authorized to update this review
-            current_user_id = get_jwt_identity()
-            if current_user_id != review.user_id:
+            principal = current_principal()
+            if principal is None or principal.id != review.user_id:
                 return {"error": "Unauthorized action."}, 403
+            current_user_id = principal.id
 
             update_data = api.payload
 
@@ -197,8 +240,8 @@ class ReviewResource(Resource):
         if not review:
             return {"error": "Review not found"}, 404
             
-        current_user_id = get_jwt_identity()
-        if current_user_id != review.user_id:
+        principal = current_principal()
+        if principal is None or principal.id != review.user_id:
             return {"error": "Unauthorized action."}, 403
 
         facade.delete_review(review_id)
@@ -216,11 +259,18 @@ class PlaceReviewList(Resource):
             return {"error": "Place not found"}, 404
 
         reviews = facade.get_reviews_by_place(place_id)
+        users = facade.get_users_by_ids([review.user_id for review in reviews])
+        # Adding or deleting a review touches the place, so the place also
+        # moves Last-Modified forward when a review leaves the list
+        validators = entity_validators(place, *reviews, *users.values())
+        cached = not_modified(validators)
+        if cached:
+            return cached
 
         # Include user info for each review
         result = []
         for review in reviews:
-            user = facade.get_user(review.user_id)
+            user = users[review.user_id]
             user_info = None
             if user:
                 user_info = {
@@ -237,26 +287,41 @@ class PlaceReviewList(Resource):
                 'user': user_info
             })
 
-        return result, 200
+        return result, 200, validator_headers(validators)
 
 @api.route('/users/<user_id>/reviews')
 class UserReviewList(Resource):
     @api.response(200, 'List of reviews by the user retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     @api.response(404, 'User not found')
+    @api.param('limit', 'Maximum number of reviews to return')
+    @api.param('cursor', 'Cursor of the page to return, from X-Next-Cursor')
     def get(self, user_id):
-        """Get all reviews by a specific user"""
-        # Implement this later - functionality to get reviews by user
+        """Get a page of the reviews by a specific user"""
         # Check if user exists
         user = facade.get_user(user_id)
         if not user:
             return {"error": "User not found"}, 404
 
-        reviews = facade.get_reviews_by_user(user_id)
+        try:
+            limit, cursor = get_page_args()
+            reviews, next_cursor = facade.get_reviews_by_user(user_id, limit, cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        places = facade.get_places_by_ids([review.place_id for review in reviews])
+        # Nothing left in the page records a deleted review, so only the
+        # ETag, which hashes the ids, can tell that the page has changed
+        etag, _ = entity_validators(*reviews, *places.values(), key=next_cursor or '')
+        validators = (etag, None)
+        cached = not_modified(validators)
+        if cached:
+            return cached
 
         # Include place info for each review
         result = []
         for review in reviews:
-            place = facade.get_place(review.place_id)
+            place = places[review.place_id]
             place_info = None
             if place:
                 place_info = {
@@ -272,4 +337,4 @@ class UserReviewList(Resource):
                 'place': place_info
             })
 
-        return result, 200
+        return result, 200, dict(page_headers(next_cursor), **validator_headers(validators))
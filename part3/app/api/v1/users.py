@@ -2,8 +2,13 @@ from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from flask import request, jsonify
 from app.models.user import User
+from app.passwords import HasherBusy
 import bcrypt
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import current_principal, is_admin
+from app.api.v1.pagination import get_page_args, page_headers
+from app.api.v1.conditional import (collection_validators, entity_validators,
+                                      not_modified, validator_headers)
 api = Namespace('users', description='User operations')
 
 # Define the user model for input validation and documentation
@@ -17,23 +22,38 @@ user_model = api.model('User', {
 @api.route('/')
 class UserList(Resource):
     @api.response(200, 'Users list retrieved successfully') 
+    @api.response(400, 'Invalid pagination parameters')
+    @api.param('limit', 'Maximum number of users to return')
+    @api.param('cursor', 'Cursor of the page to return, from X-Next-Cursor')
     def get(self):
-        """Get users list"""
-        users = facade.get_all_users()
+        """Get a page of the users list"""
+        try:
+            limit, cursor = get_page_args()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        validators = collection_validators(facade.get_watermark('users'))
+        cached = not_modified(validators)
+        if cached:
+            return cached
+        try:
+            users, next_cursor = facade.get_users_page(limit, cursor)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         if not users:
             return {'error': 'No users found'}, 404
-        return {'users': [{'id': user.id, 'first_name': user.first_name, 'last_name': user.last_name, 'email': user.email} for user in users]}, 200
+        headers = dict(page_headers(next_cursor), **validator_headers(validators))
+        return {'users': [{'id': user.id, 'first_name': user.first_name, 'last_name': user.last_name, 'email': user.email} for user in users]}, 200, headers
 
     @api.expect(user_model, validate=True)
     @api.response(200, 'User successfully created')
     @api.response(400, 'Email already registered')
     @api.response(403, 'Admin privileges required')
+    @api.response(503, 'Too many password operations in progress')
     @jwt_required()
     def post(self):
         """Register a new user"""
         user_data = api.payload
-        current_user = get_jwt_identity()
-        if not current_user.get('is_admin', False):
+        if not is_admin():
             return {'error': 'Admin privileges required'}, 403
         
         user_data = api.payload
@@ -42,10 +62,11 @@ class UserList(Resource):
         if existing_user:
             return {'error': 'Email already registered'}, 400
         
-        new_user = facade.create_user(user_data)
-        hashed_password = new_user.hash_password(user_data['password'])
-        user_data['password'] = hashed_password
-        return {'id': new_user.id, 'first_name': new_user.first_name, 'last_name': new_user.last_name, 'email': new_user.email, 'password': new_user.password}, 201
+        try:
+            new_user = facade.create_user(user_data)
+        except HasherBusy:
+            return {'error': 'Server busy, retry shortly'}, 503, {'Retry-After': '1'}
+        return {'id': new_user.id, 'first_name': new_user.first_name, 'last_name': new_user.last_name, 'email': new_user.email}, 201
 
 @api.route('/<user_id>')
 class UserResource(Resource):
@@ -56,7 +77,11 @@ class UserResource(Resource):
         user = facade.get_user(user_id)
         if not user:
             return {'error': 'User not found'}, 404
-        return {'id': user.id, 'first_name': user.first_name, 'last_name': user.last_name, 'email': user.email}, 200
+        validators = entity_validators(user)
+        cached = not_modified(validators)
+        if cached:
+            return cached
+        return {'id': user.id, 'first_name': user.first_name, 'last_name': user.last_name, 'email': user.email}, 200, validator_headers(validators)
 
     @api.expect(api.model('UserUpdate', {
         'first_name': fields.String(description='First name of the user', min_length=1, max_length=50),
@@ -78,12 +103,13 @@ class UserResource(Resource):
             return {'error': 'User not found'}, 404
         
         # Get current user identity and check admin status
-        current_user_id = get_jwt_identity()
-        is_admin = current_user_id.get('is_admin', False)
-        
+        principal = current_principal()
+        if principal is None:
+            return {'error': 'Unauthorized action.'}, 403
+
         # If not admin, restrict to own profile and only first/last name
-        if not is_admin:
-            if str(user.id) != str(current_user_id):
+        if not principal.is_admin:
+            if str(user.id) != principal.id:
                 return {'error': 'Unauthorized action.'}, 403
             
             # Check if user is trying to modify email or password
@@ -126,10 +152,9 @@ class UserResource(Resource):
                     return {'error': 'Email is already in use'}, 400
                 update_data['email'] = user_data['email']
             
-            # Handle password update
+            # The password setter hashes it
             if 'password' in user_data:
-                hashed_password = user.hash_password(user_data['password'])
-                update_data['password'] = hashed_password
+                update_data['password'] = user_data['password']
             
             # If no changes to apply
             if not update_data:
@@ -137,11 +162,11 @@ class UserResource(Resource):
                 
             try:
                 facade.update_user(user.id, update_data)
-                # Update user object with new values for response
-                for key, value in update_data.items():
-                    setattr(user, key, value)
+            except HasherBusy:
+                return {'error': 'Server busy, retry shortly'}, 503, {'Retry-After': '1'}
             except Exception as e:
                 return {'error': str(e)}, 400
+            user = facade.get_user(user_id)
         
         # Return updated user details
         return {
@@ -0,0 +1,62 @@
+import click
+from flask.cli import with_appcontext
+from app import db
+
+
+@click.command('upgrade-db')
+@with_appcontext
+def upgrade_db_command():
+    """Apply the pending schema migrations."""
+    from app.persistence.migrations import upgrade
+
+    applied = upgrade(db.engine)
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(map(str, applied))}")
+    else:
+        click.echo("Database is up to date")
+
+
+@click.command('export')
+@click.argument('entity', type=click.Choice(['users', 'places', 'reviews', 'amenities']))
+@click.option('--cursor', help='Resume after the row carrying this cursor.')
+@click.option('--output', type=click.File('w'), default='-',
+              help='File to write to, standard output by default.')
+@with_appcontext
+def export_command(entity, cursor, output):
+    """Stream every row of an entity type as NDJSON."""
+    from app.services import facade
+
+    try:
+        lines = facade.export_entities(entity, cursor)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--cursor')
+    for line in lines:
+        output.write(line)
+
+
+@click.command('rebuild-rating-stats')
+@with_appcontext
+def rebuild_rating_stats_command():
+    """Recompute the review count and rating sum of every place."""
+    from app.services import facade
+
+    fixed = facade.rebuild_rating_stats()
+    click.echo(f"Fixed the rating aggregates of {fixed} place(s)")
+
+
+@click.command('prune-token-revocations')
+@with_appcontext
+def prune_token_revocations_command():
+    """Delete the revocations of tokens that have all expired."""
+    from app.services import facade
+
+    deleted = facade.prune_token_revocations()
+    click.echo(f"Deleted {deleted} expired token revocation(s)")
+
+
+def register_commands(app):
+    """Register the HBnB commands on the Flask CLI."""
+    app.cli.add_command(upgrade_db_command)
+    app.cli.add_command(export_command)
+    app.cli.add_command(rebuild_rating_stats_command)
+    app.cli.add_command(prune_token_revocations_command)
@@ -0,0 +1,163 @@
+"""
+Content-Encoding negotiation for the API responses.
+
+Responses of a compressible type are encoded with the best algorithm the
+client accepts among brotli, zstd and gzip. Brotli and zstd are only
+offered when their optional packages (brotli, zstandard) are installed.
+Small bodies are sent as they are, since compressing them costs more
+than it saves.
+
+Streamed responses, such as the NDJSON exports, are compressed chunk by
+chunk and flushed after every chunk, so clients still receive each line
+as soon as it is produced.
+
+Settings:
+
+- COMPRESS_MIN_SIZE: smallest body, in bytes, worth compressing,
+- COMPRESS_LEVEL, COMPRESS_BR_LEVEL, COMPRESS_ZSTD_LEVEL: the level of
+  each algorithm,
+- COMPRESS_MIMETYPES: the compressible content types.
+"""
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+DEFAULT_MIMETYPES = [
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+]
+
+
+class GzipEncoder:
+    def __init__(self, level):
+        # wbits=31 selects the gzip container rather than raw zlib
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+def available_encoders(config):
+    """
+    Get the {encoding: (encoder class, level)} supported here, best first.
+    """
+    encoders = {}
+    if brotli is not None:
+        encoders['br'] = (BrotliEncoder, config.get('COMPRESS_BR_LEVEL', 4))
+    if zstandard is not None:
+        encoders['zstd'] = (ZstdEncoder, config.get('COMPRESS_ZSTD_LEVEL', 3))
+    encoders['gzip'] = (GzipEncoder, config.get('COMPRESS_LEVEL', 6))
+    return encoders
+
+
+def compress_stream(chunks, encoder):
+    """
+    Compress an iterable of chunks, flushing after each one.
+    """
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = encoder.compress(chunk) + encoder.flush()
+            if data:
+                yield data
+        yield encoder.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def weaken_etag(response):
+    """
+    Mark the ETag as weak: the encoded bytes differ from the identity ones,
+    so a strong validator would no longer be byte-exact.
+    """
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def init_compression(app):
+    """
+    Register the response compression on the app.
+    """
+    encoders = available_encoders(app.config)
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+    mimetypes = set(app.config.get('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES))
+
+    @app.after_request
+    def compress_response(response):
+        if (response.mimetype not in mimetypes
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')
+                or response.direct_passthrough):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(list(encoders))
+        if encoding is None or request.method == 'HEAD':
+            return response
+        encoder_class, level = encoders[encoding]
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoder_class(level))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            encoder = encoder_class(level)
+            response.set_data(encoder.compress(data) + encoder.finish())
+
+        response.headers['Content-Encoding'] = encoding
+        weaken_etag(response)
+        return response
@@ -0,0 +1,116 @@
+"""
+Geohash encoding and distance helpers for proximity search.
+
+A geohash interleaves the bits of the longitude and latitude and spells
+them in base 32, so places that share a geohash prefix lie in the same
+cell. Looking up the few cells that cover a search area is then a handful
+of range scans on an indexed string column.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_KM = 6371.0088
+# Length of a degree of latitude on the same sphere as the distances
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GEOHASH_PRECISION = 9
+MAX_COVER_CELLS = 16
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """
+    Get the geohash of a point.
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                value = value * 2 + 1
+                lng_range[0] = mid
+            else:
+                value = value * 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                value = value * 2 + 1
+                lat_range[0] = mid
+            else:
+                value = value * 2
+                lat_range[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """
+    Get the height and width of a geohash cell, in degrees.
+    """
+    lat_bits = 5 * precision // 2
+    lng_bits = 5 * precision - lat_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Get the (south, west, north, east) box around a circle, in degrees.
+    The west and east edges may fall outside [-180, 180] near the
+    antimeridian.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    south = max(latitude - lat_delta, -90.0)
+    north = min(latitude + lat_delta, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    if cos_lat < 1e-6 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180.0:
+        return south, -180.0, north, 180.0
+    lng_delta = radius_km / (KM_PER_DEGREE * cos_lat)
+    return south, longitude - lng_delta, north, longitude + lng_delta
+
+
+def covering_cells(south, west, north, east):
+    """
+    Get the geohash prefixes of the cells covering a box, at the finest
+    precision that needs at most MAX_COVER_CELLS cells.
+    """
+    best = None
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size(precision)
+        rows = math.floor((north + 90.0) / height) - math.floor((south + 90.0) / height) + 1
+        cols = math.floor((east + 180.0) / width) - math.floor((west + 180.0) / width) + 1
+        if rows * cols > MAX_COVER_CELLS and best is not None:
+            break
+        best = precision, height, width, rows, cols
+
+    precision, height, width, rows, cols = best
+    first_lat = (math.floor((south + 90.0) / height) + 0.5) * height - 90.0
+    first_lng = (math.floor((west + 180.0) / width) + 0.5) * width - 180.0
+    cells = set()
+    for row in range(rows):
+        lat = min(first_lat + row * height, 90.0 - height / 2)
+        for col in range(min(cols, round(360.0 / width))):
+            lng = (first_lng + col * width + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(lat, lng, precision))
+    return sorted(cells)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """
+    Get the great-circle distance between two points, in kilometres.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = (math.sin(d_phi / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
@@ -12,7 +12,7 @@ class Amenity(BaseModel):
 
     __tablename__ = 'amenities'
 
-    _name = db.Column(db.String(128), nullable=False, unique=True)
+    _name = db.Column('name', db.String(128), nullable=False, unique=True)
 
     places = db.relationship(
         'Place',
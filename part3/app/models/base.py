@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
 from app import db
+from sqlalchemy.orm import declared_attr
 
 class BaseModel(db.Model):
     __abstract__ = True  # This ensures SQLAlchemy does not create a table for BaseModel
@@ -9,6 +10,15 @@ class BaseModel(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @declared_attr
+    def __table_args__(cls):
+        # Keyset pagination walks every table in (created_at, id) order, and
+        # the conditional GETs of the listings read the latest updated_at
+        return (
+            db.Index(f'ix_{cls.__tablename__}_created_at_id', 'created_at', 'id'),
+            db.Index(f'ix_{cls.__tablename__}_updated_at', 'updated_at'),
+        )
+
     def save(self):
         """Update the updated_at timestamp whenever the object is modified"""
         self.updated_at = datetime.now()
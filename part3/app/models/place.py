@@ -1,6 +1,8 @@
 from app import db
 from app.models.base import BaseModel
+from sqlalchemy import Float, case, cast, literal_column
 from sqlalchemy.ext.hybrid import hybrid_property
+from app.geo import encode_geohash
 
 
 place_amenity = db.Table(
@@ -16,7 +18,10 @@ place_amenity = db.Table(
         db.String(36),
         db.ForeignKey('amenities.id'),
         primary_key=True
-    )
+    ),
+    # The primary key already serves lookups by place, this one serves
+    # lookups by amenity without touching the table
+    db.Index('ix_place_amenity_amenity_id', 'amenity_id', 'place_id')
 )
 
 
@@ -27,14 +32,21 @@ class Place(BaseModel):
 
     __tablename__ = 'places'
 
-    _title = db.Column(db.String(255), nullable=False)
-    _description = db.Column(db.Text, nullable=True)
-    _price = db.Column(db.Numeric(10, 2), nullable=False)
-    _latitude = db.Column(db.Float, nullable=False)
-    _longitude = db.Column(db.Float, nullable=False)
-    _owner_id = db.Column(db.String(36),
+    _title = db.Column('title', db.String(255), nullable=False, index=True)
+    _description = db.Column('description', db.Text, nullable=True)
+    _price = db.Column('price', db.Numeric(10, 2), nullable=False)
+    _latitude = db.Column('latitude', db.Float, nullable=False)
+    _longitude = db.Column('longitude', db.Float, nullable=False)
+    _owner_id = db.Column('owner_id', db.String(36),
                           db.ForeignKey('users.id'),
                           nullable=False)
+    # Kept in sync by the latitude and longitude setters
+    _geohash = db.Column('geohash', db.String(12), nullable=True)
+    # Rating aggregates, maintained by the facade as reviews change
+    _review_count = db.Column('review_count', db.Integer, nullable=False,
+                              default=0, server_default='0')
+    _rating_sum = db.Column('rating_sum', db.Integer, nullable=False,
+                            default=0, server_default='0')
     owner = db.relationship('User', back_populates='places')
     reviews = db.relationship('Review',
                               back_populates='place',
@@ -90,6 +102,7 @@ class Place(BaseModel):
         if value < -90.0 or value > 90.0:
             raise ValueError('latitude must be between -90 and 90')
         self._latitude = value
+        self._update_geohash()
 
     @hybrid_property
     def longitude(self):
@@ -102,6 +115,38 @@ class Place(BaseModel):
         if value < -180.0 or value > 180.0:
             raise ValueError('longitude must be between -180 and 180')
         self._longitude = value
+        self._update_geohash()
+
+    @hybrid_property
+    def geohash(self):
+        return self._geohash
+
+    def _update_geohash(self):
+        if self._latitude is not None and self._longitude is not None:
+            self._geohash = encode_geohash(self._latitude, self._longitude)
+
+    @hybrid_property
+    def review_count(self):
+        return self._review_count
+
+    @hybrid_property
+    def rating_sum(self):
+        return self._rating_sum
+
+    @hybrid_property
+    def average_rating(self):
+        if not self._review_count:
+            return 0
+        return self._rating_sum / self._review_count
+
+    @average_rating.expression
+    def average_rating(cls):
+        # Literal constants so that the expression matches the one indexed
+        return case(
+            (cls._review_count > literal_column('0'),
+             cast(cls._rating_sum, Float) / cls._review_count),
+            else_=literal_column('0')
+        )
 
     @hybrid_property
     def owner_id(self):
@@ -114,3 +159,14 @@ class Place(BaseModel):
                 'Owner ID must be a string of 36 characters.'
             )
         self._owner_id = value
+
+
+# Serves the per-owner place listing, including its (created_at, id) order
+db.Index('ix_places_owner_id', Place._owner_id, Place.created_at, Place.id)
+# Covers the geohash range scans of the proximity search
+db.Index('ix_places_geohash', Place._geohash, Place._latitude,
+         Place._longitude, Place.id)
+# Serves the price range filters of the place listing
+db.Index('ix_places_price', Place._price, Place.created_at, Place.id)
+# Serves the listing sorted by average rating
+db.Index('ix_places_average_rating', Place.average_rating, Place.id)
@@ -8,12 +8,12 @@ class Review(BaseModel):
     """
     __tablename__ = 'reviews'
     
-    _text = db.Column(db.Text, nullable=False)
-    _rating = db.Column(db.Integer, nullable=False)
-    _place_id = db.Column(db.String(36),
+    _text = db.Column('text', db.Text, nullable=False)
+    _rating = db.Column('rating', db.Integer, nullable=False)
+    _place_id = db.Column('place_id', db.String(36),
                          db.ForeignKey('places.id'),
                          nullable=False)
-    _user_id = db.Column(db.String(36),
+    _user_id = db.Column('user_id', db.String(36),
                         db.ForeignKey('users.id'),
                         nullable=False)
     user = db.relationship('User', back_populates='reviews')
@@ -93,3 +93,9 @@ class Review(BaseModel):
         if len(value) != 36:
             raise ValueError("User ID must be a UUID")
         self._user_id = value
+
+
+# Serve the per-place and per-user review listings, including their
+# (created_at, id) order
+db.Index('ix_reviews_place_id', Review._place_id, Review.created_at, Review.id)
+db.Index('ix_reviews_user_id', Review._user_id, Review.created_at, Review.id)
@@ -0,0 +1,18 @@
+from app import db
+from app.models.base import BaseModel
+
+
+class TokenRevocation(BaseModel):
+    """
+    A revoked access token, keyed 'jti:<jti>', or every token of a user
+    issued up to revoked_before, keyed 'user:<user id>'.
+    """
+
+    __tablename__ = 'token_revocations'
+
+    key = db.Column(db.String(80), nullable=False, unique=True)
+    # Unix time with sub-second precision, as the issued_at claim, so that
+    # a login in the same second as the revocation is not revoked
+    revoked_before = db.Column(db.Float, nullable=True)
+    # Past this time the tokens concerned have expired anyway
+    expires_at = db.Column(db.DateTime, nullable=False)
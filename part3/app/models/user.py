@@ -1,10 +1,13 @@
 from app.models.base import BaseModel
-from app import db, bcrypt
+from app import db
+from app.passwords import get_hasher
 from sqlalchemy.ext.hybrid import hybrid_property
 
 class User(BaseModel):
     """User model class"""
     __tablename__ = 'users'
+    # The password hash is read from the database, never from the cache
+    __cache_exclude__ = ('_password',)
 
     # Database columns
     _first_name = db.Column('first_name', db.String(50), nullable=False)
@@ -37,7 +40,7 @@ class User(BaseModel):
         if email:
             self._email = email
         if password:
-            self._password = bcrypt.generate_password_hash(password).decode('utf-8')
+            self._password = get_hasher().hash(password)
         self._is_admin = is_admin
     
     # Hybrid properties with getters and setters
@@ -80,7 +83,7 @@ class User(BaseModel):
     def password(self, value):
         if not value:
             raise ValueError("Password cannot be empty")
-        self._password = bcrypt.generate_password_hash(value).decode('utf-8')
+        self._password = get_hasher().hash(value)
     
     @hybrid_property
     def is_admin(self):
@@ -92,7 +95,11 @@ class User(BaseModel):
     
     def verify_password(self, password):
         """Verify a password against the stored hash."""
-        return bcrypt.check_password_hash(self._password, password)
+        return get_hasher().check(self._password, password)
+
+    def password_needs_rehash(self):
+        """Tell whether the stored hash uses another work factor than the configured one."""
+        return get_hasher().needs_rehash(self._password)
     
     def hash_password(self, password):
         """
@@ -101,5 +108,5 @@ class User(BaseModel):
         """
         if not password:
             raise ValueError("Password cannot be empty")
-        self._password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self._password = get_hasher().hash(password)
         return self._password
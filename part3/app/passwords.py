@@ -0,0 +1,156 @@
+"""
+Password hashing on a bounded pool of worker threads.
+
+bcrypt is deliberately slow and releases the GIL while it runs, so the
+hashes and checks are handed to a small dedicated pool instead of running
+on the request threads. The pool bounds how many of them run at once,
+which keeps some CPU for the cheap requests during a burst of logins, and
+it rejects the work with HasherBusy once too many are pending, rather
+than queueing it without limit.
+
+Settings:
+
+- BCRYPT_LOG_ROUNDS: the work factor of new hashes; hashes made with
+  another one are replaced on the next successful login,
+- BCRYPT_WORKERS: the number of hashing threads, half of the cores by
+  default; each keeps a core busy while it hashes, so it should stay
+  below the number of cores the workers of the host share,
+- BCRYPT_MAX_PENDING: how many hashes and checks may be running or
+  waiting at once.
+
+benchmarks/bench_bcrypt.py measures the cost of each work factor on the
+current machine.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app import bcrypt
+
+EXTENSION_KEY = 'password_hasher'
+
+
+class HasherBusy(RuntimeError):
+    """Raised when too many password operations are already pending."""
+
+
+def hash_cost(hashed):
+    """
+    Get the work factor a bcrypt hash was made with, or None.
+    """
+    parts = hashed.split('$') if hashed else ()
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """
+    Bounded pool running the bcrypt hashes and checks.
+    """
+
+    def __init__(self, rounds, workers, max_pending):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='bcrypt')
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+
+    def _submit(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise HasherBusy("Too many password operations in progress")
+        with self.lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            future = self.executor.submit(self._run, time.perf_counter(), func, args)
+        except BaseException:
+            with self.lock:
+                self.queued -= 1
+            self.slots.release()
+            raise
+        return future.result()
+
+    def _run(self, submitted_at, func, args):
+        started = time.perf_counter()
+        with self.lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_time += started - submitted_at
+        try:
+            return func(*args)
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.completed += 1
+                self.run_time += time.perf_counter() - started
+            self.slots.release()
+
+    def hash(self, password):
+        """
+        Hash a password with the configured work factor.
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        hashed = self._submit(bcrypt.generate_password_hash, password, self.rounds)
+        return hashed.decode('utf-8')
+
+    def check(self, hashed, password):
+        """
+        Check a password against a hash.
+        """
+        if not hashed or not password:
+            return False
+        return self._submit(bcrypt.check_password_hash, hashed, password)
+
+    def needs_rehash(self, hashed):
+        """
+        Tell whether a hash was made with another work factor.
+        """
+        return hash_cost(hashed) != self.rounds
+
+    def stats(self):
+        with self.lock:
+            completed = self.completed
+            return {
+                'rounds': self.rounds,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'queued': self.queued,
+                'running': self.running,
+                'peak_queued': self.peak_queued,
+                'completed': completed,
+                'rejected': self.rejected,
+                'avg_wait_ms': round(self.wait_time * 1000 / completed, 3) if completed else None,
+                'avg_run_ms': round(self.run_time * 1000 / completed, 3) if completed else None,
+            }
+
+
+def create_hasher(config):
+    """
+    Create the hasher described by the configuration.
+    """
+    workers = config.get('BCRYPT_WORKERS', 2)
+    return PasswordHasher(config.get('BCRYPT_LOG_ROUNDS', 12), workers,
+                          config.get('BCRYPT_MAX_PENDING', workers * 8))
+
+
+def get_hasher():
+    """
+    Get the hasher of the current app, creating it on first use.
+    """
+    extensions = current_app.extensions
+    if EXTENSION_KEY not in extensions:
+        extensions[EXTENSION_KEY] = create_hasher(current_app.config)
+    return extensions[EXTENSION_KEY]
@@ -0,0 +1,234 @@
+"""
+Read-through cache of the rows fetched by id through the repositories.
+
+The cache stores column snapshots rather than ORM objects, since an object
+belongs to the session that loaded it. A cached snapshot is turned back
+into a persistent object of the current session without a query, and its
+relationships still load lazily as usual.
+
+Two backends are available, selected with CACHE_BACKEND:
+
+- 'lru': an in-process LRU bounded by CACHE_MAX_SIZE entries,
+- 'redis': a Redis-compatible server at CACHE_REDIS_URL, shared by every
+  worker; it needs the optional redis package.
+
+Entries expire after CACHE_TTL seconds, which bounds how stale a row
+written without going through the repositories can be. Set CACHE_BACKEND
+to None to disable the cache.
+
+Snapshots are stored in Redis as JSON, never pickled, so that whoever can
+write to the server cannot run code in the workers. The columns a model
+lists in __cache_exclude__, such as the password hash of a user, are left
+out of the snapshots and load from the database when first read.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app.serialization import dumps
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+EXTENSION_KEY = 'entity_cache'
+PENDING_KEY = 'cache_invalidations'
+
+
+class Cache:
+    """
+    Base class of the backends, counting hits and misses.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, value):
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class LRUCache(Cache):
+    """
+    In-process cache evicting the least recently used entries.
+    """
+
+    def __init__(self, ttl, max_size):
+        super().__init__(ttl)
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.entries.move_to_end(key)
+                    return self._count(entry[1])
+                del self.entries[key]
+            return self._count(None)
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        return dict(super().stats(), size=len(self.entries), max_size=self.max_size)
+
+
+class RedisCache(Cache):
+    """
+    Cache shared by every worker through a Redis-compatible server.
+    """
+
+    def __init__(self, ttl, url, prefix='hbnb:'):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND 'redis' needs the redis package")
+        super().__init__(ttl)
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return self._count(json.loads(value) if value is not None else None)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, dumps(value), ex=max(1, int(self.ttl)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache(config):
+    """
+    Create the backend selected by the configuration, or None.
+    """
+    backend = config.get('CACHE_BACKEND')
+    ttl = config.get('CACHE_TTL', 60)
+    if backend == 'lru':
+        return LRUCache(ttl, config.get('CACHE_MAX_SIZE', 10000))
+    if backend == 'redis':
+        return RedisCache(ttl, config.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+    if backend:
+        raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+    return None
+
+
+def get_cache():
+    """
+    Get the cache of the current app, creating it on first use.
+    """
+    extensions = current_app.extensions
+    if EXTENSION_KEY not in extensions:
+        extensions[EXTENSION_KEY] = create_cache(current_app.config)
+    return extensions[EXTENSION_KEY]
+
+
+def snapshot(obj):
+    """
+    Copy the column values of a loaded object, but the excluded ones.
+    """
+    mapper = obj.__mapper__
+    excluded = getattr(obj, '__cache_exclude__', ())
+    return {prop.key: getattr(obj, prop.key) for prop in mapper.column_attrs
+            if prop.key not in excluded}
+
+
+def _decode(prop, value):
+    # Values read back from JSON come as the types JSON has
+    if isinstance(value, str):
+        python_type = _python_type(prop)
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        if _python_type(prop) is Decimal:
+            return Decimal(str(value))
+    return value
+
+
+def _python_type(prop):
+    try:
+        return prop.columns[0].type.python_type
+    except NotImplementedError:
+        return None
+
+
+def restore(session, model, values):
+    """
+    Turn a snapshot back into a persistent object of the session, without
+    emitting a query. Columns missing from the snapshot load on access.
+    """
+    mapper = model.__mapper__
+    obj = mapper.class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(obj, key, _decode(mapper.column_attrs[key], value))
+    make_transient_to_detached(obj)
+    return session.merge(obj, load=False)
+
+
+def invalidate(session, key):
+    """
+    Drop an entry now and again once the session commits, so that a
+    concurrent read cannot cache the old row while the write is pending.
+    """
+    cache = get_cache()
+    if cache is not None:
+        cache.delete(key)
+        session.info.setdefault(PENDING_KEY, set()).add(key)
+
+
+def install(session):
+    """
+    Register the session hooks that complete the invalidations.
+    """
+    @event.listens_for(session, 'after_commit')
+    def _invalidate_committed(session):
+        keys = session.info.pop(PENDING_KEY, None)
+        cache = get_cache() if keys else None
+        if cache is not None:
+            for key in keys:
+                cache.delete(key)
+
+    @event.listens_for(session, 'after_rollback')
+    def _forget_rolled_back(session):
+        session.info.pop(PENDING_KEY, None)
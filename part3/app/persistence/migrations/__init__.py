@@ -0,0 +1,64 @@
+"""
+Versioned schema migrations.
+
+Each migration module exposes a VERSION number and an upgrade(connection)
+function. Migrations must be idempotent so that they can be applied to a
+database created by db.create_all() as well as to an older one.
+"""
+from datetime import datetime
+from sqlalchemy import text
+from app.persistence.migrations import (
+    m0001_timestamps, m0002_indexes, m0003_geohash,
+    m0004_price_index, m0005_place_search, m0006_rating_stats,
+    m0007_updated_at_indexes, m0008_token_revocations,
+    m0009_revoked_before_precision
+)
+
+MIGRATIONS = [
+    m0001_timestamps,
+    m0002_indexes,
+    m0003_geohash,
+    m0004_price_index,
+    m0005_place_search,
+    m0006_rating_stats,
+    m0007_updated_at_indexes,
+    m0008_token_revocations,
+    m0009_revoked_before_precision,
+]
+
+
+def applied_versions(connection):
+    """
+    Get the versions already applied to the database.
+    """
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, applied_at TIMESTAMP NOT NULL)"
+    ))
+    rows = connection.execute(text("SELECT version FROM schema_migrations"))
+    return {row[0] for row in rows}
+
+
+def upgrade(engine):
+    """
+    Apply every pending migration in order and return their versions.
+
+    The connection runs in autocommit mode so that statements which cannot
+    run inside a transaction (CREATE INDEX CONCURRENTLY) are allowed, and so
+    that each statement only holds its locks for as long as it runs.
+    """
+    applied = []
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        done = applied_versions(connection)
+        for migration in MIGRATIONS:
+            if migration.VERSION in done:
+                continue
+            migration.upgrade(connection)
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, applied_at) "
+                     "VALUES (:version, :applied_at)"),
+                {'version': migration.VERSION, 'applied_at': datetime.utcnow()}
+            )
+            applied.append(migration.VERSION)
+    return applied
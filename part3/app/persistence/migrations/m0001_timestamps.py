@@ -0,0 +1,25 @@
+"""
+Add the created_at and updated_at columns of BaseModel to databases created
+from SQL/script.sql. This is SQL/migration.sql, made safe to re-run and to
+apply to non-empty SQLite tables, which reject a CURRENT_TIMESTAMP default.
+"""
+from sqlalchemy import inspect, text
+
+VERSION = 1
+
+TABLES = ['users', 'places', 'reviews', 'amenities']
+
+
+def upgrade(connection):
+    inspector = inspect(connection)
+    for table in TABLES:
+        columns = {column['name'] for column in inspector.get_columns(table)}
+        for column in ('created_at', 'updated_at'):
+            if column not in columns:
+                connection.execute(text(
+                    f"ALTER TABLE {table} ADD COLUMN {column} TIMESTAMP"
+                ))
+                connection.execute(text(
+                    f"UPDATE {table} SET {column} = CURRENT_TIMESTAMP "
+                    f"WHERE {column} IS NULL"
+                ))
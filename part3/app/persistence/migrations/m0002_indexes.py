@@ -0,0 +1,28 @@
+"""
+Index the foreign keys and the keyset pagination order of every table.
+"""
+from sqlalchemy import text
+
+VERSION = 2
+
+INDEXES = [
+    ('ix_users_created_at_id', 'users', 'created_at, id'),
+    ('ix_places_created_at_id', 'places', 'created_at, id'),
+    ('ix_reviews_created_at_id', 'reviews', 'created_at, id'),
+    ('ix_amenities_created_at_id', 'amenities', 'created_at, id'),
+    ('ix_places_title', 'places', 'title'),
+    ('ix_places_owner_id', 'places', 'owner_id, created_at, id'),
+    ('ix_reviews_place_id', 'reviews', 'place_id, created_at, id'),
+    ('ix_reviews_user_id', 'reviews', 'user_id, created_at, id'),
+    ('ix_place_amenity_amenity_id', 'place_amenity', 'amenity_id, place_id'),
+]
+
+
+def upgrade(connection):
+    # Postgres can build the indexes without blocking writes; SQLite has no
+    # such option, but each index is built in its own short transaction
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    for name, table, columns in INDEXES:
+        connection.execute(text(
+            f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})"
+        ))
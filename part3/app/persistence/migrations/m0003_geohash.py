@@ -0,0 +1,37 @@
+"""
+Add the geohash column of Place, backfill it and index it for the
+proximity search.
+"""
+from sqlalchemy import inspect, text
+from app.geo import encode_geohash
+
+VERSION = 3
+
+BATCH_SIZE = 1000
+
+
+def upgrade(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('places')}
+    if 'geohash' not in columns:
+        connection.execute(text("ALTER TABLE places ADD COLUMN geohash VARCHAR(12)"))
+
+    # Backfill in short batches so writers are never blocked for long
+    while True:
+        rows = connection.execute(text(
+            "SELECT id, latitude, longitude FROM places "
+            "WHERE geohash IS NULL AND latitude IS NOT NULL "
+            "AND longitude IS NOT NULL LIMIT :limit"
+        ), {'limit': BATCH_SIZE}).all()
+        if not rows:
+            break
+        connection.execute(
+            text("UPDATE places SET geohash = :geohash WHERE id = :id"),
+            [{'id': place_id, 'geohash': encode_geohash(latitude, longitude)}
+             for place_id, latitude, longitude in rows]
+        )
+
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    connection.execute(text(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS ix_places_geohash "
+        "ON places (geohash, latitude, longitude, id)"
+    ))
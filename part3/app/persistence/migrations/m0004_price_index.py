@@ -0,0 +1,14 @@
+"""
+Index the price of places for the price range filters of the listing.
+"""
+from sqlalchemy import text
+
+VERSION = 4
+
+
+def upgrade(connection):
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    connection.execute(text(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS ix_places_price "
+        "ON places (price, created_at, id)"
+    ))
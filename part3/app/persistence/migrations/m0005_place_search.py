@@ -0,0 +1,11 @@
+"""
+Add the full-text search index of places and index the existing ones.
+"""
+from app.persistence import search
+
+VERSION = 5
+
+
+def upgrade(connection):
+    search.install(connection, concurrently=True)
+    search.rebuild(connection)
@@ -0,0 +1,30 @@
+"""
+Add the review count and rating sum of places, fill them from the existing
+reviews and index the average rating for the rating-sorted listing.
+"""
+from sqlalchemy import inspect, text
+
+VERSION = 6
+
+
+def upgrade(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('places')}
+    for column in ('review_count', 'rating_sum'):
+        if column not in columns:
+            connection.execute(text(
+                f"ALTER TABLE places ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+
+    connection.execute(text(
+        "UPDATE places SET "
+        "review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.place_id = places.id), "
+        "rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews "
+        "WHERE reviews.place_id = places.id)"
+    ))
+
+    # Must stay identical to the expression of Place.average_rating
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    connection.execute(text(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS ix_places_average_rating ON places "
+        "((CASE WHEN (review_count > 0) "
+        "THEN CAST(rating_sum AS FLOAT) / (review_count + 0.0) ELSE 0 END), id)"
+    ))
@@ -0,0 +1,17 @@
+"""
+Index updated_at on every table for the conditional GETs of the listings.
+"""
+from sqlalchemy import text
+
+VERSION = 7
+
+TABLES = ['users', 'places', 'reviews', 'amenities']
+
+
+def upgrade(connection):
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    for table in TABLES:
+        connection.execute(text(
+            f"CREATE INDEX {concurrently}IF NOT EXISTS ix_{table}_updated_at "
+            f"ON {table} (updated_at)"
+        ))
@@ -0,0 +1,27 @@
+"""
+Create the token_revocations table of the access token blocklist.
+"""
+from sqlalchemy import text
+
+VERSION = 8
+
+
+def upgrade(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS token_revocations ("
+        "id VARCHAR(36) NOT NULL PRIMARY KEY, "
+        "created_at TIMESTAMP, "
+        "updated_at TIMESTAMP, "
+        "key VARCHAR(80) NOT NULL UNIQUE, "
+        "revoked_before INTEGER, "
+        "expires_at TIMESTAMP NOT NULL)"
+    ))
+    concurrently = 'CONCURRENTLY ' if connection.dialect.name == 'postgresql' else ''
+    connection.execute(text(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS ix_token_revocations_created_at_id "
+        "ON token_revocations (created_at, id)"
+    ))
+    connection.execute(text(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS ix_token_revocations_updated_at "
+        "ON token_revocations (updated_at)"
+    ))
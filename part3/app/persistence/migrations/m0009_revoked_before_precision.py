@@ -0,0 +1,20 @@
+"""
+Store the revoked_before times of token_revocations with sub-second
+precision.
+"""
+from sqlalchemy import text
+
+VERSION = 9
+
+
+def upgrade(connection):
+    # SQLite keeps the fractional part in an INTEGER column as it is
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text(
+            "ALTER TABLE token_revocations "
+            "ALTER COLUMN revoked_before TYPE DOUBLE PRECISION"
+        ))
+    elif connection.dialect.name == 'mysql':
+        connection.execute(text(
+            "ALTER TABLE token_revocations MODIFY revoked_before DOUBLE"
+        ))
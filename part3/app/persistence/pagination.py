@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(values):
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+    """
+    raw = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    payload = json.dumps(raw, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def _load_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor back into its sort key.
+    """
+    try:
+        created_at, obj_id = _load_cursor(cursor)
+        if created_at is not None:
+            created_at = datetime.fromisoformat(created_at)
+        if not isinstance(obj_id, str):
+            raise TypeError(obj_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return created_at, obj_id
+
+
+def decode_rank_cursor(cursor):
+    """
+    Decode a cursor of a ranked listing, whose sort key is (score, id).
+    """
+    try:
+        score, obj_id = _load_cursor(cursor)
+        if not isinstance(score, (int, float)) or not isinstance(obj_id, str):
+            raise TypeError(obj_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return float(score), obj_id
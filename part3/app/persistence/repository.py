@@ -1,9 +1,19 @@
 from abc import ABC, abstractmethod
 from app.models.user import User
-from app.models.place import Place
+from app.models.place import Place, place_amenity
 from app.models.amenity import Amenity
 from app.models.review import Review
+from app.models.token_revocation import TokenRevocation
 from app import db
+from app.persistence.pagination import encode_cursor, decode_cursor, decode_rank_cursor
+from app.persistence import search, cache
+from app.persistence.unit_of_work import commit
+from datetime import datetime
+from sqlalchemy import and_, or_, insert, select, update, func, inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.util import identity_key
+
+cache.install(db.session)
 
 class Repository(ABC):
     @abstractmethod
@@ -18,6 +28,10 @@ class Repository(ABC):
     def get_all(self):
         pass
 
+    @abstractmethod
+    def get_page(self, limit, cursor=None):
+        pass
+
     @abstractmethod
     def update(self, obj_id, data):
         pass
@@ -36,6 +50,9 @@ class SQLAlchemyRepository(Repository):
     SQLAlchemy implementation of the Repository.
     """
 
+    IN_CHUNK_SIZE = 500
+    BULK_CHUNK_SIZE = 1000
+
     def __init__(self, model):
         """
         Initialize the repository with the model to use.
@@ -47,13 +64,59 @@ class SQLAlchemyRepository(Repository):
         Add an object to the database.
         """
         db.session.add(obj)
-        db.session.commit()
+        commit()
+
+    def bulk_add(self, mappings):
+        """
+        Insert rows given as dictionaries of column attributes, as
+        executemany batches that skip the per-object unit of work.
+        """
+        for start in range(0, len(mappings), self.BULK_CHUNK_SIZE):
+            db.session.execute(insert(self.model),
+                               mappings[start:start + self.BULK_CHUNK_SIZE])
+        commit()
+
+    def _cache_key(self, obj_id):
+        return f"{self.model.__tablename__}:{obj_id}"
+
+    def _attribute_cache_key(self, attr_name, attr_value):
+        return f"{self.model.__tablename__}:{attr_name}={attr_value}"
 
     def get(self, obj_id):
         """
-        Get an object from the database by its ID.
+        Get an object from the database by its ID, through the cache.
+        """
+        entity_cache = cache.get_cache()
+        if entity_cache is None or obj_id is None:
+            return db.session.query(self.model).get(obj_id)
+        obj = db.session.identity_map.get(identity_key(self.model, obj_id))
+        if obj is not None and not inspect(obj).expired:
+            return obj
+        values = entity_cache.get(self._cache_key(obj_id))
+        if values is not None:
+            return cache.restore(db.session, self.model, values)
+        obj = db.session.query(self.model).get(obj_id)
+        if obj is not None:
+            entity_cache.set(self._cache_key(obj_id), cache.snapshot(obj))
+        return obj
+
+    def get_uncached(self, obj_id, for_update=False):
+        """
+        Get an object from the database itself, skipping the entity cache,
+        for reads that must see the writes of other processes at once.
+        With for_update, its row is also locked until the transaction ends,
+        where the database supports it.
         """
-        return db.session.query(self.model).get(obj_id)
+        query = db.session.query(self.model).filter_by(id=obj_id)
+        if for_update:
+            query = query.with_for_update()
+        return query.execution_options(populate_existing=True).first()
+
+    def invalidate(self, obj_id):
+        """
+        Drop the cached copy of an object written outside of update().
+        """
+        cache.invalidate(db.session, self._cache_key(obj_id))
 
     def get_all(self):
         """
@@ -61,7 +124,69 @@ class SQLAlchemyRepository(Repository):
         """
         return db.session.query(self.model).all()
 
-    def update(self, obj_id, **data):
+    def get_many(self, obj_ids):
+        """
+        Get the objects matching a list of IDs, in as few queries as the
+        database's bound parameter limit allows.
+        """
+        obj_ids = list(obj_ids)
+        objs = []
+        for start in range(0, len(obj_ids), self.IN_CHUNK_SIZE):
+            chunk = obj_ids[start:start + self.IN_CHUNK_SIZE]
+            objs.extend(db.session.query(self.model)
+                        .filter(self.model.id.in_(chunk))
+                        .all())
+        return objs
+
+    def _after_cursor(self, query, cursor):
+        """
+        Restrict a query to the rows that come after a cursor in
+        (created_at, id) order.
+        """
+        if not cursor:
+            return query
+        created_at, obj_id = decode_cursor(cursor)
+        return query.filter(or_(
+            self.model.created_at > created_at,
+            and_(self.model.created_at == created_at,
+                 self.model.id > obj_id)
+        ))
+
+    def get_page(self, limit, cursor=None, query=None):
+        """
+        Get one page of objects ordered by (created_at, id).
+
+        Returns the objects and the cursor of the next page, which is None
+        once the last page has been reached.
+        """
+        if query is None:
+            query = db.session.query(self.model)
+        query = self._after_cursor(query, cursor)
+        items = (query.order_by(self.model.created_at, self.model.id)
+                 .limit(limit + 1)
+                 .all())
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor([last.created_at, last.id])
+        return items, next_cursor
+
+    def iter_all(self, cursor=None, query=None, batch_size=1000):
+        """
+        Iterate over every object in (created_at, id) order, starting after
+        the given cursor. Rows are fetched in batches through a server-side
+        cursor where the database supports it, so memory use does not grow
+        with the size of the table.
+        """
+        if query is None:
+            query = select(self.model)
+        query = self._after_cursor(query, cursor)
+        return db.session.scalars(
+            query.order_by(self.model.created_at, self.model.id)
+            .execution_options(stream_results=True, yield_per=batch_size))
+
+    def update(self, obj_id, data):
         """
         Update an object in the database.
         """
@@ -69,7 +194,8 @@ class SQLAlchemyRepository(Repository):
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            commit()
+            self.invalidate(obj_id)
 
     def delete(self, obj_id):
         """
@@ -78,13 +204,62 @@ class SQLAlchemyRepository(Repository):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            commit()
+            self.invalidate(obj_id)
 
     def get_by_attribute(self, attr_name, attr_value):
         """
         Get an object from the database by a specific attribute.
+
+        The cache maps the value to the id of the object, and the value of
+        the object found is checked again since it may have changed.
+        """
+        entity_cache = cache.get_cache()
+        if entity_cache is not None:
+            key = self._attribute_cache_key(attr_name, attr_value)
+            obj_id = entity_cache.get(key)
+            if obj_id is not None:
+                obj = self.get(obj_id)
+                if obj is not None and getattr(obj, attr_name) == attr_value:
+                    return obj
+                entity_cache.delete(key)
+        obj = db.session.query(self.model).filter_by(**{attr_name: attr_value}).first()
+        if entity_cache is not None and obj is not None:
+            entity_cache.set(key, obj.id)
+            entity_cache.set(self._cache_key(obj.id), cache.snapshot(obj))
+        return obj
+
+    def get_existing_values(self, attr_name, values):
+        """
+        Get the subset of values already taken by the given attribute.
+        """
+        column = getattr(self.model, attr_name)
+        values = list(values)
+        existing = set()
+        for start in range(0, len(values), self.IN_CHUNK_SIZE):
+            chunk = values[start:start + self.IN_CHUNK_SIZE]
+            existing.update(value for value, in db.session.query(column)
+                            .filter(column.in_(chunk)))
+        return existing
+
+    def get_watermark(self, query=None):
+        """
+        Get the (row count, latest updated_at) of the table, which changes
+        whenever a row is added, updated or deleted.
+        """
+        if query is None:
+            query = db.session.query(self.model)
+        return tuple(query.with_entities(func.count(self.model.id),
+                                         func.max(self.model.updated_at)).one())
+
+    def iter_values(self, attr_name):
         """
-        return db.session.query(self.model).filter_by(**{attr_name: attr_value}).first()
+        Stream the (id, value) pairs of one attribute over the whole table.
+        """
+        return db.session.execute(
+            select(self.model.id, getattr(self.model, attr_name))
+            .execution_options(yield_per=self.BULK_CHUNK_SIZE)
+        )
 
 class PlaceRepository(SQLAlchemyRepository):
     """
@@ -97,11 +272,203 @@ class PlaceRepository(SQLAlchemyRepository):
         """
         super().__init__(Place)
 
+    def get_page(self, limit, cursor=None, query=None):
+        """
+        Get one page of places with their amenities loaded in one query.
+        """
+        if query is None:
+            query = db.session.query(self.model)
+        query = query.options(selectinload(self.model.amenities))
+        return super().get_page(limit, cursor, query)
+
+    def get_top_rated_page(self, limit, cursor=None, query=None):
+        """
+        Get one page of places ordered by average rating, best first, read
+        backwards from the average rating index.
+        """
+        if query is None:
+            query = db.session.query(self.model)
+        average = self.model.average_rating
+        if cursor:
+            score, place_id = decode_rank_cursor(cursor)
+            query = query.filter(or_(
+                average < score,
+                and_(average == score, self.model.id < place_id)
+            ))
+        items = (query.options(selectinload(self.model.amenities))
+                 .order_by(average.desc(), self.model.id.desc())
+                 .limit(limit + 1)
+                 .all())
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor([last.average_rating, last.id])
+        return items, next_cursor
+
+    def adjust_rating(self, place_id, count_delta, sum_delta):
+        """
+        Add to the review count and rating sum of a place in one atomic
+        UPDATE, so that concurrent reviews cannot overwrite each other.
+        """
+        db.session.execute(
+            update(self.model)
+            .where(self.model.id == place_id)
+            .values({
+                self.model._review_count: self.model._review_count + count_delta,
+                self.model._rating_sum: self.model._rating_sum + sum_delta,
+                self.model.updated_at: datetime.utcnow(),
+            })
+        )
+        commit()
+        self.invalidate(place_id)
+
+    def rebuild_rating_stats(self):
+        """
+        Recompute the rating aggregates of every place from its reviews and
+        return the number of places whose aggregates had drifted.
+        """
+        count = (select(func.count(Review.id))
+                 .where(Review._place_id == self.model.id)
+                 .scalar_subquery())
+        total = (select(func.coalesce(func.sum(Review._rating), 0))
+                 .where(Review._place_id == self.model.id)
+                 .scalar_subquery())
+        result = db.session.execute(
+            update(self.model)
+            .where(or_(self.model._review_count != count,
+                       self.model._rating_sum != total))
+            .values({
+                self.model._review_count: count,
+                self.model._rating_sum: total,
+                self.model.updated_at: datetime.utcnow(),
+            })
+            .execution_options(synchronize_session=False)
+        )
+        commit()
+        entity_cache = cache.get_cache()
+        if entity_cache is not None and result.rowcount:
+            entity_cache.clear()
+        return result.rowcount
+
+    def filter_places(self, min_price=None, max_price=None, amenity_ids=(),
+                      place_ids=None):
+        """
+        Build a query for the places within a price range that have every
+        given amenity, optionally restricted to a set of place ids.
+
+        Each amenity becomes a semi-join served by the amenity index of the
+        association table, so the filters combine with keyset pagination
+        without loading the links.
+        """
+        query = db.session.query(self.model)
+        if place_ids is not None:
+            query = query.filter(self.model.id.in_(place_ids))
+        if min_price is not None:
+            query = query.filter(self.model._price >= min_price)
+        if max_price is not None:
+            query = query.filter(self.model._price <= max_price)
+        for amenity_id in amenity_ids:
+            query = query.filter(self.model.id.in_(
+                select(place_amenity.c.place_id)
+                .where(place_amenity.c.amenity_id == amenity_id)
+            ))
+        return query
+
+    def iter_all(self, cursor=None, query=None, batch_size=1000):
+        """
+        Iterate over every place, loading the amenities of each batch in
+        one query.
+        """
+        if query is None:
+            query = select(self.model)
+        query = query.options(selectinload(self.model.amenities))
+        return super().iter_all(cursor, query, batch_size)
+
+    def get_place_with_details(self, place_id):
+        """
+        Get a place with its owner and amenities, in two queries.
+        """
+        return (db.session.query(self.model)
+                .options(joinedload(self.model.owner),
+                         selectinload(self.model.amenities))
+                .filter(self.model.id == place_id)
+                .first())
+
     def get_place_by_title(self, title):
         """
         Get a place from the database by a specific title.
         """
-        return self.model.query.filter_by(title = title).first()
+        return self.get_by_attribute('title', title)
+
+    def get_location_candidates(self, cells, south, north):
+        """
+        Get the (id, latitude, longitude) of the places lying in the given
+        geohash cells and latitude band, using range scans on the covering
+        geohash index.
+        """
+        geohash = self.model._geohash
+        in_cells = or_(*(and_(geohash >= cell, geohash < cell + '{')
+                         for cell in cells))
+        return (db.session.query(self.model.id,
+                                 self.model._latitude,
+                                 self.model._longitude)
+                .filter(in_cells,
+                        self.model._latitude.between(south, north))
+                .all())
+
+    def search(self, query, limit, cursor=None):
+        """
+        Get one page of the places matching every word of a query, best
+        ranked first, and the cursor of the next page.
+        """
+        terms = search.search_terms(query)
+        if not terms:
+            return [], None
+        after = decode_rank_cursor(cursor) if cursor else None
+        statement, params = search.search_statement(
+            db.engine.dialect.name, terms, after, limit + 1)
+        rows = db.session.execute(statement, params).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1].score, rows[-1].id])
+        places = {place.id: place for place in
+                  db.session.query(self.model)
+                  .options(selectinload(self.model.amenities))
+                  .filter(self.model.id.in_([row.id for row in rows]))}
+        return [places[row.id] for row in rows], next_cursor
+
+    def get_amenity_links(self):
+        """
+        Stream every (place_id, amenity_id) pair of the association table.
+        """
+        return db.session.execute(
+            select(place_amenity.c.place_id, place_amenity.c.amenity_id)
+            .execution_options(yield_per=self.BULK_CHUNK_SIZE)
+        )
+
+    def get_amenity_changes(self, since):
+        """
+        Get the (place_id, amenity_id) pairs of the places changed at or
+        after since, with a None amenity_id for those without amenities.
+        """
+        return db.session.execute(
+            select(self.model.id, place_amenity.c.amenity_id)
+            .outerjoin(place_amenity, place_amenity.c.place_id == self.model.id)
+            .where(self.model.updated_at >= since)
+        ).all()
+
+    def add_amenity_links(self, links):
+        """
+        Insert (place_id, amenity_id) pairs into the association table.
+        """
+        rows = [{'place_id': place_id, 'amenity_id': amenity_id}
+                for place_id, amenity_id in links]
+        for start in range(0, len(rows), self.BULK_CHUNK_SIZE):
+            db.session.execute(place_amenity.insert(),
+                               rows[start:start + self.BULK_CHUNK_SIZE])
+        commit()
 
 class ReviewRepository(SQLAlchemyRepository):
     """
@@ -116,9 +483,32 @@ class ReviewRepository(SQLAlchemyRepository):
 
     def get_reviews_by_place(self, place_id):
         """
-        Get a review from the database by a place.
+        Get the reviews of a place, oldest first.
         """
-        return self.model.query.filter_by(place_id = place_id).all()
+        return (self.model.query.filter_by(place_id = place_id)
+                .order_by(self.model.created_at, self.model.id)
+                .all())
+
+    def get_reviewed_place_ids(self, user_id, place_ids):
+        """
+        Get the subset of the given places already reviewed by a user.
+        """
+        place_ids = list(place_ids)
+        reviewed = set()
+        for start in range(0, len(place_ids), self.IN_CHUNK_SIZE):
+            chunk = place_ids[start:start + self.IN_CHUNK_SIZE]
+            reviewed.update(place_id for place_id, in
+                            db.session.query(self.model._place_id)
+                            .filter(self.model._user_id == user_id,
+                                    self.model._place_id.in_(chunk)))
+        return reviewed
+
+    def get_reviews_by_user(self, user_id, limit, cursor=None):
+        """
+        Get one page of the reviews written by a user, oldest first.
+        """
+        return self.get_page(limit, cursor,
+                             self.model.query.filter_by(user_id = user_id))
 
 class AmenityRepository(SQLAlchemyRepository):
     """
@@ -136,4 +526,65 @@ class UserRepository(SQLAlchemyRepository):
         super().__init__(User)
     
     def get_user_by_email(self, email):
-        return self.model.query.filter_by(email=email).first()
\ No newline at end of file
+        return self.get_by_attribute('email', email)
+
+
+class TokenRevocationRepository(SQLAlchemyRepository):
+    """
+    Repository for TokenRevocation objects.
+    """
+
+    def __init__(self):
+        """
+        Initialize the repository with the TokenRevocation model.
+        """
+        super().__init__(TokenRevocation)
+
+    def revoke(self, key, expires_at, revoked_before=None):
+        """
+        Record a revocation, or move the revoked_before and expiry of the
+        one already recorded under the same key.
+        """
+        existing = self.get_by_key(key)
+        if existing is None:
+            self.add(self.model(key=key, expires_at=expires_at,
+                                revoked_before=revoked_before))
+        else:
+            self.update(existing.id, {
+                'expires_at': max(existing.expires_at, expires_at),
+                'revoked_before': revoked_before,
+            })
+
+    def get_by_key(self, key):
+        """
+        Get the revocation recorded under a key from the database itself,
+        never from the entity cache, so that a revocation written by
+        another process takes effect at once.
+        """
+        return (db.session.query(self.model).filter_by(key=key)
+                .execution_options(populate_existing=True).first())
+
+    def get_keys_since(self, since, now):
+        """
+        Get the (key, updated_at) of the revocations still in force that
+        changed at or after since, or of all of them when since is None.
+        """
+        query = (db.session.query(self.model.key, self.model.updated_at)
+                 .filter(self.model.expires_at > now))
+        if since is not None:
+            query = query.filter(self.model.updated_at >= since)
+        return query.all()
+
+    def delete_expired(self, now):
+        """
+        Delete the revocations of tokens that have all expired and return
+        how many were deleted.
+        """
+        deleted = (db.session.query(self.model)
+                   .filter(self.model.expires_at <= now)
+                   .delete(synchronize_session=False))
+        commit()
+        entity_cache = cache.get_cache()
+        if entity_cache is not None and deleted:
+            entity_cache.clear()
+        return deleted
@@ -0,0 +1,128 @@
+"""
+Full-text search over place titles and descriptions.
+
+On SQLite the places are indexed by an external-content FTS5 table kept in
+sync by triggers and ranked with bm25. On Postgres a generated tsvector
+column carries the same text, weighted the same way, under a GIN index and
+is ranked with ts_rank. Either way the database keeps the index current on
+every write, including the bulk inserts that bypass the ORM.
+
+The objects are created with the places table by db.create_all() and added
+to existing databases by a migration.
+"""
+import re
+from sqlalchemy import event, text
+from app.models.place import Place
+
+# The title weighs more than the description in the ranking
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5("
+    "title, description, content='places', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_insert AFTER INSERT ON places BEGIN "
+    "INSERT INTO places_fts (rowid, title, description) "
+    "VALUES (new.rowid, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_delete AFTER DELETE ON places BEGIN "
+    "INSERT INTO places_fts (places_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_update "
+    "AFTER UPDATE OF title, description ON places BEGIN "
+    "INSERT INTO places_fts (places_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "INSERT INTO places_fts (rowid, title, description) "
+    "VALUES (new.rowid, new.title, new.description); END",
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE places ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX {concurrently}IF NOT EXISTS ix_places_search "
+    "ON places USING GIN (search_vector)",
+]
+
+SQLITE_SEARCH = (
+    "SELECT places.id AS id, "
+    f"bm25(places_fts, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score "
+    "FROM places_fts JOIN places ON places.rowid = places_fts.rowid "
+    "WHERE places_fts MATCH :query"
+)
+
+# ts_rank grows with relevance, bm25 shrinks: negate it so that both
+# databases sort the best matches first in ascending order. The weights
+# array is {D, C, B, A}, with the title weighted A and the description B.
+POSTGRES_SEARCH = (
+    "SELECT places.id AS id, "
+    "-ts_rank('{0.1, 0.1, 0.1, 1.0}', search_vector, query) AS score "
+    "FROM places, plainto_tsquery('simple', :query) AS query "
+    "WHERE search_vector @@ query"
+)
+
+
+def install(connection, concurrently=False):
+    """
+    Create the search table and triggers, or column and index, if missing.
+    """
+    if connection.dialect.name == 'postgresql':
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement.format(
+                concurrently='CONCURRENTLY ' if concurrently else '')))
+    elif connection.dialect.name == 'sqlite':
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+
+
+def rebuild(connection):
+    """
+    Reindex every existing place. Postgres computes its column by itself.
+    """
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text("INSERT INTO places_fts (places_fts) VALUES ('rebuild')"))
+
+
+def uninstall(connection):
+    """
+    Drop the FTS5 table, which SQLite does not drop along with places.
+    """
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text("DROP TABLE IF EXISTS places_fts"))
+
+
+def search_terms(query):
+    """
+    Split a user query into words, dropping any search operator syntax.
+    """
+    return re.findall(r'\w+', query)
+
+
+def search_statement(dialect_name, terms, after=None, limit=None):
+    """
+    Build the statement returning (id, score) of the places matching every
+    term, best first, after the (score, id) of the last row of a page.
+    """
+    if dialect_name == 'postgresql':
+        ranked, query = POSTGRES_SEARCH, ' '.join(terms)
+    else:
+        # Quoted terms are plain words to FTS5, never operators
+        ranked, query = SQLITE_SEARCH, ' '.join(f'"{term}"' for term in terms)
+    sql = f"SELECT id, score FROM ({ranked}) AS ranked"
+    params = {'query': query, 'limit': limit}
+    if after is not None:
+        sql += " WHERE score > :score OR (score = :score AND id > :id)"
+        params['score'], params['id'] = after
+    sql += " ORDER BY score, id LIMIT :limit"
+    return text(sql), params
+
+
+@event.listens_for(Place.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    install(connection)
+
+
+@event.listens_for(Place.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    uninstall(connection)
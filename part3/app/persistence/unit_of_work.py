@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+from app import db
+
+DEPTH_KEY = 'unit_of_work_depth'
+AFTER_COMMIT_KEY = 'unit_of_work_after_commit'
+
+
+def in_unit_of_work():
+    """
+    Tell whether a unit of work is open on the current session.
+    """
+    return db.session.info.get(DEPTH_KEY, 0) > 0
+
+
+def commit():
+    """
+    Commit the current session, or only flush it while a unit of work is
+    open so that the writes are committed together when it closes.
+    """
+    if in_unit_of_work():
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def after_commit(callback):
+    """
+    Call callback once the writes made so far are committed: at once
+    outside of a unit of work, else when the outermost one commits. It is
+    dropped if the unit of work rolls back, so that in-process state such
+    as the search indexes never holds rows the database does not have.
+    """
+    if in_unit_of_work():
+        db.session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+    else:
+        callback()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Group every repository write made inside the block into one commit.
+
+    Units of work can be nested; only the outermost one commits. If the
+    block raises, the whole unit of work is rolled back.
+    """
+    session = db.session
+    depth = session.info.get(DEPTH_KEY, 0)
+    session.info[DEPTH_KEY] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except BaseException:
+        if depth == 0:
+            session.rollback()
+            session.info.pop(AFTER_COMMIT_KEY, None)
+        raise
+    finally:
+        session.info[DEPTH_KEY] = depth
+    if depth == 0:
+        for callback in session.info.pop(AFTER_COMMIT_KEY, ()):
+            callback()
@@ -0,0 +1,225 @@
+"""
+Token-bucket rate limiting of the login attempts.
+
+Every client address and every account has a bucket holding up to
+`burst` tokens, refilled at `burst / period` tokens per second. A login
+attempt takes one token from the bucket of its address and needs one
+left in the bucket of the account, both checked before the user is
+looked up, so a rejected attempt costs neither a query nor a bcrypt
+check. Only a failed credential check takes the token of the account,
+so that knowing an email address is not enough to lock its owner out.
+
+Two backends are available, selected with LOGIN_RATE_LIMIT_BACKEND:
+
+- 'memory': buckets held by each worker process, at most
+  LOGIN_RATE_LIMIT_MAX_KEYS of them, the least recently used dropped,
+- 'sqlite': buckets in the SQLite file at LOGIN_RATE_LIMIT_SQLITE_PATH
+  (instance/ratelimit.db by default), shared by every worker of the host.
+
+Set LOGIN_RATE_LIMIT_BACKEND to None to disable the limits.
+LOGIN_LIMIT_PER_IP and LOGIN_LIMIT_PER_ACCOUNT are (burst, period in
+seconds) pairs.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+EXTENSION_KEY = 'login_rate_limiter'
+
+
+def take(tokens, updated_at, now, burst, rate, count=1):
+    """
+    Refill a bucket and take count tokens from it, provided one is there.
+    Return the tokens left and the seconds to wait for the next one, 0
+    when a token was available.
+    """
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - count, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class RateLimiter:
+    """
+    Base class of the backends, counting the allowed and rejected calls.
+    """
+
+    def __init__(self):
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key, burst, period):
+        """
+        Take a token from the bucket of key. Return 0 if one was available,
+        else the seconds until the next one.
+        """
+        wait = self._take(key, burst, burst / period, 1)
+        if wait:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def check(self, key, burst, period):
+        """
+        Like hit(), but leave the token in the bucket.
+        """
+        wait = self._take(key, burst, burst / period, 0)
+        if wait:
+            self.rejected += 1
+        return wait
+
+    def stats(self):
+        return {
+            'backend': type(self).__name__,
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+        }
+
+
+class MemoryRateLimiter(RateLimiter):
+    """
+    Buckets held by this worker process.
+    """
+
+    def __init__(self, max_keys, clock=time.monotonic):
+        super().__init__()
+        self.max_keys = max_keys
+        self.clock = clock
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _take(self, key, burst, rate, count):
+        with self.lock:
+            now = self.clock()
+            tokens, updated_at = self.buckets.get(key, (burst, now))
+            tokens, wait = take(tokens, updated_at, now, burst, rate, count)
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+            return wait
+
+    def stats(self):
+        return dict(super().stats(), keys=len(self.buckets))
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    Buckets in a SQLite file shared by the worker processes of the host.
+    """
+
+    # Drop the buckets that have refilled once every this many calls
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, clock=time.time):
+        super().__init__()
+        self.path = path
+        self.clock = clock
+        self.local = threading.local()
+        self.calls = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+            "updated_at REAL NOT NULL, full_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def _take(self, key, burst, rate, count):
+        connection = self._connection()
+        # IMMEDIATE takes the write lock up front, so that two workers
+        # cannot both read the same bucket before either writes it
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = self.clock()
+            row = connection.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?",
+                (key,)).fetchone()
+            tokens, updated_at = row if row else (burst, now)
+            tokens, wait = take(tokens, updated_at, now, burst, rate, count)
+            connection.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at, full_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "tokens = excluded.tokens, updated_at = excluded.updated_at, "
+                "full_at = excluded.full_at",
+                (key, tokens, now, now + (burst - tokens) / rate))
+            self.calls += 1
+            if self.calls % self.PRUNE_EVERY == 0:
+                connection.execute("DELETE FROM rate_limit_buckets WHERE full_at < ?", (now,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def create_limiter(app):
+    """
+    Create the backend selected by the configuration, or None.
+    """
+    config = app.config
+    backend = config.get('LOGIN_RATE_LIMIT_BACKEND')
+    if backend == 'memory':
+        return MemoryRateLimiter(config.get('LOGIN_RATE_LIMIT_MAX_KEYS', 100000))
+    if backend == 'sqlite':
+        path = config.get('LOGIN_RATE_LIMIT_SQLITE_PATH')
+        if not path:
+            os.makedirs(app.instance_path, exist_ok=True)
+            path = os.path.join(app.instance_path, 'ratelimit.db')
+        return SQLiteRateLimiter(path)
+    if backend:
+        raise ValueError(f"Unknown LOGIN_RATE_LIMIT_BACKEND: {backend}")
+    return None
+
+
+def get_limiter():
+    """
+    Get the login rate limiter of the current app, creating it on first use.
+    """
+    extensions = current_app.extensions
+    if EXTENSION_KEY not in extensions:
+        extensions[EXTENSION_KEY] = create_limiter(current_app)
+    return extensions[EXTENSION_KEY]
+
+
+def _account_key(email):
+    return f"account:{email.strip().lower()}"
+
+
+def login_retry_after(remote_addr, email):
+    """
+    Take a login attempt from the bucket of the client address and check
+    that the account has one left. Return 0 if it may proceed, else the
+    whole seconds to wait.
+    """
+    limiter = get_limiter()
+    if limiter is None:
+        return 0
+    config = current_app.config
+    wait = limiter.hit(f"ip:{remote_addr}", *config.get('LOGIN_LIMIT_PER_IP', (10, 60)))
+    if not wait:
+        wait = limiter.check(_account_key(email),
+                             *config.get('LOGIN_LIMIT_PER_ACCOUNT', (5, 300)))
+    return math.ceil(wait)
+
+
+def login_failed(email):
+    """
+    Take a failed credential check from the bucket of the account.
+    """
+    limiter = get_limiter()
+    if limiter is not None:
+        limiter.hit(_account_key(email),
+                    *current_app.config.get('LOGIN_LIMIT_PER_ACCOUNT', (5, 300)))
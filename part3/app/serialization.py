@@ -0,0 +1,61 @@
+"""
+JSON encoding of the API responses.
+
+orjson is used when it is installed and the standard library otherwise.
+Both encode Decimal as a number, datetime and date in ISO 8601 and UUID
+as a string, so that rows can be returned without converting their
+columns first.
+"""
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def default(value):
+    """
+    Encode the values that JSON has no native type for.
+    """
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(data, indent=False):
+        """
+        Encode data as UTF-8 JSON bytes.
+        """
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=default, option=option)
+else:
+    def dumps(data, indent=False):
+        """
+        Encode data as UTF-8 JSON bytes.
+        """
+        return json.dumps(data, default=default, ensure_ascii=False,
+                          indent=2 if indent else None,
+                          separators=None if indent else (',', ':')).encode('utf-8')
+
+
+def output_json(data, code, headers=None):
+    """
+    Make a JSON response, as the flask-restx representation of
+    application/json.
+    """
+    body = dumps(data, indent=current_app.debug) + b'\n'
+    response = current_app.response_class(body, status=code, mimetype='application/json')
+    response.headers.extend(headers or {})
+    return response
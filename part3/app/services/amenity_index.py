@@ -0,0 +1,223 @@
+"""
+In-process inverted index from amenity id to the places that have it.
+
+Each amenity maps to a roaring-style bitmap of place row numbers: the row
+numbers are split on their upper 16 bits and every chunk that holds at
+least one place is stored as a 65536-bit integer. Intersecting the
+bitmaps of several amenities only ANDs the chunks they have in common, so
+"has all of these amenities" is answered without touching the database.
+
+The index lives in app.extensions, is built lazily from place_amenity on
+first use and is kept current by the facade. Writes made by other
+processes are caught up with at most every AMENITY_INDEX_SYNC_INTERVAL
+seconds, by reloading the links of the places changed since the last
+sync, and the index is rebuilt once older than AMENITY_INDEX_MAX_AGE
+seconds. One request at a time builds or syncs it; the others answer
+from SQL until it is up to date again, so a listing never misses the
+places written elsewhere for longer than the sync interval.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+
+EXTENSION_KEY = 'amenity_index'
+
+# Places are read again from a little before the last sync, so that a
+# place committed after the sync started is not missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class Bitmap:
+    """
+    Set of non-negative integers stored as 16-bit chunks.
+    """
+
+    __slots__ = ('chunks',)
+
+    def __init__(self):
+        self.chunks = {}
+
+    def add(self, n):
+        high, low = n >> 16, n & 0xFFFF
+        self.chunks[high] = self.chunks.get(high, 0) | (1 << low)
+
+    def discard(self, n):
+        high, low = n >> 16, n & 0xFFFF
+        chunk = self.chunks.get(high, 0) & ~(1 << low)
+        if chunk:
+            self.chunks[high] = chunk
+        else:
+            self.chunks.pop(high, None)
+
+    def __contains__(self, n):
+        return bool(self.chunks.get(n >> 16, 0) >> (n & 0xFFFF) & 1)
+
+    def __len__(self):
+        return sum(chunk.bit_count() for chunk in self.chunks.values())
+
+    def __iter__(self):
+        for high in sorted(self.chunks):
+            # Scanning the binary string keeps the loop in C between set
+            # bits, unlike shifting a 65536-bit integer once per member
+            bits = bin(self.chunks[high])[:1:-1]
+            position = bits.find('1')
+            while position >= 0:
+                yield high << 16 | position
+                position = bits.find('1', position + 1)
+
+    @staticmethod
+    def intersection(bitmaps):
+        """
+        Intersect bitmaps, starting from the one with the fewest chunks.
+        """
+        bitmaps = sorted(bitmaps, key=lambda bitmap: len(bitmap.chunks))
+        result = Bitmap()
+        if not bitmaps:
+            return result
+        for high, chunk in bitmaps[0].chunks.items():
+            for other in bitmaps[1:]:
+                chunk &= other.chunks.get(high, 0)
+                if not chunk:
+                    break
+            if chunk:
+                result.chunks[high] = chunk
+        return result
+
+
+class AmenityIndex:
+    """
+    Amenity id to bitmap of place rows, with the place id of each row.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.rows = {}
+        self.place_ids = []
+        self.bitmaps = {}
+        self.watermark = None
+        self.built_at = None
+        self.synced_at = None
+
+    def _row(self, place_id):
+        row = self.rows.get(place_id)
+        if row is None:
+            row = self.rows[place_id] = len(self.place_ids)
+            self.place_ids.append(place_id)
+        return row
+
+    def build(self, links, started):
+        """
+        Replace the content of the index with (place_id, amenity_id) links,
+        read from the database from the given UTC time on.
+        """
+        rows, place_ids, bitmaps = {}, [], {}
+        for place_id, amenity_id in links:
+            row = rows.get(place_id)
+            if row is None:
+                row = rows[place_id] = len(place_ids)
+                place_ids.append(place_id)
+            bitmaps.setdefault(amenity_id, Bitmap()).add(row)
+        # Readers keep the previous content until the new one is complete
+        with self.lock:
+            self.rows, self.place_ids, self.bitmaps = rows, place_ids, bitmaps
+        self.watermark = started
+        self.built_at = self.synced_at = time.monotonic()
+
+    def sync(self, changes, started):
+        """
+        Set the amenities of the places changed since the last sync from
+        (place_id, amenity_id) links, where a None amenity_id stands for a
+        place without any.
+        """
+        amenities = {}
+        for place_id, amenity_id in changes:
+            links = amenities.setdefault(place_id, [])
+            if amenity_id is not None:
+                links.append(amenity_id)
+        for place_id, amenity_ids in amenities.items():
+            self.set_amenities(place_id, amenity_ids)
+        self.watermark = started
+        self.synced_at = time.monotonic()
+
+    def since(self):
+        """
+        Get the time to read the changed places from.
+        """
+        return self.watermark - SYNC_OVERLAP
+
+    def add_links(self, links):
+        """
+        Record new (place_id, amenity_id) links.
+        """
+        with self.lock:
+            for place_id, amenity_id in links:
+                self.bitmaps.setdefault(amenity_id, Bitmap()).add(self._row(place_id))
+
+    def set_amenities(self, place_id, amenity_ids):
+        """
+        Make the index hold exactly the given amenities for a place.
+        """
+        amenity_ids = set(amenity_ids)
+        with self.lock:
+            row = self._row(place_id)
+            for amenity_id, bitmap in self.bitmaps.items():
+                if amenity_id not in amenity_ids:
+                    bitmap.discard(row)
+            for amenity_id in amenity_ids:
+                self.bitmaps.setdefault(amenity_id, Bitmap()).add(row)
+
+    def match(self, amenity_ids, limit=None):
+        """
+        Get the ids of the places that have every given amenity, or None
+        when there are more than limit of them.
+        """
+        with self.lock:
+            bitmaps = [self.bitmaps.get(amenity_id) for amenity_id in amenity_ids]
+            if not all(bitmaps):
+                return []
+            rows = Bitmap.intersection(bitmaps)
+            if limit is not None and len(rows) > limit:
+                return None
+            return [self.place_ids[row] for row in rows]
+
+
+def get_index():
+    """
+    Get the index of the current app if it has been built, else None.
+    """
+    index = current_app.extensions.get(EXTENSION_KEY)
+    return index if index is not None and index.built_at is not None else None
+
+
+def load_index(load_links, load_changes):
+    """
+    Get the index of the current app, building it from load_links() when
+    it is missing or too old, and bringing it up to date with
+    load_changes(since) when a sync is due.
+
+    Returns None when the index is disabled, or when it is not up to date
+    and another request is already building or syncing it.
+    """
+    config = current_app.config
+    if not config.get('AMENITY_INDEX', True):
+        return None
+    index = current_app.extensions.setdefault(EXTENSION_KEY, AmenityIndex())
+    now = time.monotonic()
+    rebuild = (index.built_at is None
+               or now - index.built_at > config.get('AMENITY_INDEX_MAX_AGE', 300))
+    due = rebuild or now - index.synced_at > config.get('AMENITY_INDEX_SYNC_INTERVAL', 2)
+    if not due:
+        return index
+    if not index.refresh_lock.acquire(blocking=False):
+        return None
+    try:
+        started = datetime.utcnow()
+        if rebuild:
+            index.build(load_links(), started)
+        else:
+            index.sync(load_changes(index.since()), started)
+    finally:
+        index.refresh_lock.release()
+    return index
@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import inspect
+
+CHUNK_SIZE = 1000
+
+# Types accepted for the fields of bulk items, with how errors name them
+STRING = ((str,), 'a string')
+NUMBER = ((int, float), 'a number')
+INTEGER = ((int,), 'an integer')
+
+
+def chunked(iterable, size=CHUNK_SIZE):
+    """
+    Split an iterable into lists of at most `size` items, lazily, so that
+    streamed input is never held in memory as a whole.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def build(model, data, fields):
+    """
+    Build a transient object, validated by the model's hybrid property
+    setters, and check that every required column has a value.
+
+    fields maps the public input fields to their type. No other field is
+    accepted, so that an item can neither set a column behind its setter
+    nor a read-only property, and the types are checked before the setters
+    compare or measure the values.
+    """
+    unknown = sorted(key for key in data if key not in fields)
+    if unknown:
+        raise ValueError(f"Unknown field: {', '.join(map(str, unknown))}")
+    for key, value in data.items():
+        types, name = fields[key]
+        if isinstance(value, bool) or not isinstance(value, types):
+            raise ValueError(f"{key} must be {name}")
+    obj = model(**data)
+    for prop in inspect(model).column_attrs:
+        column = prop.columns[0]
+        if (not column.nullable and column.default is None
+                and getattr(obj, prop.key) is None):
+            raise ValueError(f"Missing required field: {prop.key.lstrip('_')}")
+    return obj
+
+
+def to_mapping(obj, now):
+    """
+    Turn a transient object into the row dictionary used by bulk inserts,
+    filling in the defaults of BaseModel.
+    """
+    mapping = {prop.key: getattr(obj, prop.key)
+               for prop in inspect(type(obj)).column_attrs}
+    mapping.update(id=str(uuid.uuid4()), created_at=now, updated_at=now)
+    return mapping
+
+
+def bulk_create(items, build_item, check_chunk, insert_chunk):
+    """
+    Validate and insert items chunk by chunk and return one result per item.
+
+    build_item(data) returns a validated object or raises ValueError,
+    check_chunk(objs) returns an error message or None for each object
+    using set-based queries, and insert_chunk(mappings, objs) writes the
+    accepted objects.
+    """
+    results = []
+    for chunk in chunked(enumerate(items)):
+        chunk_results = {}
+        built = []
+        for index, data in chunk:
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError("Each item must be a JSON object")
+                built.append((index, build_item(data)))
+            except ValueError as e:
+                chunk_results[index] = {'index': index, 'status': 400, 'error': str(e)}
+            except (TypeError, AttributeError):
+                # Not a message meant for clients
+                chunk_results[index] = {'index': index, 'status': 400,
+                                        'error': 'Invalid input data'}
+
+        errors = check_chunk([obj for _, obj in built]) if built else []
+        now = datetime.utcnow()
+        accepted = []
+        for (index, obj), error in zip(built, errors):
+            if error:
+                chunk_results[index] = {'index': index, 'status': 400, 'error': error}
+            else:
+                accepted.append((index, obj, to_mapping(obj, now)))
+
+        if accepted:
+            insert_chunk([mapping for _, _, mapping in accepted],
+                         [obj for _, obj, _ in accepted])
+        for index, _, mapping in accepted:
+            chunk_results[index] = {'index': index, 'status': 201, 'id': mapping['id']}
+        results.extend(chunk_results[index] for index, _ in chunk)
+    return results
@@ -0,0 +1,61 @@
+from app.persistence.pagination import encode_cursor
+from app.serialization import dumps
+
+
+def serialize_user(user):
+    return {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email,
+        'is_admin': user.is_admin,
+        'created_at': user.created_at,
+        'updated_at': user.updated_at
+    }
+
+
+def serialize_place(place):
+    return {
+        'id': place.id,
+        'title': place.title,
+        'description': place.description,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'owner_id': place.owner_id,
+        'amenities': [amenity.id for amenity in place.amenities],
+        'created_at': place.created_at,
+        'updated_at': place.updated_at
+    }
+
+
+def serialize_review(review):
+    return {
+        'id': review.id,
+        'text': review.text,
+        'rating': review.rating,
+        'place_id': review.place_id,
+        'user_id': review.user_id,
+        'created_at': review.created_at,
+        'updated_at': review.updated_at
+    }
+
+
+def serialize_amenity(amenity):
+    return {
+        'id': amenity.id,
+        'name': amenity.name,
+        'created_at': amenity.created_at,
+        'updated_at': amenity.updated_at
+    }
+
+
+def to_ndjson(objs, serialize):
+    """
+    Turn objects into NDJSON lines, one at a time. Each line carries the
+    cursor to resume the export from right after it.
+    """
+    for obj in objs:
+        row = serialize(obj)
+        row['cursor'] = encode_cursor([obj.created_at, obj.id])
+        yield dumps(row).decode('utf-8') + '\n'
@@ -1,8 +1,27 @@
-from app.persistence.repository import UserRepository, AmenityRepository, PlaceRepository, ReviewRepository
+import heapq
+import time
+from datetime import datetime
+from flask import current_app
+from app.persistence.repository import (UserRepository, AmenityRepository, PlaceRepository,
+                                        ReviewRepository, TokenRevocationRepository)
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
+from app.services.loader import EntityLoader
+from app.persistence.unit_of_work import after_commit, unit_of_work
+from app.persistence.cache import get_cache
+from app.passwords import get_hasher
+from app.ratelimit import get_limiter
+from app.services.bulk import build, bulk_create, STRING, NUMBER, INTEGER
+from app.services import export, amenity_index, suggest, revocation
+from app import geo
+
+# The fields accepted in bulk items, as by the single item endpoints
+PLACE_FIELDS = {'title': STRING, 'description': STRING, 'price': NUMBER,
+                'latitude': NUMBER, 'longitude': NUMBER, 'owner_id': STRING}
+AMENITY_FIELDS = {'name': STRING}
+REVIEW_FIELDS = {'text': STRING, 'rating': INTEGER, 'user_id': STRING, 'place_id': STRING}
 
 class HBnBFacade:
     def __init__(self):
@@ -10,87 +29,462 @@ class HBnBFacade:
         self.amenity_repo = AmenityRepository()
         self.place_repo = PlaceRepository()
         self.review_repo = ReviewRepository()
+        self.revocation_repo = TokenRevocationRepository()
+        self.user_loader = EntityLoader(self.user_repo)
+        self.place_loader = EntityLoader(self.place_repo)
+
+    def unit_of_work(self):
+        """
+        Group the repository writes of a request or batch job into a single
+        commit. Usable as a context manager or as a decorator.
+        """
+        return unit_of_work()
+
+    def get_suggestions(self, prefix, limit):
+        """
+        Get up to limit (kind, id, text) place titles and amenity names
+        starting with a prefix, from the in-process prefix index.
+        """
+        return suggest.load_index(self._suggestion_items).suggest(prefix, limit)
+
+    def _suggestion_items(self):
+        for place_id, title in self.place_repo.iter_values('title'):
+            yield 'place', place_id, title
+        for amenity_id, name in self.amenity_repo.iter_values('name'):
+            yield 'amenity', amenity_id, name
+
+    def _index_suggestion(self, kind, obj_id, value):
+        def apply():
+            index = suggest.get_index()
+            if index:
+                index.set(kind, obj_id, value)
+        after_commit(apply)
+
+    def get_cache_stats(self):
+        """
+        Get the hit and miss counters of the entity cache, or None when it
+        is disabled.
+        """
+        entity_cache = get_cache()
+        return entity_cache.stats() if entity_cache is not None else None
+
+    def get_hasher_stats(self):
+        """
+        Get the queue depth and timings of the password hashing pool.
+        """
+        return get_hasher().stats()
+
+    def get_rate_limit_stats(self):
+        """
+        Get the allowed and rejected login attempts, or None when the
+        limits are disabled.
+        """
+        limiter = get_limiter()
+        return limiter.stats() if limiter is not None else None
+
+    def get_revocation_stats(self):
+        """
+        Get the size and hit counters of the token revocation filter, or None
+        until it has been built.
+        """
+        revocations = revocation.get_filter()
+        return revocations.stats() if revocations is not None else None
+
+    def get_watermark(self, entity):
+        """
+        Get the (count, latest updated_at) of an entity type, used to
+        validate cached copies of its listings.
+        """
+        repos = {
+            'users': self.user_repo,
+            'places': self.place_repo,
+            'reviews': self.review_repo,
+            'amenities': self.amenity_repo,
+        }
+        return repos[entity].get_watermark()
+
+    def export_entities(self, entity, cursor=None):
+        """
+        Stream every row of an entity type as NDJSON lines, resuming after
+        the cursor of the last line received if one is given.
+        """
+        exports = {
+            'users': (self.user_repo, export.serialize_user),
+            'places': (self.place_repo, export.serialize_place),
+            'reviews': (self.review_repo, export.serialize_review),
+            'amenities': (self.amenity_repo, export.serialize_amenity),
+        }
+        if entity not in exports:
+            raise ValueError(f"Cannot export {entity}")
+        repo, serialize = exports[entity]
+        return export.to_ndjson(repo.iter_all(cursor), serialize)
 
     # User
     def create_user(self, user_data):
         user = User(**user_data)
-        user.hash_password(user_data['password'])
         self.user_repo.add(user)
         return user
 
+    def authenticate(self, email, password):
+        """
+        Get the user with these credentials, or None. A password hashed
+        with another work factor than the configured one is hashed again.
+        """
+        user = self.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+        if user.password_needs_rehash():
+            self.user_repo.update(user.id, {'password': password})
+        return user
+
     def update_user(self, user_id, user_data):
         user = self.get_user(user_id)
         if user:
             self.user_repo.update(user_id, user_data)
+            if 'password' in user_data:
+                self.revoke_user_tokens(user_id)
+
+    # Token revocation
+    def revoke_token(self, jti, expires_at):
+        """
+        Revoke one access token until it expires.
+        """
+        self._revoke(f"jti:{jti}", expires_at)
+
+    def revoke_user_tokens(self, user_id):
+        """
+        Revoke every access token of a user issued up to now.
+        """
+        expires_at = datetime.utcnow() + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
+        self._revoke(f"user:{user_id}", expires_at, revoked_before=time.time())
+
+    def _revoke(self, key, expires_at, revoked_before=None):
+        self.revocation_repo.revoke(key, expires_at, revoked_before)
+        revocations = revocation.get_filter()
+        if revocations is not None:
+            revocations.add(key)
+
+    def is_token_revoked(self, jti, user_id, issued_at):
+        """
+        Tell whether a token issued at a Unix time has been revoked. The
+        table is only read when the revocation filter holds the jti or the
+        user of the token.
+        """
+        revocations = revocation.load_filter(self._revocation_keys)
+        key = f"jti:{jti}"
+        if key in revocations and self.revocation_repo.get_by_key(key):
+            return True
+        key = f"user:{user_id}"
+        if user_id and key in revocations:
+            entry = self.revocation_repo.get_by_key(key)
+            return entry is not None and issued_at < entry.revoked_before
+        return False
 
-    def get_user(self, user_id):
+    def _revocation_keys(self, since):
+        return self.revocation_repo.get_keys_since(since, datetime.utcnow())
+
+    def prune_token_revocations(self):
+        """
+        Delete the revocations of tokens that have all expired.
+        """
+        return self.revocation_repo.delete_expired(datetime.utcnow())
+
+    def get_user(self, user_id, cached=True):
+        if not cached:
+            return self.user_repo.get_uncached(user_id)
         return self.user_repo.get(user_id)
 
+    def get_users_by_ids(self, user_ids):
+        return self.user_loader.load_many(user_ids)
+
     def get_all_users(self):
         return self.user_repo.get_all()
 
+    def get_users_page(self, limit, cursor=None):
+        return self.user_repo.get_page(limit, cursor)
+
     def get_user_by_email(self, email):
         return self.user_repo.get_user_by_email(email)
 
     # Place
+    def _get_amenities(self, amenity_ids):
+        amenities = self.amenity_repo.get_many(set(amenity_ids))
+        if len(amenities) != len(set(amenity_ids)):
+            raise ValueError("Amenity not found")
+        return amenities
+
     def create_place(self, place_data):
-        amenities = place_data.pop('amenities', [])
+        amenities = self._get_amenities(place_data.pop('amenities', None) or [])
         place = Place(**place_data)
         place.amenities = amenities
         self.place_repo.add(place)
+        self._index_suggestion('place', place.id, place.title)
+        self._index_amenities(place.id, [amenity.id for amenity in amenities])
         return place
 
+    def _index_amenities(self, place_id, amenity_ids):
+        def apply():
+            index = amenity_index.get_index()
+            if index:
+                index.set_amenities(place_id, amenity_ids)
+        after_commit(apply)
+
+    def _index_amenity_links(self, links):
+        def apply():
+            index = amenity_index.get_index()
+            if index:
+                index.add_links(links)
+        after_commit(apply)
+
+
+    def bulk_create_places(self, items, owner_id):
+        seen_titles = set()
+        amenity_ids = {}
+
+        def build_place(data):
+            data = dict(data, owner_id=owner_id)
+            amenities = data.pop('amenities', None) or []
+            if not isinstance(amenities, list):
+                raise ValueError("amenities must be a list of amenity IDs")
+            place = build(Place, data, PLACE_FIELDS)
+            amenity_ids[place] = set(amenities)
+            return place
+
+        def check_places(places):
+            titles = self.place_repo.get_existing_values(
+                'title', {place.title for place in places})
+            known_amenities = self.amenity_repo.get_existing_values(
+                'id', set().union(*(amenity_ids[place] for place in places)))
+            errors = []
+            for place in places:
+                if place.title in titles or place.title in seen_titles:
+                    error = 'Title already registered'
+                elif not amenity_ids[place] <= known_amenities:
+                    error = 'Amenity not found'
+                else:
+                    seen_titles.add(place.title)
+                    error = None
+                if error:
+                    del amenity_ids[place]
+                errors.append(error)
+            return errors
+
+        def insert_places(mappings, places):
+            links = [(mapping['id'], amenity_id)
+                     for mapping, place in zip(mappings, places)
+                     for amenity_id in amenity_ids.pop(place)]
+            with unit_of_work():
+                self.place_repo.bulk_add(mappings)
+                self.place_repo.add_amenity_links(links)
+            for mapping in mappings:
+                self._index_suggestion('place', mapping['id'], mapping['_title'])
+            self._index_amenity_links(links)
+
+        return bulk_create(items, build_place, check_places, insert_places)
 
     def get_place(self, place_id):
         return self.place_repo.get(place_id)
+
+    def get_places_nearby(self, latitude, longitude, radius_km, limit):
+        """
+        Get up to `limit` places within `radius_km` of a point, closest
+        first, as (place, distance in km) pairs.
+        """
+        south, west, north, east = geo.bounding_box(latitude, longitude, radius_km)
+        cells = geo.covering_cells(south, west, north, east)
+        candidates = self.place_repo.get_location_candidates(cells, south, north)
+        nearest = []
+        for place_id, place_lat, place_lng in candidates:
+            distance = geo.haversine_km(latitude, longitude, place_lat, place_lng)
+            if distance <= radius_km:
+                nearest.append((distance, place_id))
+        nearest = heapq.nsmallest(limit, nearest)
+        places = self.get_places_by_ids([place_id for _, place_id in nearest])
+        return [(places[place_id], distance) for distance, place_id in nearest]
+
+    def get_place_details(self, place_id):
+        return self.place_repo.get_place_with_details(place_id)
     
+    def get_places_by_ids(self, place_ids):
+        return self.place_loader.load_many(place_ids)
+
     def get_all_places(self):
         return self.place_repo.get_all()
 
+    def get_places_page(self, limit, cursor=None, min_price=None,
+                        max_price=None, amenity_ids=(), sort=None):
+        """
+        Get a page of places, answering amenity filters from the in-process
+        amenity index when it is up to date and narrows the places down to
+        a short id list, and from SQL semi-joins otherwise.
+        """
+        place_ids = None
+        index = None
+        if amenity_ids:
+            index = amenity_index.load_index(self.place_repo.get_amenity_links,
+                                             self.place_repo.get_amenity_changes)
+        if index:
+            matches = index.match(amenity_ids, self.place_repo.IN_CHUNK_SIZE)
+            if matches == []:
+                return [], None
+            if matches is not None:
+                place_ids, amenity_ids = matches, ()
+        query = self.place_repo.filter_places(min_price, max_price, amenity_ids, place_ids)
+        if sort == 'rating':
+            return self.place_repo.get_top_rated_page(limit, cursor, query)
+        return self.place_repo.get_page(limit, cursor, query)
+
+    def search_places(self, query, limit, cursor=None):
+        return self.place_repo.search(query, limit, cursor)
+
     def get_place_by_title(self, title):
-        return next(
-            (place for place in self.place_repo.get_all() if place.title == title),
-            None
-        )
+        return self.place_repo.get_place_by_title(title)
 
     def update_place(self, place_id, place_data):
+        place_data = dict(place_data)
+        if 'amenities' in place_data:
+            place_data['amenities'] = self._get_amenities(place_data['amenities'] or [])
+            # Links live in another table; touch the place so that its
+            # cached representations are invalidated too
+            place_data['updated_at'] = datetime.utcnow()
         self.place_repo.update(place_id, place_data)
+        if 'title' in place_data:
+            self._index_suggestion('place', place_id, place_data['title'])
+        if 'amenities' in place_data:
+            self._index_amenities(place_id, [amenity.id for amenity in place_data['amenities']])
 
     # Amenity
     def create_amenity(self, amenity_data):
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
+        self._index_suggestion('amenity', amenity.id, amenity.name)
         return amenity
 
+    def bulk_create_amenities(self, items):
+        seen_names = set()
+
+        def check_amenities(amenities):
+            names = self.amenity_repo.get_existing_values(
+                'name', {amenity.name for amenity in amenities})
+            errors = []
+            for amenity in amenities:
+                if amenity.name in names or amenity.name in seen_names:
+                    errors.append('Amenity already exists')
+                else:
+                    seen_names.add(amenity.name)
+                    errors.append(None)
+            return errors
+
+        def insert_amenities(mappings, amenities):
+            with unit_of_work():
+                self.amenity_repo.bulk_add(mappings)
+            for mapping in mappings:
+                self._index_suggestion('amenity', mapping['id'], mapping['_name'])
+
+        return bulk_create(items, lambda data: build(Amenity, data, AMENITY_FIELDS),
+                           check_amenities, insert_amenities)
+
     def get_amenity(self, amenity_id):
         return self.amenity_repo.get(amenity_id)
 
     def get_all_amenities(self):
         return self.amenity_repo.get_all()
 
+    def get_amenities_page(self, limit, cursor=None):
+        return self.amenity_repo.get_page(limit, cursor)
+
     def update_amenity(self, amenity_id, amenity_data):
         self.amenity_repo.update(amenity_id, amenity_data)
+        if 'name' in amenity_data:
+            self._index_suggestion('amenity', amenity_id, amenity_data['name'])
 
     # Review
     def create_review(self, review_data):
         review = Review(**review_data)
-        self.review_repo.add(review)
+        with unit_of_work():
+            self.review_repo.add(review)
+            self.place_repo.adjust_rating(review.place_id, 1, review.rating)
         return review
 
+    def bulk_create_reviews(self, items, user_id):
+        seen_places = set()
+
+        def check_reviews(reviews):
+            place_ids = {review.place_id for review in reviews}
+            places = {place.id: place for place in self.place_repo.get_many(place_ids)}
+            reviewed = self.review_repo.get_reviewed_place_ids(user_id, place_ids)
+            errors = []
+            for review in reviews:
+                place = places.get(review.place_id)
+                if not place:
+                    errors.append('Place not found')
+                elif place.owner_id == user_id:
+                    errors.append('You cannot review your own place')
+                elif review.place_id in reviewed or review.place_id in seen_places:
+                    errors.append('You have already reviewed this place')
+                else:
+                    seen_places.add(review.place_id)
+                    errors.append(None)
+            return errors
+
+        def insert_reviews(mappings, reviews):
+            ratings = {}
+            for mapping in mappings:
+                count, total = ratings.get(mapping['_place_id'], (0, 0))
+                ratings[mapping['_place_id']] = (count + 1, total + mapping['_rating'])
+            with unit_of_work():
+                self.review_repo.bulk_add(mappings)
+                for place_id, (count, total) in ratings.items():
+                    self.place_repo.adjust_rating(place_id, count, total)
+
+        return bulk_create(items,
+                           lambda data: build(Review, dict(data, user_id=user_id), REVIEW_FIELDS),
+                           check_reviews, insert_reviews)
+
     def get_review(self, review_id):
         return self.review_repo.get(review_id)
 
     def get_all_reviews(self):
         return self.review_repo.get_all()
 
+    def get_reviews_page(self, limit, cursor=None):
+        return self.review_repo.get_page(limit, cursor)
+
     def get_reviews_by_place(self, place_id):
         place = self.get_place(place_id)
         if not place:
             return None
-        return [review for review in self.review_repo.get_all() if review.place_id == place_id]
+        return self.review_repo.get_reviews_by_place(place_id)
+
+    def get_reviews_by_user(self, user_id, limit, cursor=None):
+        return self.review_repo.get_reviews_by_user(user_id, limit, cursor)
 
     def update_review(self, review_id, review_data):
-        self.review_repo.update(review_id, review_data)
+        with unit_of_work():
+            # The rating deltas are taken from the row itself, never from a
+            # cached copy that another process may have made stale
+            review = self.review_repo.get_uncached(review_id, for_update=True)
+            if not review:
+                return
+            old_place_id, old_rating = review.place_id, review.rating
+            self.review_repo.update(review_id, review_data)
+            if review.place_id != old_place_id:
+                self.place_repo.adjust_rating(old_place_id, -1, -old_rating)
+                self.place_repo.adjust_rating(review.place_id, 1, review.rating)
+            elif review.rating != old_rating:
+                self.place_repo.adjust_rating(review.place_id, 0,
+                                              review.rating - old_rating)
 
     def delete_review(self, review_id):
-        return self.review_repo.delete(review_id)
\ No newline at end of file
+        with unit_of_work():
+            review = self.review_repo.get_uncached(review_id, for_update=True)
+            if review:
+                self.place_repo.adjust_rating(review.place_id, -1, -review.rating)
+            return self.review_repo.delete(review_id)
+
+    def rebuild_rating_stats(self):
+        """
+        Recompute the rating aggregates of every place from its reviews,
+        returning how many places had drifted.
+        """
+        return self.place_repo.rebuild_rating_stats()
\ No newline at end of file
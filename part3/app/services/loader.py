@@ -0,0 +1,43 @@
+from flask import g
+
+
+class EntityLoader:
+    """
+    Batch loader for one entity type, in the spirit of DataLoader.
+
+    Ids are resolved with one WHERE id IN (...) query per batch and the
+    results are memoized on flask.g, so they only live for the current
+    request.
+    """
+
+    def __init__(self, repo):
+        """
+        Initialize the loader with the repository to batch queries through.
+        """
+        self.repo = repo
+
+    def _memo(self):
+        """
+        Get the memo of this entity type for the current request.
+        """
+        memos = g.setdefault('entity_loader_memos', {})
+        return memos.setdefault(self.repo.model.__tablename__, {})
+
+    def load_many(self, ids):
+        """
+        Get a dictionary mapping each id to its object, or to None if it
+        does not exist.
+        """
+        memo = self._memo()
+        missing = [obj_id for obj_id in dict.fromkeys(ids) if obj_id not in memo]
+        if missing:
+            found = {obj.id: obj for obj in self.repo.get_many(missing)}
+            for obj_id in missing:
+                memo[obj_id] = found.get(obj_id)
+        return {obj_id: memo[obj_id] for obj_id in ids}
+
+    def load(self, obj_id):
+        """
+        Get a single object by its id.
+        """
+        return self.load_many([obj_id])[obj_id]
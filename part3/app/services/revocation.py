@@ -0,0 +1,166 @@
+"""
+In-process Bloom filter of the revoked access tokens.
+
+The token_revocations table holds the tokens revoked one by one, by jti,
+and the users whose tokens were all revoked up to some time, as after a
+password change. Reading it on every authenticated request would cost a
+query each time, so the keys of the revocations still in force are also
+added to a Bloom filter. A token whose jti and user are both absent from
+the filter is accepted without a query; only a possible match, either a
+real one or a false positive (TOKEN_BLOCKLIST_ERROR_RATE), is confirmed
+against the table.
+
+The filter lives in app.extensions and is built on first use. Revocations
+made by this process are added to it at once, and it catches up with the
+rows written by other processes at most every
+TOKEN_BLOCKLIST_SYNC_INTERVAL seconds. It is rebuilt from the table,
+which drops the expired revocations, once older than
+TOKEN_BLOCKLIST_MAX_AGE seconds or once it holds more keys than it was
+sized for.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from flask import current_app
+
+EXTENSION_KEY = 'token_blocklist'
+
+# Rows are read again from a little before the last one seen, so that a
+# row committed after a later one was read is not missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """
+    Set of strings that may report false positives but never false
+    negatives.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Double hashing: the k positions are h1 + i * h2
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class RevocationFilter:
+    """
+    Bloom filter of the revocation keys, with the state of its last sync.
+    """
+
+    def __init__(self):
+        self.bloom = None
+        self.keys = 0
+        self.watermark = None
+        self.built_at = None
+        self.synced_at = None
+        self.lookups = 0
+        self.positives = 0
+        self.lock = threading.Lock()
+
+    def build(self, rows, capacity, error_rate):
+        """
+        Replace the filter with one holding the keys of (key, updated_at)
+        rows, sized for at least twice as many.
+        """
+        bloom = BloomFilter(max(capacity, 2 * len(rows)), error_rate)
+        for key, _ in rows:
+            bloom.add(key)
+        self.bloom, self.keys = bloom, len(rows)
+        self.watermark = max((updated_at for _, updated_at in rows), default=None)
+        self.built_at = self.synced_at = time.monotonic()
+
+    def sync(self, rows):
+        """
+        Add the keys of (key, updated_at) rows changed since the last sync.
+        """
+        for key, updated_at in rows:
+            self.add(key)
+            if self.watermark is None or updated_at > self.watermark:
+                self.watermark = updated_at
+        self.synced_at = time.monotonic()
+
+    def since(self):
+        """
+        Get the time to read the changed rows from, or None for all of them.
+        """
+        return self.watermark - SYNC_OVERLAP if self.watermark else None
+
+    def add(self, key):
+        if key not in self.bloom:
+            self.bloom.add(key)
+            self.keys += 1
+
+    def __contains__(self, key):
+        self.lookups += 1
+        found = key in self.bloom
+        if found:
+            self.positives += 1
+        return found
+
+    def stats(self):
+        return {
+            'keys': self.keys,
+            'capacity': self.bloom.capacity if self.bloom else None,
+            'bits': self.bloom.size if self.bloom else None,
+            'hashes': self.bloom.hashes if self.bloom else None,
+            'lookups': self.lookups,
+            'positives': self.positives,
+        }
+
+
+def get_filter():
+    """
+    Get the filter of the current app if it has been built, else None.
+    """
+    revocations = current_app.extensions.get(EXTENSION_KEY)
+    return revocations if revocations is not None and revocations.bloom else None
+
+
+def load_filter(load_keys):
+    """
+    Get the filter of the current app, building it from load_keys(None) or
+    bringing it up to date with load_keys(since) when it is due.
+    """
+    config = current_app.config
+    revocations = current_app.extensions.setdefault(EXTENSION_KEY, RevocationFilter())
+    now = time.monotonic()
+    if revocations.bloom is None:
+        with revocations.lock:
+            if revocations.bloom is None:
+                revocations.build(load_keys(None), config.get('TOKEN_BLOCKLIST_CAPACITY', 100000),
+                                  config.get('TOKEN_BLOCKLIST_ERROR_RATE', 0.001))
+        return revocations
+
+    rebuild = (now - revocations.built_at > config.get('TOKEN_BLOCKLIST_MAX_AGE', 3600)
+               or revocations.keys > revocations.bloom.capacity)
+    due = now - revocations.synced_at > config.get('TOKEN_BLOCKLIST_SYNC_INTERVAL', 2)
+    # The requests arriving while another one syncs use the filter as it is
+    if (rebuild or due) and revocations.lock.acquire(blocking=False):
+        try:
+            if rebuild:
+                revocations.build(load_keys(None), config.get('TOKEN_BLOCKLIST_CAPACITY', 100000),
+                                  config.get('TOKEN_BLOCKLIST_ERROR_RATE', 0.001))
+            else:
+                revocations.sync(load_keys(revocations.since()))
+        finally:
+            revocations.lock.release()
+    return revocations
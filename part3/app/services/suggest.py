@@ -0,0 +1,134 @@
+"""
+In-process prefix index for the type-ahead suggestions of the search box.
+
+Place titles and amenity names are kept in one sorted array of normalized
+keys, so the entries starting with a prefix form a contiguous run found
+with a binary search, and the first k of them are read without scanning
+the rest.
+
+Like the amenity index, it lives in app.extensions, is built lazily on
+first use, is kept current by the facade and is rebuilt once it is older
+than SUGGEST_INDEX_MAX_AGE seconds. One request at a time rebuilds it,
+in the background of the others, which keep being served from the
+previous entries until the new ones are swapped in.
+"""
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from flask import current_app
+
+EXTENSION_KEY = 'suggest_index'
+
+
+def normalize(value):
+    """
+    Fold case and accents so that "cafe" suggests "Café".
+    """
+    if value.isascii():
+        return value.strip().lower()
+    decomposed = unicodedata.normalize('NFKD', value.strip())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class PrefixIndex:
+    """
+    Sorted (key, kind, id, text) entries with the current key of every id.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.entries = []
+        self.keys = {}
+        self.pending = None
+        self.built_at = None
+
+    def build(self, items):
+        """
+        Replace the content of the index with (kind, id, text) items.
+
+        Entries set while the items are read are recorded and applied again
+        to the new content, which may have been read before them.
+        """
+        with self.lock:
+            self.pending = []
+        entries, keys = [], {}
+        for kind, obj_id, value in items:
+            key = normalize(value)
+            entries.append((key, kind, obj_id, value))
+            keys[obj_id] = key
+        entries.sort()
+        with self.lock:
+            self.entries, self.keys = entries, keys
+            for entry in self.pending:
+                self._set(*entry)
+            self.pending = None
+            self.built_at = time.monotonic()
+
+    def _set(self, kind, obj_id, value):
+        key = normalize(value)
+        old_key = self.keys.get(obj_id)
+        if old_key is not None:
+            for i in range(bisect_left(self.entries, (old_key,)), len(self.entries)):
+                if self.entries[i][0] != old_key:
+                    break
+                if self.entries[i][2] == obj_id:
+                    del self.entries[i]
+                    break
+        insort(self.entries, (key, kind, obj_id, value))
+        self.keys[obj_id] = key
+
+    def set(self, kind, obj_id, value):
+        """
+        Add an entry, or move it if its text has changed.
+        """
+        with self.lock:
+            self._set(kind, obj_id, value)
+            if self.pending is not None:
+                self.pending.append((kind, obj_id, value))
+
+    def suggest(self, prefix, limit):
+        """
+        Get up to limit (kind, id, text) entries whose text starts with the
+        prefix, in alphabetical order.
+        """
+        prefix = normalize(prefix)
+        with self.lock:
+            start = bisect_left(self.entries, (prefix,))
+            found = []
+            for key, kind, obj_id, value in self.entries[start:start + limit]:
+                if not key.startswith(prefix):
+                    break
+                found.append((kind, obj_id, value))
+            return found
+
+
+def get_index():
+    """
+    Get the index of the current app if it has been built, else None.
+    """
+    return current_app.extensions.get(EXTENSION_KEY)
+
+
+def load_index(load_items):
+    """
+    Get the index of the current app, building it from load_items() when
+    it is missing or too old.
+    """
+    max_age = current_app.config.get('SUGGEST_INDEX_MAX_AGE', 300)
+    index = current_app.extensions.setdefault(EXTENSION_KEY, PrefixIndex())
+    if index.built_at is None:
+        with index.refresh_lock:
+            if index.built_at is None:
+                index.build(load_items())
+        return index
+
+    # The requests arriving while another one rebuilds use the index as it is
+    if (time.monotonic() - index.built_at > max_age
+            and index.refresh_lock.acquire(blocking=False)):
+        try:
+            index.build(load_items())
+        finally:
+            index.refresh_lock.release()
+    return index
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark multi-amenity filtering of the places listing.
+
+Usage: python benchmarks/bench_amenity_filter.py [places] [amenities]
+
+Every place gets a random eighth of the amenities. Each run asks for the
+first page of places having three random amenities, once through the SQL
+semi-joins and once through the in-process amenity index, and the time of
+the intersection alone is reported for the index.
+"""
+
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place, place_amenity
+from app.models.amenity import Amenity
+from app.services import facade
+from app.services.amenity_index import get_index
+
+PLACES = 100_000
+AMENITIES = 40
+CHUNK = 50_000
+RUNS = 100
+
+
+def populate(places, amenities, rng):
+    """Fill an empty database and return the amenity ids."""
+    now = datetime.utcnow()
+    user_id = str(uuid.uuid4())
+    db.session.execute(insert(User), [{
+        'id': user_id, '_first_name': 'Bench', '_last_name': 'User',
+        '_email': 'bench@example.com', '_password': 'x',
+        'created_at': now, 'updated_at': now
+    }])
+    amenity_ids = [str(uuid.uuid4()) for _ in range(amenities)]
+    db.session.execute(insert(Amenity), [{
+        'id': amenity_id, '_name': f'Amenity {i}',
+        'created_at': now, 'updated_at': now
+    } for i, amenity_id in enumerate(amenity_ids)])
+    place_ids = [str(uuid.uuid4()) for _ in range(places)]
+    for start in range(0, places, CHUNK):
+        chunk = place_ids[start:start + CHUNK]
+        db.session.execute(insert(Place), [{
+            'id': place_id, '_title': place_id, '_price': 10,
+            '_latitude': 0.0, '_longitude': 0.0, '_owner_id': user_id,
+            'created_at': now, 'updated_at': now
+        } for place_id in chunk])
+        db.session.execute(place_amenity.insert(), [
+            {'place_id': place_id, 'amenity_id': amenity_id}
+            for place_id in chunk
+            for amenity_id in rng.sample(amenity_ids, amenities // 8)
+        ])
+    db.session.commit()
+    return amenity_ids
+
+
+def median_ms(timings):
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def measure(app, amenity_ids, rng, use_index):
+    """Return the median latency of one filtered page, in milliseconds."""
+    app.config['AMENITY_INDEX'] = use_index
+    facade.get_places_page(50, amenity_ids=amenity_ids[:3])
+    timings = []
+    for _ in range(RUNS):
+        wanted = rng.sample(amenity_ids, 3)
+        start = time.perf_counter()
+        facade.get_places_page(50, amenity_ids=wanted)
+        timings.append(time.perf_counter() - start)
+        db.session.expunge_all()
+    return median_ms(timings)
+
+
+def measure_intersection(amenity_ids, rng):
+    """Return the median latency of the bitmap intersection alone."""
+    index = get_index()
+    timings = []
+    for _ in range(RUNS):
+        wanted = rng.sample(amenity_ids, 3)
+        start = time.perf_counter()
+        index.match(wanted)
+        timings.append(time.perf_counter() - start)
+    return median_ms(timings)
+
+
+def main():
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else PLACES
+    amenities = int(sys.argv[2]) if len(sys.argv) > 2 else AMENITIES
+    rng = random.Random(42)
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        amenity_ids = populate(places, amenities, rng)
+        print(f"{places} places, {amenities} amenities, 3 per query")
+        print(f"{'sql':>14} {measure(app, amenity_ids, rng, False):>8.3f} ms")
+        print(f"{'index':>14} {measure(app, amenity_ids, rng, True):>8.3f} ms")
+        print(f"{'intersection':>14} {measure_intersection(amenity_ids, rng):>8.3f} ms")
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
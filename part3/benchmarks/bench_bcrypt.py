@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Calibrate BCRYPT_LOG_ROUNDS and measure a burst of logins.
+
+Usage: python benchmarks/bench_bcrypt.py [target_ms] [logins]
+
+Times one hash for each work factor and recommends the highest one that
+stays under `target_ms` on this machine. Then checks `logins` passwords
+from 32 request threads, once with bcrypt on the request threads and once
+through the bounded pool of app.passwords, while another thread measures
+the latency of a small JSON encoding, standing for the cheap requests.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import bcrypt
+from app.passwords import PasswordHasher
+
+TARGET_MS = 250
+LOGINS = 64
+REQUEST_THREADS = 32
+RUNS = 3
+
+
+def hash_time(rounds):
+    """Return the median time in seconds of one hash with these rounds."""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        bcrypt.generate_password_hash('correct horse battery staple', rounds)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def calibrate(target_ms):
+    """Print the cost of each work factor and return the recommended one."""
+    print(f"{'rounds':>6} {'ms/hash':>10}")
+    best = 4
+    for rounds in range(4, 17):
+        ms = hash_time(rounds) * 1000
+        print(f"{rounds:>6} {ms:>10.1f}")
+        if ms > target_ms:
+            break
+        best = rounds
+    return best
+
+
+def burst(check, logins):
+    """Run the logins and return (seconds, median probe ms, worst probe ms)."""
+    body = [{'id': i, 'title': f'Place {i}', 'price': i * 1.5} for i in range(200)]
+    probes = []
+    done = threading.Event()
+
+    def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            json.dumps(body)
+            probes.append(time.perf_counter() - start)
+            time.sleep(0.001)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(REQUEST_THREADS) as requests:
+        list(requests.map(lambda _: check(), range(logins)))
+    seconds = time.perf_counter() - start
+    done.set()
+    prober.join()
+    probes.sort()
+    return seconds, probes[len(probes) // 2] * 1000, probes[-1] * 1000
+
+
+def main():
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else TARGET_MS
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else LOGINS
+    rounds = calibrate(target_ms)
+    print(f"\nrecommended BCRYPT_LOG_ROUNDS for {target_ms:.0f} ms: {rounds}\n")
+
+    hashed = bcrypt.generate_password_hash('secret', rounds).decode('utf-8')
+    workers = os.cpu_count() or 2
+    hasher = PasswordHasher(rounds, workers, logins)
+    modes = [
+        ('request threads', lambda: bcrypt.check_password_hash(hashed, 'secret')),
+        (f'pool of {workers}', lambda: hasher.check(hashed, 'secret')),
+    ]
+    print(f"{'bcrypt on':>16} {'logins/s':>10} {'probe p50 ms':>13} {'probe max ms':>13}")
+    for name, check in modes:
+        seconds, median, worst = burst(check, logins)
+        print(f"{name:>16} {logins / seconds:>10.1f} {median:>13.3f} {worst:>13.3f}")
+    print(f"\npool: {hasher.stats()}")
+
+
+if __name__ == '__main__':
+    main()
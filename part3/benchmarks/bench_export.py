@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Measure the peak memory of the NDJSON export as the places table grows.
+
+Usage: python benchmarks/bench_export.py [rows ...]
+
+The peak should stay roughly flat, since rows are streamed in batches.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.services import facade
+
+SIZES = [10_000, 100_000]
+CHUNK = 50_000
+
+
+def populate(total):
+    """Fill an empty database with `total` places."""
+    now = datetime.utcnow()
+    user_id = str(uuid.uuid4())
+    db.session.execute(insert(User), [{
+        'id': user_id, '_first_name': 'Bench', '_last_name': 'User',
+        '_email': 'bench@example.com', '_password': 'x',
+        'created_at': now, 'updated_at': now
+    }])
+    for start in range(0, total, CHUNK):
+        db.session.execute(insert(Place), [{
+            'id': str(uuid.uuid4()), '_title': f"Place {i}",
+            '_description': 'A place to stay ' * 10, '_price': 10,
+            '_latitude': 0.0, '_longitude': 0.0, '_owner_id': user_id,
+            'created_at': now, 'updated_at': now
+        } for i in range(start, min(start + CHUNK, total))])
+    db.session.commit()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    app = create_app("config.TestingConfig")
+    print(f"{'places':>10} {'bytes out':>12} {'peak MiB':>9} {'seconds':>8}")
+    for size in sizes:
+        with app.app_context():
+            db.create_all()
+            populate(size)
+            db.session.expunge_all()
+            tracemalloc.start()
+            start = time.perf_counter()
+            written = sum(len(line) for line in facade.export_entities('places'))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+            print(f"{size:>10} {written:>12} {peak:>9.1f} {elapsed:>8.2f}")
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
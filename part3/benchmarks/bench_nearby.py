@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Benchmark HBnBFacade.get_places_nearby on a large places table.
+
+Usage: python benchmarks/bench_nearby.py [places] [radius_km]
+
+Places are spread uniformly over land-like latitudes; the search returns
+the 20 closest places around random points.
+"""
+
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.geo import encode_geohash
+from app.models.user import User
+from app.models.place import Place
+from app.services import facade
+
+PLACES = 1_000_000
+RADIUS_KM = 10
+CHUNK = 50_000
+RUNS = 200
+
+
+def populate(total, rng):
+    """Fill an empty database with `total` places."""
+    now = datetime.utcnow()
+    user_id = str(uuid.uuid4())
+    db.session.execute(insert(User), [{
+        'id': user_id, '_first_name': 'Bench', '_last_name': 'User',
+        '_email': 'bench@example.com', '_password': 'x',
+        'created_at': now, 'updated_at': now
+    }])
+    for start in range(0, total, CHUNK):
+        rows = []
+        for i in range(start, min(start + CHUNK, total)):
+            lat, lng = rng.uniform(-60, 70), rng.uniform(-180, 180)
+            rows.append({
+                'id': str(uuid.uuid4()), '_title': f"Place {i}", '_price': 10,
+                '_latitude': lat, '_longitude': lng,
+                '_geohash': encode_geohash(lat, lng), '_owner_id': user_id,
+                'created_at': now, 'updated_at': now
+            })
+        db.session.execute(insert(Place), rows)
+    db.session.commit()
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else PLACES
+    radius = float(sys.argv[2]) if len(sys.argv) > 2 else RADIUS_KM
+    rng = random.Random(0)
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        populate(total, rng)
+        timings = []
+        found = 0
+        for _ in range(RUNS):
+            lat, lng = rng.uniform(-60, 70), rng.uniform(-180, 180)
+            start = time.perf_counter()
+            found += len(facade.get_places_nearby(lat, lng, radius, 20))
+            timings.append(time.perf_counter() - start)
+            db.session.expunge_all()
+        timings.sort()
+        print(f"places={total} radius_km={radius} avg results={found / RUNS:.1f}")
+        print(f"median {timings[len(timings) // 2] * 1000:.3f} ms, "
+              f"p95 {timings[int(len(timings) * 0.95)] * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Benchmark HBnBFacade.get_reviews_by_place as the reviews table grows.
+
+Usage: python benchmarks/bench_reviews_by_place.py [rows ...]
+
+The looked-up place always has the same number of reviews, so the timings
+should stay flat while the total number of reviews grows.
+"""
+
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.services import facade
+
+SIZES = [10_000, 100_000, 1_000_000]
+REVIEWS_PER_PLACE = 20
+CHUNK = 50_000
+RUNS = 200
+
+
+def populate(total):
+    """Fill an empty database with `total` reviews spread over many places."""
+    now = datetime.utcnow()
+    user_id = str(uuid.uuid4())
+    db.session.execute(insert(User), [{
+        'id': user_id, '_first_name': 'Bench', '_last_name': 'User',
+        '_email': 'bench@example.com', '_password': 'x',
+        'created_at': now, 'updated_at': now
+    }])
+    place_ids = [str(uuid.uuid4()) for _ in range(total // REVIEWS_PER_PLACE)]
+    for start in range(0, len(place_ids), CHUNK):
+        db.session.execute(insert(Place), [{
+            'id': place_id, '_title': place_id, '_price': 10,
+            '_latitude': 0.0, '_longitude': 0.0, '_owner_id': user_id,
+            'created_at': now, 'updated_at': now
+        } for place_id in place_ids[start:start + CHUNK]])
+    for start in range(0, total, CHUNK):
+        db.session.execute(insert(Review), [{
+            'id': str(uuid.uuid4()), '_text': 'Nice', '_rating': 4,
+            '_place_id': place_ids[i // REVIEWS_PER_PLACE],
+            '_user_id': user_id, 'created_at': now, 'updated_at': now
+        } for i in range(start, min(start + CHUNK, total))])
+    db.session.commit()
+    return place_ids[len(place_ids) // 2]
+
+
+def measure(place_id):
+    """Return the median latency of one lookup, in milliseconds."""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        reviews = facade.get_reviews_by_place(place_id)
+        timings.append(time.perf_counter() - start)
+        db.session.expunge_all()
+    assert len(reviews) == REVIEWS_PER_PLACE
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    app = create_app("config.TestingConfig")
+    print(f"{'reviews':>10} {'median ms':>10}")
+    for size in sizes:
+        with app.app_context():
+            db.create_all()
+            place_id = populate(size)
+            print(f"{size:>10} {measure(place_id):>10.3f}")
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
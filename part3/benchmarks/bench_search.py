@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Benchmark HBnBFacade.search_places on a large places table.
+
+Usage: python benchmarks/bench_search.py [places]
+
+Titles and descriptions are drawn from a small vocabulary with a skewed
+word frequency. Each run fetches the first page of a two-word query.
+"""
+
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.services import facade
+
+PLACES = 200_000
+CHUNK = 50_000
+RUNS = 200
+WORDS = [f"word{i}" for i in range(2000)]
+WEIGHTS = [1 / (i + 1) for i in range(len(WORDS))]
+
+
+def sentence(rng, length):
+    return ' '.join(rng.choices(WORDS, WEIGHTS, k=length))
+
+
+def populate(total, rng):
+    """Fill an empty database with `total` described places."""
+    now = datetime.utcnow()
+    user_id = str(uuid.uuid4())
+    db.session.execute(insert(User), [{
+        'id': user_id, '_first_name': 'Bench', '_last_name': 'User',
+        '_email': 'bench@example.com', '_password': 'x',
+        'created_at': now, 'updated_at': now
+    }])
+    for start in range(0, total, CHUNK):
+        db.session.execute(insert(Place), [{
+            'id': str(uuid.uuid4()), '_title': f'{sentence(rng, 3)} {i}',
+            '_description': sentence(rng, 30), '_price': 10,
+            '_latitude': 0.0, '_longitude': 0.0, '_owner_id': user_id,
+            'created_at': now, 'updated_at': now
+        } for i in range(start, min(start + CHUNK, total))])
+    db.session.commit()
+
+
+def measure(rng):
+    """Return the median latency of one page of results, in milliseconds."""
+    timings = []
+    for _ in range(RUNS):
+        query = ' '.join(rng.sample(WORDS[:200], 2))
+        start = time.perf_counter()
+        facade.search_places(query, 20)
+        timings.append(time.perf_counter() - start)
+        db.session.expunge_all()
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main():
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else PLACES
+    rng = random.Random(42)
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        populate(places, rng)
+        print(f"{places} places, median {measure(rng):.3f} ms per page")
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark the JSON encoding of a large places listing.
+
+Usage: python benchmarks/bench_serialization.py [rows]
+
+Encodes the body of GET /api/v1/places/ for `rows` places, with Numeric
+prices, through the standard library and through app.serialization.dumps
+(orjson when it is installed).
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.serialization import default, dumps, orjson
+
+ROWS = 10_000
+RUNS = 20
+
+
+def listing(rows):
+    """Build a listing body shaped like the one of the places endpoint."""
+    return [{
+        'id': str(uuid.uuid4()),
+        'title': f'Place {i}',
+        'description': 'A quiet place to stay, close to everything. ' * 3,
+        'price': Decimal(f'{50 + i % 200}.50'),
+        'latitude': 48.85 + i / 1e5,
+        'longitude': 2.35 - i / 1e5,
+        'owner_id': str(uuid.uuid4()),
+        'amenities': [str(uuid.uuid4()) for _ in range(3)],
+        'review_count': i % 40,
+        'average_rating': (i % 5) + 0.5,
+    } for i in range(rows)]
+
+
+def measure(encode, body):
+    """Return the median encoding time in seconds and the output size."""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        data = encode(body)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], len(data)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    body = listing(rows)
+    encoders = [
+        ('stdlib json', lambda data: json.dumps(data, default=default).encode('utf-8')),
+        ('app dumps' + (' (orjson)' if orjson else ' (stdlib)'), dumps),
+    ]
+    print(f"{'encoder':>20} {'median ms':>10} {'rows/s':>12} {'MB/s':>8}")
+    for name, encode in encoders:
+        seconds, size = measure(encode, body)
+        print(f"{name:>20} {seconds * 1000:>10.2f} {rows / seconds:>12,.0f} "
+              f"{size / seconds / 1e6:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
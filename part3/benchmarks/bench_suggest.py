@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Benchmark HBnBFacade.get_suggestions on a large places table.
+
+Usage: python benchmarks/bench_suggest.py [places]
+
+Each run asks for the first 10 suggestions of a random two or three
+letter prefix, once the prefix index has been built.
+"""
+
+import os
+import random
+import string
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.services import facade
+
+PLACES = 500_000
+CHUNK = 50_000
+RUNS = 2000
+
+
+def title(rng):
+    return ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 20)))
+
+
+def populate(total, rng):
+    """Fill an empty database with `total` places with random titles."""
+    now = datetime.utcnow()
+    user_id = str(uuid.uuid4())
+    db.session.execute(insert(User), [{
+        'id': user_id, '_first_name': 'Bench', '_last_name': 'User',
+        '_email': 'bench@example.com', '_password': 'x',
+        'created_at': now, 'updated_at': now
+    }])
+    for start in range(0, total, CHUNK):
+        db.session.execute(insert(Place), [{
+            'id': str(uuid.uuid4()), '_title': title(rng), '_price': 10,
+            '_latitude': 0.0, '_longitude': 0.0, '_owner_id': user_id,
+            'created_at': now, 'updated_at': now
+        } for _ in range(start, min(start + CHUNK, total))])
+    db.session.commit()
+
+
+def main():
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else PLACES
+    rng = random.Random(42)
+    app = create_app("config.TestingConfig")
+    with app.app_context():
+        db.create_all()
+        populate(places, rng)
+        start = time.perf_counter()
+        facade.get_suggestions('a', 10)
+        print(f"{places} places, index built in {time.perf_counter() - start:.2f} s")
+        timings = []
+        for _ in range(RUNS):
+            prefix = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 3)))
+            start = time.perf_counter()
+            facade.get_suggestions(prefix, 10)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"median {timings[len(timings) // 2] * 1000:.3f} ms, "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1000:.3f} ms")
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Benchmark repository writes with and without a unit of work.
+
+Usage: python benchmarks/bench_unit_of_work.py [writes]
+
+Uses an on-disk SQLite database so that every commit pays for its fsync.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import create_app, db
+from app.services import facade
+
+WRITES = 1000
+
+
+class CommitCounter:
+    """Count the commits of every session while the context is active."""
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(Session, 'after_commit', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Session, 'after_commit', self._count)
+
+    def _count(self, session):
+        self.count += 1
+
+
+def create_amenities(prefix, writes):
+    for i in range(writes):
+        facade.create_amenity({'name': f"{prefix} {i}"})
+
+
+def main():
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else WRITES
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig:
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            print(f"{'mode':>16} {'writes':>8} {'commits':>8} {'seconds':>8}")
+            for mode in ('per call', 'unit of work'):
+                with CommitCounter() as counter:
+                    start = time.perf_counter()
+                    if mode == 'per call':
+                        create_amenities('Call', writes)
+                    else:
+                        with facade.unit_of_work():
+                            create_amenities('Batch', writes)
+                    elapsed = time.perf_counter() - start
+                print(f"{mode:>16} {writes:>8} {counter.count:>8} {elapsed:>8.3f}")
+            db.session.remove()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,71 @@
 import os
+from datetime import timedelta
 
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'pepito')
     DEBUG = False
+    # Tokens issued before the string subjects carry a dict identity, which
+    # newer PyJWT rejects as a subject
+    JWT_VERIFY_SUB = False
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=7)
+    # Revoked tokens, checked through an in-process Bloom filter of the table
+    TOKEN_BLOCKLIST_CAPACITY = 100000
+    TOKEN_BLOCKLIST_ERROR_RATE = 0.001
+    TOKEN_BLOCKLIST_SYNC_INTERVAL = 2
+    TOKEN_BLOCKLIST_MAX_AGE = 3600
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 500
+    NEARBY_MAX_RADIUS_KM = 500
+    # In-process amenity bitmap index, synced with the writes of other
+    # processes every SYNC_INTERVAL seconds and rebuilt after MAX_AGE
+    AMENITY_INDEX = True
+    AMENITY_INDEX_SYNC_INTERVAL = 2
+    AMENITY_INDEX_MAX_AGE = 300
+    # Type-ahead prefix index, rebuilt once older than MAX_AGE seconds
+    SUGGEST_INDEX_MAX_AGE = 300
+    SUGGEST_MAX_LIMIT = 20
+    # Entity cache: 'lru' (in-process), 'redis' (shared) or None
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'lru')
+    CACHE_TTL = 60
+    CACHE_MAX_SIZE = 10000
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    # Response compression; brotli and zstd need their optional packages
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_LEVEL = 6
+    COMPRESS_BR_LEVEL = 4
+    COMPRESS_ZSTD_LEVEL = 3
+    # Password hashing pool; calibrate the rounds with benchmarks/bench_bcrypt.py
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # Half of the cores by default, so that a burst of logins leaves the
+    # other half to the rest of the requests
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+    BCRYPT_MAX_PENDING = 64
+    # Login attempts as (burst, period in seconds); backend 'memory', 'sqlite' or None
+    LOGIN_RATE_LIMIT_BACKEND = os.getenv('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+    LOGIN_RATE_LIMIT_SQLITE_PATH = os.getenv('LOGIN_RATE_LIMIT_SQLITE_PATH')
+    LOGIN_RATE_LIMIT_MAX_KEYS = 100000
+    LOGIN_LIMIT_PER_IP = (10, 60)
+    LOGIN_LIMIT_PER_ACCOUNT = (5, 300)
+    # Principals resolved from access tokens, by jti
+    IDENTITY_CACHE_TTL = 30
+    IDENTITY_CACHE_MAX_SIZE = 10000
 
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+class TestingConfig(Config):
+    TESTING = True
+    SECRET_KEY = 'testing-secret-key-long-enough-for-hs256'
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    BCRYPT_LOG_ROUNDS = 4
+    BCRYPT_WORKERS = 2
+    CACHE_BACKEND = None
+
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
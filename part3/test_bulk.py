@@ -0,0 +1,145 @@
+import json
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.models.review import Review
+
+
+class TestBulkCreate(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with an owner and a reviewer"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        owner = User(first_name="Owner", last_name="User",
+                     email="owner@example.com", password="secret", is_admin=True)
+        reviewer = User(first_name="Reviewer", last_name="User",
+                        email="reviewer@example.com", password="secret")
+        self.wifi = Amenity(name="WiFi")
+        db.session.add_all([owner, reviewer, self.wifi])
+        db.session.commit()
+        self.owner_id = owner.id
+        self.reviewer_id = reviewer.id
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def headers(self, user_id, is_admin=False):
+        token = create_access_token(identity={'id': user_id, 'is_admin': is_admin})
+        return {'Authorization': f'Bearer {token}'}
+
+    def place(self, title, **data):
+        return dict({'title': title, 'description': 'Nice', 'price': 100,
+                     'latitude': 10.0, 'longitude': 20.0}, **data)
+
+    def test_bulk_places(self):
+        """Test per-item results of a bulk place creation"""
+        response = self.client.post('/api/v1/places/bulk', json=[
+            self.place('One', amenities=[self.wifi.id]),
+            self.place('Two'),
+            self.place('One'),
+            self.place('Three', latitude=200.0),
+            self.place('Four', amenities=['missing']),
+            {'description': 'No title'},
+            'not an object',
+        ], headers=self.headers(self.owner_id))
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['created'], 2)
+        statuses = [result['status'] for result in body['results']]
+        self.assertEqual(statuses, [201, 201, 400, 400, 400, 400, 400])
+        self.assertEqual(body['results'][2]['error'], 'Title already registered')
+        self.assertEqual(body['results'][5]['error'], 'Missing required field: title')
+
+        place = db.session.get(Place, body['results'][0]['id'])
+        self.assertEqual(place.owner_id, self.owner_id)
+        self.assertEqual([amenity.name for amenity in place.amenities], ['WiFi'])
+
+    def test_bulk_amenities_ndjson(self):
+        """Test a bulk amenity creation streamed as NDJSON"""
+        lines = [json.dumps({'name': name}) for name in ('Pool', 'WiFi', 'Gym')]
+        lines.append('{broken')
+        response = self.client.post(
+            '/api/v1/amenities/bulk', data='\n'.join(lines) + '\n',
+            content_type='application/x-ndjson',
+            headers=self.headers(self.owner_id, is_admin=True))
+        self.assertEqual(response.status_code, 200)
+        statuses = [result['status'] for result in response.get_json()['results']]
+        self.assertEqual(statuses, [201, 400, 201, 400])
+        self.assertEqual(db.session.query(Amenity).count(), 3)
+
+    def test_bulk_amenities_requires_admin(self):
+        """Test that bulk amenity creation is restricted to admins"""
+        response = self.client.post('/api/v1/amenities/bulk', json=[{'name': 'Gym'}],
+                                    headers=self.headers(self.reviewer_id))
+        self.assertEqual(response.status_code, 403)
+
+    def test_bulk_reviews(self):
+        """Test the set-based checks of a bulk review creation"""
+        places = [Place(title=f"Place {i}", price=10, latitude=0.0,
+                        longitude=0.0, owner_id=self.owner_id) for i in range(2)]
+        db.session.add_all(places)
+        db.session.commit()
+        response = self.client.post('/api/v1/reviews/bulk', json=[
+            {'text': 'Great', 'rating': 5, 'place_id': places[0].id},
+            {'text': 'Again', 'rating': 4, 'place_id': places[0].id},
+            {'text': 'Bad rating', 'rating': 9, 'place_id': places[1].id},
+            {'text': 'Nowhere', 'rating': 3, 'place_id': 'x' * 36},
+        ], headers=self.headers(self.reviewer_id))
+        statuses = [result['status'] for result in response.get_json()['results']]
+        self.assertEqual(statuses, [201, 400, 400, 400])
+        review = db.session.query(Review).one()
+        self.assertEqual(review.user_id, self.reviewer_id)
+
+    def test_bulk_rejects_private_fields(self):
+        """Test that items setting private or read-only fields are rejected"""
+        place = Place(title="Rated", price=10, latitude=0.0,
+                      longitude=0.0, owner_id=self.owner_id)
+        db.session.add(place)
+        db.session.commit()
+        response = self.client.post('/api/v1/reviews/bulk', json=[
+            {'text': 'Sneaky', 'rating': 5, '_rating': 42, 'place_id': place.id},
+            {'text': 'Counted', 'rating': 5, 'review_count': 3, 'place_id': place.id},
+        ], headers=self.headers(self.reviewer_id))
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()['results']
+        self.assertEqual([result['status'] for result in results], [400, 400])
+        self.assertEqual(results[0]['error'], 'Unknown field: _rating')
+        response = self.client.post('/api/v1/places/bulk', json=[
+            self.place('Private', _rating_sum=500, review_count=7),
+        ], headers=self.headers(self.owner_id))
+        self.assertEqual(response.get_json()['results'][0]['status'], 400)
+        self.assertEqual(db.session.query(Review).count(), 0)
+
+    def test_bulk_checks_field_types(self):
+        """Test that mistyped fields get a validation message, not an exception's"""
+        response = self.client.post('/api/v1/places/bulk', json=[
+            self.place('Priced', price='abc'),
+            self.place('Described', description=None),
+            self.place(42),
+            self.place('Flagged', latitude=True),
+        ], headers=self.headers(self.owner_id))
+        errors = [result['error'] for result in response.get_json()['results']]
+        self.assertEqual(errors, ['price must be a number', 'description must be a string',
+                                  'title must be a string', 'latitude must be a number'])
+        response = self.client.post('/api/v1/amenities/bulk', json=[{'name': 7}],
+                                    headers=self.headers(self.owner_id, is_admin=True))
+        self.assertEqual(response.get_json()['results'][0]['error'], 'name must be a string')
+
+    def test_bulk_rejects_non_array(self):
+        """Test that a body which is not an array is rejected"""
+        response = self.client.post('/api/v1/amenities/bulk', json={'name': 'Gym'},
+                                    headers=self.headers(self.owner_id, is_admin=True))
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from flask_jwt_extended import create_access_token
+from sqlalchemy import inspect
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.persistence.cache import LRUCache, get_cache, restore, snapshot
+from app.serialization import dumps
+from app.services import facade
+from test_query_counts import QueryCounter
+
+
+class TestEntityCache(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with the LRU cache enabled"""
+        self.app = create_app("config.TestingConfig")
+        self.app.config['CACHE_BACKEND'] = 'lru'
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        self.owner = User(first_name="Owner", last_name="User",
+                          email="owner@example.com", password="secret", is_admin=True)
+        db.session.add(self.owner)
+        db.session.flush()
+        self.place = Place(title="Cabin", price=80, latitude=45.0,
+                           longitude=6.0, owner_id=self.owner.id)
+        db.session.add(self.place)
+        db.session.commit()
+        self.owner_id, self.place_id = self.owner.id, self.place.id
+        db.session.remove()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_served_from_cache(self):
+        """Test that a second lookup in a new session runs no query"""
+        facade.get_place(self.place_id)
+        db.session.remove()
+        with QueryCounter() as counter:
+            place = facade.get_place(self.place_id)
+            self.assertEqual(place.title, "Cabin")
+        self.assertEqual(counter.count, 0)
+        self.assertTrue(inspect(place).persistent)
+        self.assertEqual(place.owner.email, "owner@example.com")
+        self.assertEqual(get_cache().stats()['hits'], 1)
+
+    def test_update_and_delete_invalidate(self):
+        """Test that repository writes drop the cached copy"""
+        facade.get_user(self.owner_id)
+        facade.update_user(self.owner_id, {'first_name': 'Renamed'})
+        db.session.remove()
+        self.assertEqual(facade.get_user(self.owner_id).first_name, 'Renamed')
+
+        facade.get_place(self.place_id)
+        facade.place_repo.delete(self.place_id)
+        db.session.remove()
+        self.assertIsNone(facade.get_place(self.place_id))
+
+    def test_attribute_lookup_is_verified(self):
+        """Test that a cached email does not find a user whose email changed"""
+        self.assertIsNotNone(facade.get_user_by_email("owner@example.com"))
+        facade.update_user(self.owner_id, {'email': 'new@example.com'})
+        db.session.remove()
+        self.assertIsNone(facade.get_user_by_email("owner@example.com"))
+        self.assertEqual(facade.get_user_by_email("new@example.com").id, self.owner_id)
+
+    def test_rating_update_invalidates(self):
+        """Test that the rating aggregates are not served stale"""
+        guest = facade.create_user({'first_name': 'Guest', 'last_name': 'User',
+                                    'email': 'guest@example.com', 'password': 'secret'})
+        facade.get_place(self.place_id)
+        facade.create_review({'text': 'Nice', 'rating': 4, 'user_id': guest.id,
+                              'place_id': self.place_id})
+        db.session.remove()
+        self.assertEqual(facade.get_place(self.place_id).review_count, 1)
+
+    def test_lru_bounds(self):
+        """Test that the LRU evicts the oldest entries and expires them"""
+        lru = LRUCache(ttl=60, max_size=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        expired = LRUCache(ttl=-1, max_size=2)
+        expired.set('a', 1)
+        self.assertIsNone(expired.get('a'))
+
+    def test_snapshot_json_round_trip(self):
+        """Test that a snapshot read back from JSON restores the column types"""
+        place = facade.get_place(self.place_id)
+        values = json.loads(dumps(snapshot(place)))
+        db.session.remove()
+        with QueryCounter() as counter:
+            restored = restore(db.session, Place, values)
+            self.assertEqual(restored.price, Decimal('80'))
+            self.assertIsInstance(restored.created_at, datetime)
+            self.assertEqual(restored.title, "Cabin")
+        self.assertEqual(counter.count, 0)
+
+    def test_password_not_cached(self):
+        """Test that the password hash stays out of the cache and still loads"""
+        facade.get_user(self.owner_id)
+        self.assertNotIn('_password', get_cache().get(facade.user_repo._cache_key(self.owner_id)))
+        db.session.remove()
+        user = facade.get_user(self.owner_id)
+        self.assertTrue(user.verify_password("secret"))
+
+    def test_metrics_endpoint(self):
+        """Test that admins can read the cache counters"""
+        facade.get_place(self.place_id)
+        token = create_access_token(identity={'id': self.owner_id, 'is_admin': True})
+        response = self.client.get('/api/v1/metrics/',
+                                   headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        # The user of the token is read past the cache
+        self.assertEqual(response.get_json()['cache']['misses'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import gzip
+import json
+import unittest
+import zlib
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models.user import User
+from app.models.amenity import Amenity
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with enough amenities to compress"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        admin = User(first_name="Admin", last_name="User",
+                     email="admin@example.com", password="secret", is_admin=True)
+        db.session.add(admin)
+        db.session.add_all([Amenity(name=f"Amenity {i}") for i in range(100)])
+        db.session.commit()
+        token = create_access_token(identity={'id': admin.id, 'is_admin': True})
+        self.auth = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_gzip(self):
+        """Test that a large JSON body is gzipped with a weak ETag"""
+        plain = self.client.get('/api/v1/amenities/')
+        response = self.client.get('/api/v1/amenities/',
+                                   headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(int(response.headers['Content-Length']), len(response.data))
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertEqual(response.headers['ETag'], 'W/' + plain.headers['ETag'])
+
+        revalidated = self.client.get('/api/v1/amenities/', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_not_compressed(self):
+        """Test that small bodies and refused encodings are sent as is"""
+        amenity_id = self.client.get('/api/v1/amenities/?limit=1').get_json()[0]['id']
+        response = self.client.get(f'/api/v1/amenities/{amenity_id}',
+                                   headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+
+        response = self.client.get('/api/v1/amenities/',
+                                   headers={'Accept-Encoding': 'gzip;q=0, identity'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_streaming(self):
+        """Test that NDJSON streams are compressed chunk by chunk"""
+        response = self.client.get('/api/v1/export/amenities', buffered=False,
+                                   headers=dict(self.auth, **{'Accept-Encoding': 'gzip'}))
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response.headers)
+        decompressor = zlib.decompressobj(31)
+        chunks = [decompressor.decompress(chunk) for chunk in response.response]
+        response.close()
+        # Every flushed chunk decodes to whole lines on its own
+        lines = [chunk for chunk in chunks if chunk]
+        self.assertTrue(all(chunk.endswith(b'\n') for chunk in lines))
+        rows = [json.loads(line) for line in b''.join(chunks).splitlines()]
+        self.assertEqual(len(rows), 100)
+
+if __name__ == '__main__':
+    unittest.main()
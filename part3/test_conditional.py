@@ -0,0 +1,119 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services import facade
+
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with a few amenities"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        self.amenities = [Amenity(name=f"Amenity {i}") for i in range(3)]
+        db.session.add_all(self.amenities)
+        db.session.commit()
+        self.url = f'/api/v1/amenities/{self.amenities[0].id}'
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_entity_etag(self):
+        """Test that a matching If-None-Match returns an empty 304"""
+        response = self.client.get(self.url)
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        response = self.client.get(self.url, headers={'If-None-Match': f'W/{etag}'})
+        self.assertEqual(response.status_code, 304)
+
+    def test_entity_changes(self):
+        """Test that an update changes the ETag"""
+        etag = self.client.get(self.url).headers['ETag']
+        facade.update_amenity(self.amenities[0].id, {'name': 'Renamed'})
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['name'], 'Renamed')
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_if_modified_since(self):
+        """Test that Last-Modified is honoured when no ETag is sent"""
+        last_modified = self.client.get(self.url).headers['Last-Modified']
+        response = self.client.get(self.url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, headers={
+            'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:00 GMT'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_collection_watermark(self):
+        """Test that listings are revalidated against the table watermark"""
+        url = '/api/v1/amenities/?limit=2'
+        etag = self.client.get(url).headers['ETag']
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('ETag', response.headers)
+
+        other = self.client.get('/api/v1/amenities/?limit=1').headers['ETag']
+        self.assertNotEqual(other, etag)
+
+        facade.create_amenity({'name': 'New'})
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+        etag = response.headers['ETag']
+        db.session.delete(self.amenities[2])
+        db.session.commit()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_review_lists_after_delete(self):
+        """Test that deleting a review is not hidden by If-Modified-Since"""
+        host = User(first_name="Host", last_name="User",
+                    email="host@example.com", password="secret")
+        guests = [User(first_name="Guest", last_name="User",
+                       email=f"guest{i}@example.com", password="secret") for i in range(2)]
+        db.session.add_all([host, *guests])
+        db.session.flush()
+        place = Place(title="Cabin", price=80, latitude=45.0, longitude=6.0, owner_id=host.id)
+        db.session.add(place)
+        db.session.flush()
+        an_hour_ago = datetime.utcnow() - timedelta(hours=1)
+        reviews = [Review(text="Nice", rating=4, place_id=place.id, user_id=guest.id,
+                          created_at=an_hour_ago + timedelta(minutes=i),
+                          updated_at=an_hour_ago + timedelta(minutes=i))
+                   for i, guest in enumerate(guests)]
+        db.session.add_all(reviews)
+        db.session.flush()
+        for obj in (host, *guests, place):
+            obj.updated_at = an_hour_ago
+        db.session.commit()
+
+        urls = [f'/api/v1/reviews/places/{place.id}/reviews',
+                f'/api/v1/reviews/users/{guests[0].id}/reviews']
+        since = {url: self.client.get(url).headers.get('Last-Modified') for url in urls}
+        facade.delete_review(reviews[0].id)
+        for url in urls:
+            headers = {'If-Modified-Since': since[url]} if since[url] else {}
+            response = self.client.get(url, headers=headers)
+            self.assertEqual(response.status_code, 200, url)
+        self.assertEqual(len(self.client.get(urls[0]).get_json()), 1)
+        self.assertIsNone(since[urls[1]])
+
+if __name__ == '__main__':
+    unittest.main()
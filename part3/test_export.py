@@ -0,0 +1,80 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with a few places"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        admin = User(first_name="Admin", last_name="User",
+                     email="admin@example.com", password="secret", is_admin=True)
+        db.session.add(admin)
+        db.session.flush()
+        wifi = Amenity(name="WiFi")
+        start = datetime(2024, 1, 1)
+        for i in range(5):
+            place = Place(title=f"Place {i}", price=99.5, latitude=1.0,
+                          longitude=2.0, owner_id=admin.id)
+            place.created_at = start + timedelta(hours=i)
+            place.amenities = [wifi]
+            db.session.add(place)
+        db.session.commit()
+        token = create_access_token(identity={'id': admin.id, 'is_admin': True})
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def export(self, url):
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertTrue(response.is_streamed)
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_export_and_resume(self):
+        """Test that the export can be resumed from any line's cursor"""
+        rows = self.export('/api/v1/export/places')
+        self.assertEqual([row['title'] for row in rows],
+                         [f"Place {i}" for i in range(5)])
+        self.assertEqual(rows[0]['price'], 99.5)
+        self.assertEqual(len(rows[0]['amenities']), 1)
+
+        resumed = self.export(f"/api/v1/export/places?cursor={rows[1]['cursor']}")
+        self.assertEqual([row['id'] for row in resumed], [row['id'] for row in rows[2:]])
+
+    def test_export_errors(self):
+        """Test that unknown entities and bad cursors are rejected"""
+        response = self.client.get('/api/v1/export/bookings', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/export/places?cursor=bad', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_users_hides_passwords(self):
+        """Test that exported users do not include password hashes"""
+        rows = self.export('/api/v1/export/users')
+        self.assertEqual(len(rows), 1)
+        self.assertNotIn('password', rows[0])
+
+    def test_export_command(self):
+        """Test the export CLI command"""
+        result = self.app.test_cli_runner().invoke(args=['export', 'places'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(result.output.splitlines()), 5)
+
+if __name__ == '__main__':
+    unittest.main()
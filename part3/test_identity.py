@@ -0,0 +1,132 @@
+import unittest
+from flask_jwt_extended import create_access_token, decode_token
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.api.v1.identity import get_identity_cache
+from test_query_counts import QueryCounter
+
+
+class TestIdentity(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with an admin, a host and a guest"""
+        self.app = create_app("config.TestingConfig")
+        self.app.config['LOGIN_RATE_LIMIT_BACKEND'] = None
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        admin = User(first_name="Admin", last_name="User",
+                     email="admin@example.com", password="secret", is_admin=True)
+        host = User(first_name="Host", last_name="User",
+                    email="host@example.com", password="secret")
+        guest = User(first_name="Guest", last_name="User",
+                     email="guest@example.com", password="secret")
+        db.session.add_all([admin, host, guest])
+        db.session.flush()
+        place = Place(title="Cabin", price=80, latitude=45.0,
+                      longitude=6.0, owner_id=host.id)
+        db.session.add(place)
+        db.session.flush()
+        review = Review(text="Lovely", rating=5, place_id=place.id, user_id=guest.id)
+        db.session.add(review)
+        db.session.commit()
+        self.admin_id, self.host_id, self.guest_id = admin.id, host.id, guest.id
+        self.place_id, self.review_id = place.id, review.id
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email):
+        response = self.client.post('/api/v1/auth/login',
+                                    json={'email': email, 'password': 'secret'})
+        return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+    def test_login_issues_string_subject(self):
+        """Test that login tokens carry the user id as subject and an is_admin claim"""
+        token = self.login('admin@example.com')['Authorization'].split()[1]
+        claims = decode_token(token)
+        self.assertEqual(claims['sub'], self.admin_id)
+        self.assertTrue(claims['is_admin'])
+        response = self.client.get('/api/v1/metrics/', headers=self.login('admin@example.com'))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/v1/metrics/', headers=self.login('host@example.com'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_legacy_dict_identity(self):
+        """Test that tokens with a dict identity are still accepted"""
+        token = create_access_token(identity={'id': self.admin_id, 'is_admin': True})
+        response = self.client.get('/api/v1/metrics/',
+                                   headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_rights_follow_the_user_row(self):
+        """Test that the is_admin claim of a token is not trusted over the user"""
+        self.app.config['IDENTITY_CACHE_TTL'] = 0
+        self.app.config['CACHE_BACKEND'] = 'lru'
+        headers = self.login('admin@example.com')
+        with self.app.app_context():
+            self.assertEqual(self.client.get('/api/v1/metrics/', headers=headers).status_code, 200)
+        db.session.get(User, self.admin_id).is_admin = False
+        db.session.commit()
+        with self.app.app_context():
+            self.assertEqual(self.client.get('/api/v1/metrics/', headers=headers).status_code, 403)
+
+        token = create_access_token(identity=self.host_id, additional_claims={'is_admin': True})
+        response = self.client.get('/api/v1/metrics/',
+                                   headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_principal_cached_by_jti(self):
+        """Test that a token is resolved once, then served from the identity cache"""
+        headers = self.login('admin@example.com')
+        queries = []
+        for _ in range(3):
+            # A context of its own per request, as outside of the tests
+            with self.app.app_context(), QueryCounter() as counter:
+                self.client.get('/api/v1/metrics/', headers=headers)
+            queries.append(counter.count)
+        # The user and, on first use, the revocation filter
+        self.assertEqual(queries, [2, 0, 0])
+        stats = get_identity_cache().stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_unknown_user(self):
+        """Test that a token naming no existing user cannot act"""
+        token = create_access_token(identity='missing', additional_claims={'is_admin': True})
+        headers = {'Authorization': f'Bearer {token}'}
+        self.assertEqual(self.client.get('/api/v1/metrics/', headers=headers).status_code, 403)
+        response = self.client.post('/api/v1/places/bulk', json=[], headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_review_author_checks(self):
+        """Test that only the author of a review can update it"""
+        url = f'/api/v1/reviews/{self.review_id}'
+        review = {'text': 'Still lovely', 'rating': 4,
+                  'user_id': self.guest_id, 'place_id': self.place_id}
+        response = self.client.put(url, json=review, headers=self.login('host@example.com'))
+        self.assertEqual(response.status_code, 403)
+        response = self.client.put(url, json=review, headers=self.login('guest@example.com'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['user_id'], self.guest_id)
+
+    def test_user_updates_own_name(self):
+        """Test that a regular user can rename themselves but not someone else"""
+        headers = self.login('guest@example.com')
+        response = self.client.put(f'/api/v1/users/{self.guest_id}',
+                                   json={'first_name': 'Renamed'}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['first_name'], 'Renamed')
+        response = self.client.put(f'/api/v1/users/{self.host_id}',
+                                   json={'first_name': 'Renamed'}, headers=headers)
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import unittest
+from sqlalchemy import create_engine, inspect
+from app.persistence.migrations import upgrade, MIGRATIONS
+
+SCRIPT = os.path.join(os.path.dirname(__file__), 'SQL', 'script.sql')
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        """Create a database from SQL/script.sql"""
+        self.engine = create_engine('sqlite://')
+        connection = self.engine.raw_connection()
+        with open(SCRIPT) as f:
+            connection.executescript(f.read())
+        connection.close()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        self.engine.dispose()
+
+    def test_upgrade_adds_indexes(self):
+        """Test that the migrations index the lookup columns"""
+        self.assertEqual(upgrade(self.engine), [m.VERSION for m in MIGRATIONS])
+
+        inspector = inspect(self.engine)
+        review_indexes = {ix['name']: ix['column_names']
+                          for ix in inspector.get_indexes('reviews')}
+        self.assertEqual(review_indexes['ix_reviews_place_id'],
+                         ['place_id', 'created_at', 'id'])
+        self.assertEqual(review_indexes['ix_reviews_user_id'],
+                         ['user_id', 'created_at', 'id'])
+        place_indexes = {ix['name'] for ix in inspector.get_indexes('places')}
+        self.assertIn('ix_places_owner_id', place_indexes)
+        self.assertIn('ix_places_title', place_indexes)
+        self.assertIn('ix_places_price', place_indexes)
+        columns = {c['name'] for c in inspector.get_columns('users')}
+        self.assertIn('created_at', columns)
+        self.assertIn('token_revocations', inspector.get_table_names())
+
+    def test_upgrade_is_idempotent(self):
+        """Test that running the migrations twice is a no-op"""
+        upgrade(self.engine)
+        self.assertEqual(upgrade(self.engine), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import random
+import unittest
+from app import create_app, db
+from app.geo import encode_geohash, haversine_km
+from app.models.user import User
+from app.models.place import Place
+from app.services import facade
+
+
+class TestNearby(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with places around the world"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        owner = User(first_name="Owner", last_name="User",
+                     email="owner@example.com", password="secret")
+        db.session.add(owner)
+        db.session.flush()
+        rng = random.Random(42)
+        self.points = []
+        for i in range(1500):
+            # Cluster half of the places around Paris and the date line
+            if i % 3 == 0:
+                lat, lng = 48.85 + rng.uniform(-1, 1), 2.35 + rng.uniform(-1, 1)
+            elif i % 3 == 1:
+                lat, lng = rng.uniform(-5, 5), rng.choice([-1, 1]) * rng.uniform(178, 180)
+            else:
+                lat, lng = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            self.points.append((lat, lng))
+            db.session.add(Place(title=f"Place {i}", price=10, latitude=lat,
+                                 longitude=lng, owner_id=owner.id))
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def brute_force(self, lat, lng, radius_km):
+        return sorted(d for d in (haversine_km(lat, lng, *point) for point in self.points)
+                      if d <= radius_km)
+
+    def test_geohash_reference_value(self):
+        """Test the geohash encoding against a known value"""
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_matches_brute_force(self):
+        """Test that the indexed search finds exactly the places in range"""
+        for lat, lng, radius in [(48.85, 2.35, 25), (48.85, 2.35, 120),
+                                 (0.0, 179.9, 300), (0.0, -179.5, 50),
+                                 (89.0, 0.0, 400), (10.0, 10.0, 1)]:
+            expected = self.brute_force(lat, lng, radius)
+            found = facade.get_places_nearby(lat, lng, radius, len(self.points))
+            self.assertEqual([round(d, 6) for _, d in found],
+                             [round(d, 6) for d in expected])
+
+    def test_limit_keeps_closest(self):
+        """Test that the limit keeps the closest places"""
+        found = facade.get_places_nearby(48.85, 2.35, 100, 5)
+        self.assertEqual([d for _, d in found], self.brute_force(48.85, 2.35, 100)[:5])
+
+    def test_geohash_follows_moves(self):
+        """Test that moving a place updates its geohash"""
+        place = db.session.query(Place).first()
+        place.latitude = -33.8688
+        place.longitude = 151.2093
+        self.assertEqual(place.geohash, encode_geohash(-33.8688, 151.2093))
+
+    def test_edge_of_radius_along_meridian(self):
+        """Test that a place just inside the radius due north is found"""
+        owner_id = db.session.query(Place).first().owner_id
+        place = Place(title="North", price=10, latitude=0.8990, longitude=0.0,
+                      owner_id=owner_id)
+        db.session.add(place)
+        db.session.commit()
+        self.assertLess(haversine_km(0.0, 0.0, 0.8990, 0.0), 100)
+        response = self.client.get('/api/v1/places/nearby?lat=0&lng=0&radius_km=100')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(place.id, [item['id'] for item in response.get_json()])
+
+    def test_invalid_parameters(self):
+        """Test that bad search parameters return 400"""
+        for query in ('lng=2', 'lat=x&lng=2', 'lat=91&lng=2',
+                      'lat=1&lng=2&radius_km=0', 'lat=1&lng=2&radius_km=100000'):
+            response = self.client.get(f'/api/v1/places/nearby?{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.persistence.pagination import encode_cursor, decode_cursor
+from app.services import facade
+
+
+class TestKeysetPagination(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with a few amenities"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        start = datetime(2024, 1, 1)
+        for i in range(7):
+            # Two amenities share each timestamp so ties are broken by id
+            amenity = Amenity(name=f"Amenity {i}")
+            amenity.created_at = start + timedelta(minutes=i // 2)
+            db.session.add(amenity)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes to the key it was built from"""
+        key = (datetime(2024, 1, 1, 12, 30), 'some-id')
+        self.assertEqual(decode_cursor(encode_cursor(key)), key)
+
+    def test_invalid_cursor(self):
+        """Test that a garbled cursor is rejected"""
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+
+    def test_pages_cover_every_row_once(self):
+        """Test that walking the pages returns each row exactly once"""
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = facade.get_amenities_page(3, cursor)
+            seen.extend(amenity.id for amenity in page)
+            if cursor is None:
+                break
+        expected = [a.id for a in db.session.query(Amenity)
+                    .order_by(Amenity.created_at, Amenity.id)]
+        self.assertEqual(seen, expected)
+
+    def test_list_endpoint_headers(self):
+        """Test that the list endpoint advertises the next page"""
+        response = self.client.get('/api/v1/amenities/?limit=5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 5)
+        cursor = response.headers['X-Next-Cursor']
+        self.assertIn('rel="next"', response.headers['Link'])
+
+        response = self.client.get(f'/api/v1/amenities/?limit=5&cursor={cursor}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 2)
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_invalid_page_args(self):
+        """Test that bad limit or cursor values return 400"""
+        self.assertEqual(self.client.get('/api/v1/amenities/?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/amenities/?cursor=xyz').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest import mock
+from flask_jwt_extended import create_access_token
+from app import create_app, db, bcrypt
+from app.models.user import User
+from app.passwords import HasherBusy, get_hasher, hash_cost
+from app.services import facade
+
+
+class TestPasswordHasher(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with an admin user"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        admin = User(first_name="Admin", last_name="User",
+                     email="admin@example.com", password="secret", is_admin=True)
+        db.session.add(admin)
+        db.session.commit()
+        self.admin_id = admin.id
+        self.headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity={'id': admin.id, 'is_admin': True})}
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email, password):
+        return self.client.post('/api/v1/auth/login',
+                                json={'email': email, 'password': password})
+
+    def test_create_user_hashes_once(self):
+        """Test that creating a user hashes its password once and does not return it"""
+        hasher = get_hasher()
+        completed = hasher.stats()['completed']
+        response = self.client.post('/api/v1/users/', headers=self.headers, json={
+            'first_name': 'Ann', 'last_name': 'Lee',
+            'email': 'ann@example.com', 'password': 'pa55word'})
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('password', response.get_json())
+        self.assertEqual(hasher.stats()['completed'], completed + 1)
+        self.assertEqual(self.login('ann@example.com', 'pa55word').status_code, 200)
+
+    def test_password_update_is_usable(self):
+        """Test that a password set through PUT is hashed once and accepted at login"""
+        response = self.client.put(f'/api/v1/users/{self.admin_id}', headers=self.headers,
+                                   json={'password': 'n3w-secret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.login('admin@example.com', 'n3w-secret').status_code, 200)
+        self.assertEqual(self.login('admin@example.com', 'secret').status_code, 401)
+
+    def test_login_rehashes_other_cost(self):
+        """Test that a login replaces a hash made with another work factor"""
+        user = facade.get_user(self.admin_id)
+        user._password = bcrypt.generate_password_hash('secret', 5).decode('utf-8')
+        db.session.commit()
+
+        self.assertEqual(self.login('admin@example.com', 'secret').status_code, 200)
+        db.session.expire_all()
+        stored = facade.get_user(self.admin_id)._password
+        self.assertEqual(hash_cost(stored), self.app.config['BCRYPT_LOG_ROUNDS'])
+        self.assertEqual(self.login('admin@example.com', 'secret').status_code, 200)
+
+    def test_wrong_password_keeps_hash(self):
+        """Test that a failed login does not rehash the password"""
+        user = facade.get_user(self.admin_id)
+        old_hash = bcrypt.generate_password_hash('secret', 5).decode('utf-8')
+        user._password = old_hash
+        db.session.commit()
+
+        self.assertEqual(self.login('admin@example.com', 'wrong').status_code, 401)
+        db.session.expire_all()
+        self.assertEqual(facade.get_user(self.admin_id)._password, old_hash)
+
+    def test_full_queue_rejects_login(self):
+        """Test that a login is answered 503 with Retry-After when the pool is full"""
+        hasher = get_hasher()
+        with mock.patch.object(hasher.slots, 'acquire', return_value=False):
+            response = self.login('admin@example.com', 'secret')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.assertEqual(hasher.stats()['rejected'], 1)
+        with mock.patch.object(hasher.slots, 'acquire', return_value=False):
+            self.assertRaises(HasherBusy, hasher.hash, 'secret')
+
+    def test_metrics_report_pool(self):
+        """Test that the metrics endpoint reports the hashing pool"""
+        self.login('admin@example.com', 'secret')
+        stats = self.client.get('/api/v1/metrics/', headers=self.headers).get_json()['bcrypt']
+        self.assertEqual(stats['rounds'], 4)
+        self.assertEqual(stats['workers'], 2)
+        self.assertEqual(stats['queued'], 0)
+        self.assertGreaterEqual(stats['completed'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+from datetime import datetime
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.services import facade
+from app.services.amenity_index import Bitmap, get_index, load_index
+
+
+class TestPlaceFilters(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with priced places and amenities"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        owner = User(first_name="Owner", last_name="User",
+                     email="owner@example.com", password="secret")
+        self.wifi = Amenity(name="Wifi")
+        self.pool = Amenity(name="Pool")
+        db.session.add_all([owner, self.wifi, self.pool])
+        db.session.flush()
+        self.places = []
+        for i in range(30):
+            place = Place(title=f"Place {i}", price=i * 10, latitude=0.0,
+                          longitude=0.0, owner_id=owner.id)
+            if i % 2 == 0:
+                place.amenities.append(self.wifi)
+            if i % 3 == 0:
+                place.amenities.append(self.pool)
+            self.places.append(place)
+        db.session.add_all(self.places)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def all_pages(self, limit, **filters):
+        found, cursor = [], None
+        while True:
+            places, cursor = facade.get_places_page(limit, cursor, **filters)
+            found.extend(place.title for place in places)
+            if cursor is None:
+                return found
+
+    def test_price_range(self):
+        """Test that the price bounds are inclusive"""
+        found = self.all_pages(50, min_price=50, max_price=100)
+        self.assertEqual(sorted(found), sorted(f"Place {i}" for i in range(5, 11)))
+
+    def test_amenities_must_all_match(self):
+        """Test that places must have every requested amenity"""
+        found = self.all_pages(50, amenity_ids=[self.wifi.id, self.pool.id])
+        self.assertEqual(sorted(found), sorted(f"Place {i}" for i in range(0, 30, 6)))
+
+    def test_filters_combine_with_pagination(self):
+        """Test that paging through filtered results returns each match once"""
+        found = self.all_pages(2, max_price=200, amenity_ids=[self.wifi.id])
+        expected = [f"Place {i}" for i in range(0, 21, 2)]
+        self.assertEqual(sorted(found), sorted(expected))
+        self.assertEqual(len(found), len(set(found)))
+
+    def test_index_matches_sql(self):
+        """Test that the amenity index and the SQL filter agree"""
+        filters = dict(max_price=250, amenity_ids=[self.wifi.id, self.pool.id])
+        found = self.all_pages(3, **filters)
+        self.app.config['AMENITY_INDEX'] = False
+        self.assertEqual(found, self.all_pages(3, **filters))
+        self.assertIsNotNone(get_index())
+
+    def test_index_follows_writes(self):
+        """Test that created, bulk created and updated places are indexed"""
+        self.all_pages(50, amenity_ids=[self.pool.id])
+        owner_id = self.places[0].owner_id
+        created = facade.create_place({
+            'title': 'Created', 'price': 1, 'latitude': 0.0, 'longitude': 0.0,
+            'owner_id': owner_id, 'amenities': [self.pool.id]})
+        facade.bulk_create_places([{
+            'title': 'Bulk', 'price': 1, 'latitude': 0.0, 'longitude': 0.0,
+            'amenities': [self.pool.id]}], owner_id)
+        facade.update_place(self.places[0].id, {'amenities': [self.wifi.id]})
+        found = self.all_pages(50, amenity_ids=[self.pool.id])
+        self.assertIn(created.title, found)
+        self.assertIn('Bulk', found)
+        self.assertNotIn('Place 0', found)
+
+    def test_index_syncs_writes_of_other_workers(self):
+        """Test that places written by another process are found once synced"""
+        self.app.config['AMENITY_INDEX_SYNC_INTERVAL'] = 60
+        self.all_pages(50, amenity_ids=[self.pool.id])
+        # As another worker would, without touching this process's index
+        elsewhere = Place(title="Elsewhere", price=1, latitude=0.0,
+                          longitude=0.0, owner_id=self.places[0].owner_id)
+        elsewhere.amenities.append(self.pool)
+        self.places[0].amenities = [self.wifi]
+        self.places[0].updated_at = datetime.utcnow()
+        db.session.add(elsewhere)
+        db.session.commit()
+        self.assertNotIn('Elsewhere', self.all_pages(50, amenity_ids=[self.pool.id]))
+
+        self.app.config['AMENITY_INDEX_SYNC_INTERVAL'] = 0
+        found = self.all_pages(50, amenity_ids=[self.pool.id])
+        self.assertIn('Elsewhere', found)
+        self.assertNotIn('Place 0', found)
+
+    def test_index_ignores_rolled_back_writes(self):
+        """Test that a place whose unit of work rolls back is never indexed"""
+        self.all_pages(50, amenity_ids=[self.pool.id])
+        expected = get_index().match([self.pool.id])
+        with self.assertRaises(ValueError):
+            with facade.unit_of_work():
+                facade.create_place({
+                    'title': 'Phantom', 'price': 1, 'latitude': 0.0, 'longitude': 0.0,
+                    'owner_id': self.places[0].owner_id, 'amenities': [self.pool.id]})
+                facade.update_place(self.places[0].id, {'amenities': [self.wifi.id]})
+                raise ValueError("rolled back")
+        self.assertEqual(get_index().match([self.pool.id]), expected)
+
+    def test_index_busy_falls_back_to_sql(self):
+        """Test that an index being refreshed elsewhere is not used meanwhile"""
+        self.app.config['AMENITY_INDEX_SYNC_INTERVAL'] = 0
+        expected = self.all_pages(50, amenity_ids=[self.pool.id])
+        index = get_index()
+        with index.refresh_lock:
+            self.assertIsNone(load_index(facade.place_repo.get_amenity_links,
+                                         facade.place_repo.get_amenity_changes))
+            self.assertEqual(self.all_pages(50, amenity_ids=[self.pool.id]), expected)
+
+    def test_bitmap(self):
+        """Test bitmap membership, removal and intersection across chunks"""
+        evens, threes = Bitmap(), Bitmap()
+        for n in range(0, 200000, 2):
+            evens.add(n)
+        for n in range(0, 200000, 3):
+            threes.add(n)
+        threes.discard(0)
+        self.assertIn(131072, evens)
+        self.assertNotIn(0, threes)
+        self.assertEqual(list(Bitmap.intersection([evens, threes])),
+                         list(range(6, 200000, 6)))
+
+    def test_invalid_filters(self):
+        """Test that malformed filters are rejected"""
+        for query in ['min_price=abc', 'max_price=-1', 'min_price=20&max_price=10']:
+            response = self.client.get(f'/api/v1/places/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.models.review import Review
+from app.services import facade
+
+
+class QueryCounter:
+    """Count the SQL statements executed while the context is active."""
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(db.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(db.engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+class TestQueryCounts(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with a place and its relations"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        owner = User(first_name="Owner", last_name="User",
+                     email="owner@example.com", password="secret")
+        db.session.add(owner)
+        db.session.flush()
+        place = Place(title="Cabin", description="In the woods", price=80,
+                      latitude=45.0, longitude=6.0, owner_id=owner.id)
+        place.amenities = [Amenity(name=f"Amenity {i}") for i in range(5)]
+        db.session.add(place)
+        db.session.flush()
+        for i in range(30):
+            reviewer = User(first_name=f"Reviewer{i}", last_name="User",
+                            email=f"reviewer{i}@example.com", password="secret")
+            db.session.add(reviewer)
+            db.session.flush()
+            db.session.add(Review(text="Lovely", rating=4,
+                                  place_id=place.id, user_id=reviewer.id))
+        db.session.commit()
+        self.place_id = place.id
+        db.session.expunge_all()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_place_details_query_count(self):
+        """Test that a place, its owner and amenities load in two queries"""
+        with QueryCounter() as counter:
+            place = facade.get_place_details(self.place_id)
+            self.assertEqual(place.owner.email, "owner@example.com")
+            self.assertEqual(len({amenity.name for amenity in place.amenities}), 5)
+        self.assertLessEqual(counter.count, 2)
+
+    def test_place_reviews_query_count(self):
+        """Test that listing a place's reviews does not query per review"""
+        client = self.app.test_client()
+        with QueryCounter() as counter:
+            response = client.get(f'/api/v1/reviews/places/{self.place_id}/reviews')
+        self.assertEqual(response.status_code, 200)
+        reviews = response.get_json()
+        self.assertEqual(len(reviews), 30)
+        self.assertTrue(all(review['user'] for review in reviews))
+        self.assertLessEqual(counter.count, 3)
+
+    def test_user_reviews_query_count(self):
+        """Test that a page of a user's reviews loads its places in bulk"""
+        reviewer = User(first_name="Heavy", last_name="Reviewer",
+                        email="heavy@example.com", password="secret")
+        db.session.add(reviewer)
+        db.session.flush()
+        owner_id = db.session.get(Place, self.place_id).owner_id
+        for i in range(12):
+            place = Place(title=f"Place {i}", description="", price=50,
+                          latitude=0.0, longitude=0.0, owner_id=owner_id)
+            db.session.add(place)
+            db.session.flush()
+            db.session.add(Review(text="Fine", rating=3,
+                                  place_id=place.id, user_id=reviewer.id))
+        db.session.commit()
+        reviewer_id = reviewer.id
+        db.session.expunge_all()
+
+        client = self.app.test_client()
+        url = f'/api/v1/reviews/users/{reviewer_id}/reviews?limit=10'
+        with QueryCounter() as counter:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 10)
+        self.assertTrue(all(review['place'] for review in response.get_json()))
+        self.assertLessEqual(counter.count, 3)
+
+        cursor = response.headers['X-Next-Cursor']
+        response = client.get(f'{url}&cursor={cursor}')
+        self.assertEqual(len(response.get_json()), 2)
+
+if __name__ == '__main__':
+    unittest.main()
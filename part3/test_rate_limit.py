@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+from app import create_app, db
+from app.models.user import User
+from app.passwords import get_hasher
+from app.ratelimit import MemoryRateLimiter, SQLiteRateLimiter
+from test_query_counts import QueryCounter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLoginRateLimit(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with a user and small login limits"""
+        self.app = create_app("config.TestingConfig")
+        self.app.config['LOGIN_LIMIT_PER_IP'] = (3, 60)
+        self.app.config['LOGIN_LIMIT_PER_ACCOUNT'] = (5, 300)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        db.session.add(User(first_name="Ann", last_name="Lee",
+                            email="ann@example.com", password="secret"))
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, password, email="ann@example.com", ip='10.0.0.1'):
+        return self.client.post('/api/v1/auth/login',
+                                json={'email': email, 'password': password},
+                                environ_base={'REMOTE_ADDR': ip})
+
+    def test_ip_limit(self):
+        """Test that an address is answered 429 with Retry-After past its burst"""
+        for _ in range(3):
+            self.assertEqual(self.login('wrong').status_code, 401)
+        response = self.login('secret')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '20')
+        self.assertEqual(self.login('secret', ip='10.0.0.2').status_code, 200)
+
+    def test_account_limit(self):
+        """Test that an account is limited across addresses, whatever the email case"""
+        for i in range(5):
+            self.assertEqual(self.login('wrong', ip=f'10.0.1.{i}').status_code, 401)
+        response = self.login('secret', email='ANN@example.com ', ip='10.0.2.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '60')
+
+    def test_successful_logins_keep_account_tokens(self):
+        """Test that only failed attempts count against an account"""
+        for i in range(6):
+            self.assertEqual(self.login('secret', ip=f'10.0.3.{i}').status_code, 200)
+        for i in range(5):
+            self.assertEqual(self.login('wrong', ip=f'10.0.4.{i}').status_code, 401)
+        self.assertEqual(self.login('secret', ip='10.0.5.1').status_code, 429)
+
+    def test_rejection_skips_lookup_and_hash(self):
+        """Test that a rejected attempt runs no query and no bcrypt check"""
+        for _ in range(3):
+            self.login('wrong')
+        completed = get_hasher().stats()['completed']
+        with QueryCounter() as counter:
+            self.assertEqual(self.login('secret').status_code, 429)
+        self.assertEqual(counter.count, 0)
+        self.assertEqual(get_hasher().stats()['completed'], completed)
+
+    def test_disabled(self):
+        """Test that no attempt is rejected without a backend"""
+        app = create_app("config.TestingConfig")
+        app.config['LOGIN_RATE_LIMIT_BACKEND'] = None
+        app.config['LOGIN_LIMIT_PER_IP'] = (1, 60)
+        with app.app_context():
+            db.create_all()
+            client = app.test_client()
+            for _ in range(3):
+                response = client.post('/api/v1/auth/login',
+                                       json={'email': 'x@example.com', 'password': 'x'})
+                self.assertEqual(response.status_code, 401)
+            db.drop_all()
+
+    def test_bucket_refills(self):
+        """Test that a bucket gets tokens back at burst / period per second"""
+        clock = FakeClock()
+        limiter = MemoryRateLimiter(max_keys=10, clock=clock)
+        self.assertEqual(limiter.hit('k', 2, 10), 0)
+        self.assertEqual(limiter.hit('k', 2, 10), 0)
+        self.assertAlmostEqual(limiter.hit('k', 2, 10), 5.0)
+        clock.now += 5
+        self.assertEqual(limiter.hit('k', 2, 10), 0)
+        self.assertEqual(limiter.stats()['rejected'], 1)
+
+    def test_memory_backend_is_bounded(self):
+        """Test that the memory backend keeps at most max_keys buckets"""
+        limiter = MemoryRateLimiter(max_keys=2)
+        for key in 'abc':
+            limiter.hit(key, 1, 60)
+        self.assertEqual(list(limiter.buckets), ['b', 'c'])
+
+    def test_sqlite_backend_is_shared(self):
+        """Test that two limiters on the same SQLite file share their buckets"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ratelimit.db')
+            clock = FakeClock()
+            first = SQLiteRateLimiter(path, clock=clock)
+            second = SQLiteRateLimiter(path, clock=clock)
+            self.assertEqual(first.hit('k', 2, 10), 0)
+            self.assertEqual(second.hit('k', 2, 10), 0)
+            self.assertAlmostEqual(first.hit('k', 2, 10), 5.0)
+            clock.now += 5
+            self.assertEqual(second.hit('k', 2, 10), 0)
+            first.local.connection.close()
+            second.local.connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
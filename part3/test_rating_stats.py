@@ -0,0 +1,111 @@
+import unittest
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.services import facade
+
+
+class TestRatingStats(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with places and reviewers"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        owner = User(first_name="Owner", last_name="User",
+                     email="owner@example.com", password="secret")
+        self.users = [User(first_name="Guest", last_name=str(i),
+                           email=f"guest{i}@example.com", password="secret")
+                      for i in range(3)]
+        db.session.add_all([owner] + self.users)
+        db.session.flush()
+        self.places = [Place(title=f"Place {i}", price=10, latitude=0.0,
+                             longitude=0.0, owner_id=owner.id) for i in range(3)]
+        db.session.add_all(self.places)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def review(self, user, place, rating):
+        return facade.create_review({'text': 'Review', 'rating': rating,
+                                     'user_id': user.id, 'place_id': place.id})
+
+    def stats(self, place):
+        db.session.refresh(place)
+        return place.review_count, place.rating_sum, place.average_rating
+
+    def test_create_update_delete(self):
+        """Test that the aggregates follow every review change"""
+        place = self.places[0]
+        first = self.review(self.users[0], place, 5)
+        self.review(self.users[1], place, 2)
+        self.assertEqual(self.stats(place), (2, 7, 3.5))
+
+        facade.update_review(first.id, {'rating': 3})
+        self.assertEqual(self.stats(place), (2, 5, 2.5))
+
+        facade.update_review(first.id, {'place_id': self.places[1].id})
+        self.assertEqual(self.stats(place), (1, 2, 2.0))
+        self.assertEqual(self.stats(self.places[1]), (1, 3, 3.0))
+
+        facade.delete_review(first.id)
+        self.assertEqual(self.stats(self.places[1]), (0, 0, 0))
+
+    def test_update_ignores_stale_cache(self):
+        """Test that the deltas come from the row, not a stale cached review"""
+        self.app.config['CACHE_BACKEND'] = 'lru'
+        place_id = self.places[0].id
+        review_id = self.review(self.users[0], self.places[0], 5).id
+        facade.get_review(review_id)
+        # As another worker would, without invalidating this process's cache
+        db.session.query(Review).filter_by(id=review_id).update({'_rating': 2})
+        db.session.query(Place).filter_by(id=place_id).update({'_rating_sum': 2})
+        db.session.commit()
+        db.session.remove()
+
+        facade.update_review(review_id, {'rating': 5})
+        self.assertEqual(self.stats(db.session.get(Place, place_id)), (1, 5, 5.0))
+        facade.delete_review(review_id)
+        self.assertEqual(self.stats(db.session.get(Place, place_id)), (0, 0, 0))
+
+    def test_bulk_create(self):
+        """Test that bulk created reviews are counted per place"""
+        results = facade.bulk_create_reviews(
+            [{'text': 'Nice', 'rating': 4, 'place_id': self.places[0].id},
+             {'text': 'Fine', 'rating': 3, 'place_id': self.places[1].id}],
+            self.users[0].id)
+        self.assertTrue(all(result['status'] == 201 for result in results))
+        self.assertEqual(self.stats(self.places[0]), (1, 4, 4.0))
+        self.assertEqual(self.stats(self.places[1]), (1, 3, 3.0))
+
+    def test_sorted_by_rating(self):
+        """Test that the rating-sorted listing pages best first"""
+        self.review(self.users[0], self.places[0], 3)
+        self.review(self.users[0], self.places[1], 5)
+        self.review(self.users[1], self.places[1], 4)
+        found, cursor = [], None
+        while True:
+            places, cursor = facade.get_places_page(1, cursor, sort='rating')
+            found.extend(place.title for place in places)
+            if cursor is None:
+                break
+        self.assertEqual(found, ["Place 1", "Place 0", "Place 2"])
+
+    def test_rebuild_command(self):
+        """Test that the rebuild command repairs drifted aggregates"""
+        self.review(self.users[0], self.places[0], 4)
+        db.session.add(Review(text='Direct', rating=2, user_id=self.users[1].id,
+                              place_id=self.places[0].id))
+        db.session.commit()
+        result = self.app.test_cli_runner().invoke(args=['rebuild-rating-stats'])
+        self.assertIn('1 place(s)', result.output)
+        self.assertEqual(self.stats(self.places[0]), (2, 6, 3.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import time
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models.user import User
+from app.models.token_revocation import TokenRevocation
+from app.services import facade
+from app.services.revocation import BloomFilter, get_filter
+from test_query_counts import QueryCounter
+
+
+class TestTokenRevocation(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with an admin and a guest"""
+        self.app = create_app("config.TestingConfig")
+        self.app.config['LOGIN_RATE_LIMIT_BACKEND'] = None
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        admin = User(first_name="Admin", last_name="User",
+                     email="admin@example.com", password="secret", is_admin=True)
+        guest = User(first_name="Guest", last_name="User",
+                     email="guest@example.com", password="secret")
+        db.session.add_all([admin, guest])
+        db.session.commit()
+        self.guest_id = guest.id
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email):
+        response = self.client.post('/api/v1/auth/login',
+                                    json={'email': email, 'password': 'secret'})
+        return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+    def rename(self, headers):
+        return self.client.put(f'/api/v1/users/{self.guest_id}',
+                               json={'first_name': 'Renamed'}, headers=headers)
+
+    def test_logout_revokes_token(self):
+        """Test that a token cannot be used once logged out, unlike the others"""
+        headers, other = self.login('guest@example.com'), self.login('guest@example.com')
+        self.assertEqual(self.client.post('/api/v1/auth/logout', headers=headers).status_code, 200)
+        response = self.rename(headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()['msg'], 'Token has been revoked')
+        self.assertEqual(self.rename(other).status_code, 200)
+
+    def test_password_change_revokes_user_tokens(self):
+        """Test that changing a password revokes every token of the user issued before"""
+        first, second = self.login('guest@example.com'), self.login('guest@example.com')
+        admin = self.login('admin@example.com')
+        # Taken before the change, so that it cannot fall in a later second
+        before = int(time.time())
+        response = self.client.put(f'/api/v1/users/{self.guest_id}',
+                                   json={'password': 'n3w-secret'}, headers=admin)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.rename(first).status_code, 401)
+        self.assertEqual(self.rename(second).status_code, 401)
+        self.assertEqual(self.rename(admin).status_code, 200)
+
+        self.assertTrue(facade.is_token_revoked('old', self.guest_id, before))
+        self.assertFalse(facade.is_token_revoked('new', self.guest_id, int(time.time()) + 1))
+
+    def test_login_after_password_change_is_accepted(self):
+        """Test that a token issued right after a password change is not revoked"""
+        old = self.login('guest@example.com')
+        revoked_before = time.time()
+        facade.revoke_user_tokens(self.guest_id)
+        self.assertTrue(facade.is_token_revoked('old', self.guest_id, revoked_before - 0.001))
+        self.assertFalse(facade.is_token_revoked('new', self.guest_id, time.time()))
+        # In the same second as the revocation, most of the time
+        self.assertEqual(self.rename(old).status_code, 401)
+        self.assertEqual(self.rename(self.login('guest@example.com')).status_code, 200)
+
+    def test_revocations_bypass_entity_cache(self):
+        """Test that a revocation moved by another process is seen at once"""
+        self.app.config['CACHE_BACKEND'] = 'lru'
+        facade.revoke_user_tokens(self.guest_id)
+        between = time.time()
+        self.assertFalse(facade.is_token_revoked('between', self.guest_id, between))
+        # As another worker would, without invalidating this process's cache
+        (db.session.query(TokenRevocation)
+         .filter_by(key=f"user:{self.guest_id}")
+         .update({'revoked_before': between + 1}))
+        db.session.commit()
+        self.assertTrue(facade.is_token_revoked('between', self.guest_id, between))
+
+    def test_unrevoked_token_skips_table(self):
+        """Test that a token absent from the filter is accepted without a query"""
+        facade.revoke_token('revoked', datetime.utcnow() + timedelta(days=1))
+        facade.is_token_revoked('warm-up', self.guest_id, 0)
+        with QueryCounter() as counter:
+            self.assertFalse(facade.is_token_revoked('fresh', self.guest_id, 0))
+        self.assertEqual(counter.count, 0)
+        self.assertTrue(facade.is_token_revoked('revoked', self.guest_id, 0))
+        self.assertEqual(get_filter().stats()['keys'], 1)
+
+    def test_syncs_revocations_of_other_workers(self):
+        """Test that revocations written by another process are picked up on sync"""
+        self.app.config['TOKEN_BLOCKLIST_SYNC_INTERVAL'] = 60
+        facade.is_token_revoked('warm-up', None, 0)
+        # As another worker would, without touching this process's filter
+        facade.revocation_repo.revoke('jti:elsewhere', datetime.utcnow() + timedelta(days=1))
+        self.assertFalse(facade.is_token_revoked('elsewhere', None, 0))
+        self.app.config['TOKEN_BLOCKLIST_SYNC_INTERVAL'] = 0
+        self.assertTrue(facade.is_token_revoked('elsewhere', None, 0))
+
+    def test_prune_expired(self):
+        """Test that expired revocations are deleted and left out of the filter"""
+        facade.revoke_token('expired', datetime.utcnow() - timedelta(seconds=1))
+        facade.revoke_token('current', datetime.utcnow() + timedelta(days=1))
+        self.assertEqual(facade.prune_token_revocations(), 1)
+        self.assertEqual([key for key, _ in facade._revocation_keys(None)], ['jti:current'])
+
+    def test_bloom_filter_error_rate(self):
+        """Test that the Bloom filter keeps its members and few false positives"""
+        bloom = BloomFilter(10000, 0.01)
+        for i in range(10000):
+            bloom.add(f"member-{i}")
+        self.assertTrue(all(f"member-{i}" in bloom for i in range(10000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
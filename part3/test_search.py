@@ -0,0 +1,113 @@
+import unittest
+from sqlalchemy import create_engine, inspect, text
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.persistence.migrations import upgrade
+from app.services import facade
+
+
+class TestPlaceSearch(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with described places"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        self.owner = User(first_name="Owner", last_name="User",
+                          email="owner@example.com", password="secret")
+        db.session.add(self.owner)
+        db.session.flush()
+        places = [
+            ("Seaside cottage", "Quiet cottage with a garden near the beach"),
+            ("City loft", "Bright loft in the city centre, close to the beach"),
+            ("Mountain chalet", "Wooden chalet with a fireplace"),
+            ("Beach house", "House on the beach with a large terrace"),
+        ]
+        for title, description in places:
+            db.session.add(Place(title=title, description=description, price=10,
+                                 latitude=0.0, longitude=0.0,
+                                 owner_id=self.owner.id))
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def titles(self, query, limit=50, cursor=None):
+        places, next_cursor = facade.search_places(query, limit, cursor)
+        return [place.title for place in places], next_cursor
+
+    def test_ranked_by_relevance(self):
+        """Test that title matches rank above description matches"""
+        titles, _ = self.titles("beach")
+        self.assertEqual(titles[0], "Beach house")
+        self.assertEqual(sorted(titles[1:]), ["City loft", "Seaside cottage"])
+
+    def test_every_word_must_match(self):
+        """Test that the query words are combined with AND"""
+        self.assertEqual(self.titles("beach garden")[0], ["Seaside cottage"])
+        self.assertEqual(self.titles("chalet beach")[0], [])
+
+    def test_operators_are_plain_words(self):
+        """Test that FTS syntax in the query cannot break the search"""
+        self.assertEqual(self.titles('beach" OR NEAR(*')[0], [])
+        self.assertEqual(self.titles('"chalet"')[0], ["Mountain chalet"])
+
+    def test_paginated(self):
+        """Test that paging returns every match once, in rank order"""
+        found, cursor = self.titles("beach", limit=1)
+        while cursor:
+            page, cursor = self.titles("beach", limit=1, cursor=cursor)
+            found.extend(page)
+        self.assertEqual(found, self.titles("beach")[0])
+
+    def test_follows_writes(self):
+        """Test that created, updated and deleted places are reindexed"""
+        place = facade.create_place({
+            'title': 'Lake cabin', 'description': 'Cabin by the lake',
+            'price': 10, 'latitude': 0.0, 'longitude': 0.0,
+            'owner_id': self.owner.id})
+        self.assertEqual(self.titles("lake")[0], ["Lake cabin"])
+        facade.update_place(place.id, {'description': 'Cabin in the woods'})
+        self.assertEqual(self.titles("woods")[0], ["Lake cabin"])
+        self.assertEqual(self.titles("lake")[0], ["Lake cabin"])
+        db.session.delete(place)
+        db.session.commit()
+        self.assertEqual(self.titles("cabin")[0], [])
+
+    def test_endpoint_validation(self):
+        """Test that a missing query or bad cursor is rejected"""
+        self.assertEqual(self.client.get('/api/v1/places/search').status_code, 400)
+        response = self.client.get('/api/v1/places/search?q=beach&cursor=bad')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/places/search?q=nothing')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+
+
+class TestSearchMigration(unittest.TestCase):
+    def test_indexes_existing_places(self):
+        """Test that the migration indexes places created before it"""
+        engine = create_engine("sqlite://")
+        with open("SQL/script.sql") as script:
+            engine.raw_connection().executescript(script.read())
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO places (id, title, description, price, latitude, "
+                "longitude, owner_id) SELECT 'p1', 'Old barn', 'Rustic', 1, 0, 0, id "
+                "FROM users LIMIT 1"))
+        upgrade(engine)
+        self.assertIn('places_fts', inspect(engine).get_table_names())
+        with engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT rowid FROM places_fts WHERE places_fts MATCH 'barn'")).all()
+        self.assertEqual(len(rows), 1)
+        engine.dispose()
+
+if __name__ == '__main__':
+    unittest.main()
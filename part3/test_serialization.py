@@ -0,0 +1,62 @@
+import json
+import unittest
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.serialization import default, dumps
+
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with a priced place"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        owner = User(first_name="Owner", last_name="User",
+                     email="owner@example.com", password="secret")
+        db.session.add(owner)
+        db.session.flush()
+        self.place = Place(title="Cabin", description="Wooden cabin", price=Decimal('99.50'),
+                           latitude=45.0, longitude=6.0, owner_id=owner.id)
+        db.session.add(self.place)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_place_endpoints(self):
+        """Test that places with a Numeric price are returned as JSON"""
+        for url in ['/api/v1/places/', f'/api/v1/places/{self.place.id}',
+                    '/api/v1/places/search?q=cabin']:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(response.mimetype, 'application/json')
+            body = response.get_json()
+            place = body[0] if isinstance(body, list) else body
+            self.assertEqual(place['price'], 99.5)
+
+    def test_native_types(self):
+        """Test that Decimal, datetime and UUID match the stdlib encoding"""
+        value = {'price': Decimal('12.25'), 'at': datetime(2024, 5, 1, 12, 30, 15, 250),
+                 'id': uuid.UUID(int=1), 'name': 'Café'}
+        expected = json.loads(json.dumps(value, default=default))
+        self.assertEqual(json.loads(dumps(value)), expected)
+        self.assertEqual(expected['at'], '2024-05-01T12:30:15.000250')
+
+    def test_errors_are_json(self):
+        """Test that error bodies go through the same serializer"""
+        response = self.client.get('/api/v1/places/?limit=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.get_json())
+
+if __name__ == '__main__':
+    unittest.main()
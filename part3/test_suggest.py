@@ -0,0 +1,114 @@
+import unittest
+from app import create_app, db
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.services import facade
+from app.services.suggest import PrefixIndex, get_index
+
+
+class TestSuggest(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database with places and amenities"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        self.owner = User(first_name="Owner", last_name="User",
+                          email="owner@example.com", password="secret")
+        db.session.add_all([self.owner, Amenity(name="Parking"),
+                            Amenity(name="Pool")])
+        db.session.flush()
+        for title in ["Paris loft", "Pärnu villa", "Porto flat", "Berlin room"]:
+            db.session.add(Place(title=title, price=10, latitude=0.0,
+                                 longitude=0.0, owner_id=self.owner.id))
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up test environment"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def suggest(self, prefix, limit=10):
+        response = self.client.get(f'/api/v1/places/suggest?prefix={prefix}&limit={limit}')
+        self.assertEqual(response.status_code, 200)
+        return [item['text'] for item in response.get_json()]
+
+    def test_prefix_matches(self):
+        """Test that titles and names are matched ignoring case and accents"""
+        self.assertEqual(self.suggest('pa'), ['Paris loft', 'Parking', 'Pärnu villa'])
+        self.assertEqual(self.suggest('PO'), ['Pool', 'Porto flat'])
+        self.assertEqual(self.suggest('x'), [])
+
+    def test_limit(self):
+        """Test that the suggestions are bounded"""
+        self.assertEqual(len(self.suggest('p', limit=2)), 2)
+        response = self.client.get('/api/v1/places/suggest?prefix=p&limit=1000')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/places/suggest')
+        self.assertEqual(response.status_code, 400)
+
+    def test_follows_writes(self):
+        """Test that created and renamed places and amenities are suggested"""
+        self.suggest('p')
+        place = facade.create_place({
+            'title': 'Prague attic', 'price': 10, 'latitude': 0.0,
+            'longitude': 0.0, 'owner_id': self.owner.id})
+        facade.bulk_create_amenities([{'name': 'Projector'}])
+        self.assertEqual(self.suggest('pr'), ['Prague attic', 'Projector'])
+        facade.update_place(place.id, {'title': 'Berlin attic'})
+        self.assertEqual(self.suggest('pr'), ['Projector'])
+        self.assertEqual(self.suggest('berlin'), ['Berlin attic', 'Berlin room'])
+
+    def test_ignores_rolled_back_writes(self):
+        """Test that titles of a unit of work that rolls back are not suggested"""
+        self.suggest('p')
+        with self.assertRaises(ValueError):
+            with facade.unit_of_work():
+                facade.create_place({
+                    'title': 'Prague attic', 'price': 10, 'latitude': 0.0,
+                    'longitude': 0.0, 'owner_id': self.owner.id})
+                facade.create_amenity({'name': 'Projector'})
+                raise ValueError("rolled back")
+        self.assertEqual(self.suggest('pr'), [])
+
+    def test_index_moves_entries(self):
+        """Test that renaming one of several equal keys moves only that entry"""
+        index = PrefixIndex()
+        index.build([('place', 'a', 'Same'), ('place', 'b', 'Same')])
+        index.set('place', 'b', 'Other')
+        self.assertEqual(index.suggest('s', 10), [('place', 'a', 'Same')])
+        self.assertEqual(index.suggest('o', 10), [('place', 'b', 'Other')])
+
+    def test_rebuild_in_progress_serves_old_index(self):
+        """Test that a due rebuild already running elsewhere is not waited for"""
+        self.suggest('p')
+        index = get_index()
+        built_at = index.built_at
+        self.app.config['SUGGEST_INDEX_MAX_AGE'] = 0
+        with index.refresh_lock:
+            self.assertEqual(self.suggest('po'), ['Pool', 'Porto flat'])
+        self.assertEqual(index.built_at, built_at)
+        self.suggest('po')
+        self.assertGreater(index.built_at, built_at)
+
+    def test_writes_during_build_are_kept(self):
+        """Test that entries set while a rebuild reads its items survive it"""
+        index = PrefixIndex()
+        index.build([('place', 'a', 'Alpha')])
+
+        def items():
+            yield 'place', 'a', 'Alpha'
+            index.set('place', 'b', 'Beta')
+            index.set('place', 'a', 'Gamma')
+
+        index.build(items())
+        self.assertEqual(index.suggest('a', 10), [])
+        self.assertEqual(index.suggest('b', 10), [('place', 'b', 'Beta')])
+        self.assertEqual(index.suggest('g', 10), [('place', 'a', 'Gamma')])
+
+if __name__ == '__main__':
+    unittest.main()
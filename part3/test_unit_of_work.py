@@ -0,0 +1,81 @@
+import unittest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.persistence.unit_of_work import after_commit
+from app.services import facade
+
+
+class TestUnitOfWork(unittest.TestCase):
+    def setUp(self):
+        """Set up an in-memory database and count its commits"""
+        self.app = create_app("config.TestingConfig")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.commits = 0
+        event.listen(Session, 'after_commit', self._count_commit)
+
+    def tearDown(self):
+        """Clean up test environment"""
+        event.remove(Session, 'after_commit', self._count_commit)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _count_commit(self, session):
+        self.commits += 1
+
+    def test_writes_commit_once(self):
+        """Test that the writes of a unit of work share one commit"""
+        with facade.unit_of_work():
+            wifi = facade.create_amenity({'name': 'WiFi'})
+            facade.create_amenity({'name': 'Pool'})
+            self.assertIsNotNone(wifi.id)
+            facade.update_amenity(wifi.id, {'name': 'Fast WiFi'})
+            self.assertEqual(self.commits, 0)
+        self.assertEqual(self.commits, 1)
+        self.assertEqual(facade.get_amenity(wifi.id).name, 'Fast WiFi')
+
+    def test_nested_units_commit_once(self):
+        """Test that only the outermost unit of work commits"""
+        with facade.unit_of_work():
+            with facade.unit_of_work():
+                facade.create_amenity({'name': 'WiFi'})
+            self.assertEqual(self.commits, 0)
+        self.assertEqual(self.commits, 1)
+
+    def test_rollback_on_error(self):
+        """Test that an error discards every write of the unit of work"""
+        with self.assertRaises(ValueError):
+            with facade.unit_of_work():
+                facade.create_amenity({'name': 'WiFi'})
+                facade.create_amenity({'name': ''})
+        self.assertEqual(db.session.query(Amenity).count(), 0)
+
+    def test_calls_outside_commit_immediately(self):
+        """Test that repository writes still commit on their own"""
+        facade.create_amenity({'name': 'WiFi'})
+        self.assertEqual(self.commits, 1)
+
+    def test_after_commit_callbacks(self):
+        """Test that callbacks wait for the outer commit and drop on rollback"""
+        called = []
+        after_commit(lambda: called.append('outside'))
+        self.assertEqual(called, ['outside'])
+        with facade.unit_of_work():
+            with facade.unit_of_work():
+                after_commit(lambda: called.append('committed'))
+            self.assertEqual(called, ['outside'])
+        self.assertEqual(called, ['outside', 'committed'])
+        with self.assertRaises(ValueError):
+            with facade.unit_of_work():
+                after_commit(lambda: called.append('rolled back'))
+                raise ValueError()
+        with facade.unit_of_work():
+            pass
+        self.assertEqual(called, ['outside', 'committed'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -37,19 +37,7 @@ document.addEventListener('DOMContentLoaded', function() {
     if (!priceSelector) return;
     
     priceSelector.addEventListener('change', function() {
-      const selectedPrice = this.value;
-      
-      const accommodationCards = document.querySelectorAll('.accommodation-item');
-      
-      accommodationCards.forEach(card => {
-        const accommodationPrice = parseInt(card.getAttribute('data-price'));
-        
-        if (selectedPrice === 'all' || accommodationPrice <= parseInt(selectedPrice)) {
-          card.style.display = 'block';
-        } else {
-          card.style.display = 'none';
-        }
-      });
+      loadAccommodations(getCookie('token'), this.value);
     });
   }
   
@@ -92,12 +80,15 @@ document.addEventListener('DOMContentLoaded', function() {
     });
   }
   
-  async function loadAccommodations(token) {
+  async function loadAccommodations(token, maxPrice = 'all') {
     try {
       const headers = { 'Content-Type': 'application/json' };
       if (token) headers['Authorization'] = `Bearer ${token}`;
       
-      const response = await fetch('http://127.0.0.1:5000/api/v1/places', {
+      const url = new URL('http://127.0.0.1:5000/api/v1/places/');
+      if (maxPrice !== 'all') url.searchParams.set('max_price', maxPrice);
+      
+      const response = await fetch(url, {
         method: 'GET',
         headers: headers,
         credentials: 'include'
@@ -301,7 +292,8 @@ document.addEventListener('DOMContentLoaded', function() {
       };
       
       const tokenData = parseJWT(token);
-      const userId = tokenData.sub.id;
+      // Older tokens carry the user as an object
+      const userId = typeof tokenData.sub === 'object' ? tokenData.sub.id : tokenData.sub;
       
       if (!userId) {
         return { success: false, message: 'Unable to identify user. Please log in again.' };